@@ -6,11 +6,13 @@ CLI interface to REDbot
 
 import sys
 from argparse import ArgumentParser
-from configparser import ConfigParser
+from configparser import ConfigParser, SectionProxy
+from typing import Any, Callable, Dict, Iterator, TextIO
 
 import thor
 
 from redbot.formatter import available_formatters, find_formatter
+from redbot.formatter.json import dumps, resource_document
 from redbot.resource import HttpResource
 from redbot.webbotauth import WebBotAuthError, load_signer
 
@@ -18,10 +20,14 @@ from redbot.webbotauth import WebBotAuthError, load_signer
 def main() -> None:
     parser = ArgumentParser()
     parser.set_defaults(
-        version=False, descend=False, output_format="text", show_recommendations=False
+        version=False,
+        descend=False,
+        output_format="text",
+        show_recommendations=False,
+        compact=False,
     )
 
-    parser.add_argument("url", help="URL to check")
+    parser.add_argument("url", nargs="?", help="URL to check")
 
     parser.add_argument(
         "-a",
@@ -39,6 +45,29 @@ def main() -> None:
         default="text",
         help="output format",
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        dest="compact",
+        help="leave out whitespace, in formats that allow it",
+    )
+    parser.add_argument(
+        "-b",
+        "--bulk",
+        action="store",
+        dest="bulk",
+        metavar="FILE",
+        help="check the URLs in FILE (one per line; '-' for stdin), writing NDJSON",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        action="store",
+        dest="concurrency",
+        type=int,
+        default=10,
+        help="how many checks to run at once in bulk mode",
+    )
     parser.add_argument(
         "--web-bot-auth-key",
         action="store",
@@ -53,6 +82,11 @@ def main() -> None:
     )
     args = parser.parse_args()
 
+    if bool(args.url) == bool(args.bulk):
+        parser.error("specify either a URL or --bulk FILE")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
     redbot_config = {"enable_local_access": "True"}
     if args.web_bot_auth_key:
         redbot_config["web_bot_auth_key"] = args.web_bot_auth_key
@@ -68,6 +102,14 @@ def main() -> None:
         sys.stderr.write(f"Web Bot Auth configuration error: {why}\n")
         sys.exit(1)
 
+    if args.bulk:
+        if args.bulk == "-":
+            run_bulk(config, sys.stdin, args.concurrency, args.descend)
+        else:
+            with open(args.bulk, encoding="utf-8", errors="replace") as fh:
+                run_bulk(config, fh, args.concurrency, args.descend)
+        return
+
     resource = HttpResource(config, descend=args.descend)
     resource.set_request(args.url)
 
@@ -75,7 +117,7 @@ def main() -> None:
         config,
         resource,
         output,
-        {"tty_out": sys.stdout.isatty(), "descend": args.descend},
+        {"tty_out": sys.stdout.isatty(), "descend": args.descend, "compact": args.compact},
     )
 
     formatter.bind_resource(resource)
@@ -92,5 +134,85 @@ def output(out: str) -> None:
     sys.stdout.write(out)
 
 
+def run_bulk(config: SectionProxy, infile: TextIO, concurrency: int, descend: bool) -> None:
+    "Check every URL in infile on a single loop, writing a JSON record for each."
+
+    def write_record(record: Dict[str, Any]) -> None:
+        sys.stdout.write(dumps(record) + "\n")
+        sys.stdout.flush()
+
+    runner = BulkRunner(config, read_urls(infile), write_record, concurrency, descend)
+    thor.schedule(0, runner.fill)
+    thor.run()
+
+
+def read_urls(infile: TextIO) -> Iterator[str]:
+    "Lazily yield the URLs in infile, skipping blank lines and comments."
+    for line in infile:
+        url = line.strip()
+        if url and not url.startswith("#"):
+            yield url
+
+
+class BulkRunner:
+    """
+    Run HttpResource checks for a stream of URLs, at most `concurrency` at a time.
+
+    URLs are pulled from the iterator only when a slot is free, and nothing is kept
+    once a check's record has been written, so memory use doesn't depend upon how
+    many URLs there are. Calls thor.stop() when everything is done.
+    """
+
+    def __init__(
+        self,
+        config: SectionProxy,
+        urls: Iterator[str],
+        write_record: Callable[[Dict[str, Any]], None],
+        concurrency: int = 10,
+        descend: bool = False,
+    ) -> None:
+        self.config = config
+        self.urls = urls
+        self.write_record = write_record
+        self.concurrency = concurrency
+        self.descend = descend
+        self.max_runtime = config.getint("max_runtime", fallback=60)
+        self.running = 0
+        self.exhausted = False
+        self._fill_scheduled = False
+
+    def fill(self) -> None:
+        "Start checks until we're at the concurrency limit or out of URLs."
+        self._fill_scheduled = False
+        while self.running < self.concurrency and not self.exhausted:
+            try:
+                url = next(self.urls)
+            except StopIteration:
+                self.exhausted = True
+                break
+            self.start(url)
+        if self.exhausted and self.running == 0:
+            thor.stop()
+
+    def start(self, url: str) -> None:
+        "Start checking url."
+        resource = HttpResource(self.config, descend=self.descend)
+        resource.set_request(url)
+        timeout = thor.schedule(self.max_runtime, resource.stop)
+        self.running += 1
+
+        @thor.events.on(resource)
+        def check_done() -> None:
+            timeout.delete()
+            self.running -= 1
+            self.write_record(resource_document(resource))
+            # Checks can finish synchronously (e.g., a bad URL), so don't recurse.
+            if not self._fill_scheduled:
+                self._fill_scheduled = True
+                thor.schedule(0, self.fill)
+
+        resource.check()
+
+
 if __name__ == "__main__":
     main()
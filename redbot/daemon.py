@@ -33,6 +33,13 @@ from thor.loop import _loop
 from thor.tcp import TcpConnection
 
 import redbot
+from redbot import metrics
+from redbot.formatter.html import BaseHtmlFormatter
+from redbot.note import note_render_cache
+from redbot.resource.governor import governor
+from redbot.resource.latency import latency_tracker
+from redbot.resource.link_pool import link_parse_pool
+from redbot.resource.resolve import resolver
 from redbot.type import RawHeaderListType
 from redbot.webbotauth import (
     DIRECTORY_CONTENT_TYPE,
@@ -42,6 +49,8 @@ from redbot.webbotauth import (
     load_signer,
 )
 from redbot.webui import RedWebUi
+from redbot.webui.result_cache import result_cache
+from redbot.webui.static import static_assets
 
 SYSTEMD_NOTIFIER: Optional[Callable[[Any], None]] = None
 SYSTEMD_NOTIFICATION: Optional[Any] = None
@@ -80,6 +89,14 @@ class RedBotServer:
 
         self.handler = partial(RedRequestHandler, server=self)
 
+        resolver.setup(config)
+        latency_tracker.setup(config)
+        governor.setup(config)
+        link_parse_pool.setup(config)
+        result_cache.setup(config)
+        note_render_cache.setup(config)
+        BaseHtmlFormatter.setup_templates(config)
+
         # Set up the watchdog
         if SYSTEMD_NOTIFIER is not None:
             thor.schedule(self.watchdog_freq, self.watchdog_ping)
@@ -106,10 +123,11 @@ class RedBotServer:
         if not self.ui_path.endswith(b"/"):
             self.ui_path += b"/"
 
-        # Read static files
+        # Load static files
         self.static_root = os.path.normpath(
             os.path.join(self.ui_path.decode("ascii"), config["static_root"])
         ).encode("ascii")
+        static_assets.setup(config, self.static_root, self.static_files, self.extra_files)
 
         # Saved-tests cleanup runs out-of-process; see redbot.gc and
         # extra/redbot-gc.{service,timer}. Keeping the blocking filesystem
@@ -153,8 +171,14 @@ class RedBotServer:
     def periodic_memory_dump(self) -> None:
         self.console("Hourly memory stats dump:")
         self.dump_memory_stats()
+        self.dump_metrics()
         thor.schedule(3600, self.periodic_memory_dump)
 
+    def dump_metrics(self) -> None:
+        for name, counters in metrics.snapshot().items():
+            values = ", ".join(f"{key}={value}" for key, value in counters.items())
+            self.console(f"{name}: {values}")
+
     def dump_memory_stats(self) -> None:
         try:
             snapshot = tracemalloc.take_snapshot()
@@ -212,11 +236,13 @@ class RedBotServer:
         if self.debug:
             self.console("Caught SIGTERM, dumping memory stats...")
             self.dump_memory_stats()
+            self.dump_metrics()
         else:
             self.console("Caught SIGTERM, shutting down...")
         self.shutdown()
 
     def shutdown(self) -> None:
+        link_parse_pool.shutdown()
         self.http_server.on("stop", thor.stop)
         self.http_server.graceful_shutdown()
 
@@ -311,18 +337,6 @@ class RedBotServer:
 
 
 class RedRequestHandler:
-    static_types = {
-        b".html": b"text/html",
-        b".js": b"text/javascript",
-        b".css": b"text/css",
-        b".png": b"image/png",
-        b".txt": b"text/plain",
-        b".woff": b"font/woff",
-        b".ttf": b"font/ttf",
-        b".eot": b"application/vnd.ms-fontobject",
-        b".svg": b"image/svg+xml",
-    }
-
     def __init__(self, exchange: thor.http.server.HttpServerExchange, server: RedBotServer) -> None:
         self.exchange = exchange
         self.server = server
@@ -406,27 +420,13 @@ in standalone server mode. Details follow.
             return self.not_found(p_uri.path)
 
     def serve_static(self, path: bytes) -> None:
-        path = os.path.normpath(path)
-        if path.startswith(self.server.static_root + b"/"):
-            # Strip the static root from the path to get relative file path
-            path = path[len(self.server.static_root) + 1 :]
-            try:
-                with self.server.static_files.joinpath(path.decode("ascii")).open(mode="rb") as fh:
-                    content = fh.read()
-            except OSError:
-                return self.not_found(path)
-        else:
-            try:
-                content = self.server.extra_files[path]
-            except (KeyError, TypeError):
-                return self.not_found(path)
-        file_ext = os.path.splitext(path)[1].lower() or b".html"
-        content_type = self.static_types.get(file_ext, b"application/octet-stream")
-        headers = []
-        headers.append((b"Content-Type", content_type))
-        headers.append((b"Cache-Control", b"max-age=86400"))
-        self.exchange.response_start(b"200", b"OK", headers)
-        self.exchange.response_body(content)
+        response = static_assets.respond(path, self.req_hdrs)
+        if response is None:
+            return self.not_found(path)
+        status_code, status_phrase, headers, content = response
+        self.exchange.response_start(status_code, status_phrase, headers)
+        if content:
+            self.exchange.response_body(content)
         self.exchange.response_done([])
         return None
 
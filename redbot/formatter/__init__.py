@@ -16,11 +16,12 @@ from thor.events import EventEmitter
 from typing_extensions import TypedDict
 
 from redbot.i18n import get_locale, set_locale
+from redbot.note import shared_markdown
 
 if TYPE_CHECKING:
     from redbot.resource import HttpResource
 
-_formatters = ["html", "text", "har"]
+_formatters = ["html", "text", "har", "json", "ndjson", "sse"]
 
 
 def find_formatter(name: str, default: str = "html", multiple: bool = False) -> Type["Formatter"]:
@@ -85,6 +86,8 @@ class Formatter(EventEmitter):
     media_type: str  # the media type of the format.
     name: str = "base class"  # the name of the format.
     can_multiple = False  # formatter can represent multiple responses.
+    consumes_content = False  # feed() is called with response content as it arrives.
+    uses_progress_channel = False  # status can be followed separately (see redbot.webui.progress).
 
     def __init__(
         self,
@@ -103,8 +106,14 @@ class Formatter(EventEmitter):
         self.resource = resource
         self.output = output  # output file object
         self.kw = params
-        self._markdown = Markdown(output_format="html")
         self.locale = params.get("locale", "en")
+        self._last_status = 0.0
+        self._pending_status: Optional[str] = None
+        self._status_timer: Optional[thor.loop.ScheduledEvent] = None
+
+    @property
+    def _markdown(self) -> Markdown:
+        return shared_markdown()
 
     def _wrap_context(self, func: Callable[..., Any]) -> Callable[..., Any]:
         def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -131,16 +140,47 @@ class Formatter(EventEmitter):
                 display_resource.on(
                     "response_headers_available", self._wrap_context(self.start_output)
                 )
-            display_resource.response_content_processors.append(self._wrap_context(self.feed))
-            display_resource.on("status", self._wrap_context(self.status))
-            display_resource.on("debug", self.debug)
+            if self.consumes_content:
+                display_resource.response_content_processors.append(self.feed)
+            display_resource.on("status", self._wrap_context(self._status))
+            if self.config.getboolean("debug", fallback=False):
+                display_resource.on("debug", self.debug)
 
             # we want to wait just a little bit, for extra data.
             @thor.events.on(display_resource)
             def check_done() -> None:
                 thor.schedule(0.1, self._done)
 
+    def _status(self, status: str) -> None:
+        """
+        Pass status on to status(), no more than status_rate times a second. In
+        between, only the latest status is kept.
+        """
+        status_rate = self.config.getfloat("status_rate", fallback=4)
+        if status_rate <= 0:
+            self.status(status)
+            return
+        self._pending_status = status
+        if self._status_timer is not None:
+            return
+        wait = self._last_status + 1 / status_rate - time.time()
+        if wait > 0:
+            self._status_timer = thor.schedule(wait, self._wrap_context(self._flush_status))
+        else:
+            self._flush_status()
+
+    def _flush_status(self) -> None:
+        self._status_timer = None
+        status, self._pending_status = self._pending_status, None
+        if status is not None:
+            self._last_status = time.time()
+            self.status(status)
+
     def _done(self) -> None:
+        if self._status_timer is not None:
+            self._status_timer.delete()
+            self._status_timer = None
+        self._pending_status = None
         with set_locale(self.locale):
             self.finish_output()
         self.emit("formatter_done")
@@ -153,7 +193,8 @@ class Formatter(EventEmitter):
 
     def feed(self, sample: bytes) -> None:
         """
-        Feed a body sample to processor(s).
+        Feed a chunk of response content to the formatter. Only called when
+        consumes_content is set, and outside of the formatter's locale.
         """
         raise NotImplementedError
 
@@ -165,7 +206,7 @@ class Formatter(EventEmitter):
 
     def debug(self, message: str) -> None:
         """
-        Debug to console.
+        Debug to console. Only called when the debug configuration option is set.
         """
         return
 
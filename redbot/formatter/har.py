@@ -4,31 +4,27 @@ HAR Formatter for REDbot.
 
 import datetime
 import json
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Dict, List, Optional, Set
 
-from typing_extensions import TypedDict, Unpack
+from typing_extensions import Unpack
 
 from redbot import __version__
 from redbot.formatter import Formatter, FormatterArgs
+from redbot.note import note_render_cache
 from redbot.resource import HttpResource
+from redbot.resource.fetch import RedFetcher
 from redbot.type import StrHeaderListType
 
 
-class HarLogDict(TypedDict):
-    version: str
-    creator: Dict[str, str]
-    browser: Dict[str, str]
-    pages: List[Any]
-    entries: List[Dict[str, Any]]
-
-
-class HarDict(TypedDict):
-    log: HarLogDict
-
-
 class HarFormatter(Formatter):
     """
     Format a HttpResource object (and any descendants) as HAR.
+
+    The log is streamed: its header goes out when the test starts, and each
+    entry -- the resource itself, its active check subrequests and any linked
+    resources -- as soon as that fetch is done. Set the compact parameter to
+    leave out indentation.
     """
 
     can_multiple = True
@@ -37,19 +33,33 @@ class HarFormatter(Formatter):
 
     def __init__(self, *args: Unpack[FormatterArgs]) -> None:
         Formatter.__init__(self, *args)
-        self.har: HarDict = {
-            "log": {
-                "version": "1.1",
-                "creator": {"name": "REDbot", "version": __version__},
-                "browser": {"name": "REDbot", "version": __version__},
-                "pages": [],
-                "entries": [],
-            }
-        }
+        self.indent: Optional[int] = None if self.kw.get("compact", False) else 4
         self.last_id = 0
+        self.page_id: Optional[int] = None
+        self.entry_count = 0
+        self._started = False
+        self._finished = False
+        self._written: Set[RedFetcher] = set()
 
     def start_output(self) -> None:
-        pass
+        if self._started:
+            return
+        self._started = True
+        self.last_id += 1
+        self.page_id = self.last_id
+        out = "{" + self.newline(1) + self.dump("log", 1) + self.separator(": ") + "{"
+        out += self.member("version", "1.1", 2) + ","
+        out += self.member("creator", {"name": "REDbot", "version": __version__}, 2) + ","
+        out += self.member("browser", {"name": "REDbot", "version": __version__}, 2) + ","
+        out += self.newline(2) + self.dump("entries", 2) + self.separator(": ") + "["
+        self.output(out)
+        self.watch(self.resource)
+        for check in self.resource.subreqs.values():
+            self.watch(check)
+        if self.resource.fetch_done:
+            self.watch_linked()
+        else:
+            self.resource.once("fetch_done", self._wrap_context(self.watch_linked))
 
     def status(self, status: str) -> None:
         pass
@@ -58,20 +68,78 @@ class HarFormatter(Formatter):
         pass
 
     def finish_output(self) -> None:
-        "Fill in the template with RED's results."
-        if self.resource.response.complete:
-            page_id = self.add_page(self.resource)
-            self.add_entry(self.resource, page_id)
-            for linked_resource in [d[0] for d in self.resource.linked]:
-                # filter out incomplete responses
-                if linked_resource.response.complete:
-                    self.add_entry(linked_resource, page_id)
-        self.output(json.dumps(self.har, indent=4))
+        "Write out anything that's left, and close the log."
+        self.start_output()
+        for linked_resource in self.resource.linked_resources():
+            self.write_entry(linked_resource)
+        self.close()
 
     def error_output(self, message: str) -> None:
-        self.output(message)
+        if self._started:
+            self.close({"_error": message})
+        else:
+            self.output(message)
+
+    def close(self, extra: Optional[Dict[str, str]] = None) -> None:
+        "Close the log (after the pages, which aren't known until now), adding extra members."
+        if self._finished:
+            return
+        self._finished = True
+        pages = []
+        if self.page_id and self.resource.request.start_time:
+            pages.append(self.add_page(self.resource, self.page_id))
+        out = (self.newline(2) if self.entry_count else "") + "],"
+        out += self.member("pages", pages, 2)
+        for key, value in (extra or {}).items():
+            out += "," + self.member(key, value, 2)
+        self.output(out + self.newline(1) + "}" + self.newline(0) + "}")
+
+    def watch(self, fetcher: RedFetcher) -> None:
+        "Write fetcher's entry when it's done."
+        if fetcher.fetch_done:
+            self.write_entry(fetcher)
+        else:
+            fetcher.once("fetch_done", self._wrap_context(partial(self.write_entry, fetcher)))
+
+    def watch_linked(self) -> None:
+        for linked_resource in self.resource.linked_resources():
+            self.watch(linked_resource)
+
+    def write_entry(self, fetcher: RedFetcher) -> None:
+        "Write fetcher's entry, unless it's incomplete or already written."
+        if self._finished or fetcher in self._written:
+            return
+        if not fetcher.response.complete or getattr(fetcher, "discarded", False):
+            return  # filter out incomplete and discarded responses
+        self._written.add(fetcher)
+        out = self.dump(self.add_entry(fetcher, self.page_id), 3)
+        self.output(("," if self.entry_count else "") + self.newline(3) + out)
+        self.entry_count += 1
+
+    def dump(self, value: Any, level: int) -> str:
+        "Serialise value, indented to level."
+        if self.indent is None:
+            return json.dumps(value, separators=(",", ":"))
+        return json.dumps(value, indent=self.indent).replace("\n", self.newline(level))
+
+    def member(self, key: str, value: Any, level: int) -> str:
+        "Serialise an object member, on a new line at level."
+        return (
+            self.newline(level)
+            + self.dump(key, level)
+            + self.separator(": ")
+            + self.dump(value, level)
+        )
+
+    def newline(self, level: int) -> str:
+        if self.indent is None:
+            return ""
+        return "\n" + " " * self.indent * level
+
+    def separator(self, sep: str) -> str:
+        return sep.strip() if self.indent is None else sep
 
-    def add_entry(self, resource: HttpResource, page_ref: Optional[int] = None) -> None:
+    def add_entry(self, resource: RedFetcher, page_ref: Optional[int] = None) -> Dict[str, Any]:
         assert resource.request.start_time, "request.start_time not set in add_entry"
         assert resource.response.start_time, "response.start_time not set in add_entry"
         assert resource.response.finish_time, "response.finish_time not set in add_entry"
@@ -82,6 +150,8 @@ class HarFormatter(Formatter):
         }
         if page_ref:
             entry["pageref"] = f"page{page_ref}"
+        if resource.check_name != "default":
+            entry["_check_name"] = str(resource.check_name)
 
         request = {
             "method": resource.request.method,
@@ -111,14 +181,20 @@ class HarFormatter(Formatter):
         }
 
         cache: Dict[None, None] = {}
-        timings = {
-            "dns": -1,
-            "connect": -1,
-            "blocked": 0,
-            "send": 0,
-            "wait": int((resource.response.start_time - resource.request.start_time) * 1000),
-            "receive": int((resource.response.finish_time - resource.response.start_time) * 1000),
-        }
+        timings: Dict[str, int]
+        if resource.timings is not None:
+            timings = resource.timings.phases()
+        else:
+            timings = {
+                "dns": -1,
+                "connect": -1,
+                "blocked": 0,
+                "send": 0,
+                "wait": int((resource.response.start_time - resource.request.start_time) * 1000),
+                "receive": int(
+                    (resource.response.finish_time - resource.response.start_time) * 1000
+                ),
+            }
 
         entry.update(
             {
@@ -128,25 +204,26 @@ class HarFormatter(Formatter):
                 "timings": timings,
             }
         )
-        self.har["log"]["entries"].append(entry)
+        if resource.deadlines:
+            entry["_deadlines"] = {
+                kind: int(seconds * 1000) for kind, seconds in resource.deadlines.items()
+            }
+        return entry
 
-    def add_page(self, resource: HttpResource) -> int:
+    def add_page(self, resource: HttpResource, page_id: int) -> Dict[str, Any]:
         assert resource.request.start_time, "request.start_time not set in add_page"
-        page_id = self.last_id + 1
-        page = {
+        return {
             "startedDateTime": isoformat(resource.request.start_time),
             "id": f"page{page_id}",
             "title": "",
             "pageTimings": {"onContentLoad": -1, "onLoad": -1},
         }
-        self.har["log"]["pages"].append(page)
-        return page_id
 
     @staticmethod
     def format_headers(hdrs: StrHeaderListType) -> List[Dict[str, str]]:
         return [{"name": n, "value": v} for n, v in hdrs]
 
-    def format_notes(self, resource: HttpResource) -> List[Dict[str, Any]]:
+    def format_notes(self, resource: RedFetcher) -> List[Dict[str, Any]]:
         return [self.format_note(note) for note in resource.response.notes]
 
     def format_note(self, note: Any) -> Dict[str, Any]:
@@ -155,7 +232,7 @@ class HarFormatter(Formatter):
             "subject": note.subject,
             "category": note.category.name,
             "level": note.level.name,
-            "summary": note.summary,
+            "summary": note_render_cache.summary(note),
         }
         if note.subnotes:
             msg["subnotes"] = [self.format_note(subnote) for subnote in note.subnotes]
@@ -5,7 +5,7 @@ HTML Formatter for REDbot.
 import operator
 import re
 import time
-from typing import Any, List, Match, Tuple, Union
+from typing import Any, Dict, List, Match, Tuple, Union
 from urllib.parse import urljoin
 
 import thor.http.error as httperr
@@ -27,6 +27,11 @@ from redbot.resource import HttpResource, active_check
 __all__ = ["SingleEntryHtmlFormatter", "TableHtmlFormatter", "BaseHtmlFormatter"]
 
 
+# A quoted string in an escaped body sample. The string can't contain an entity (so it
+# can't run past its closing quote); the closing quote is left for the next string.
+QUOTED = re.compile(r"(&#34;|&#39;)(?=([^&]*))\2(?=\1)")
+
+
 class SingleEntryHtmlFormatter(BaseHtmlFormatter):
     """
     Present a single REDbot response in detail.
@@ -73,17 +78,15 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
     }
 
     name = "html"
+    template_filters = {
+        "header_present": "format_header",
+        "header_description": "format_header_description",
+        "subrequest_messages": "format_subrequest_messages",
+        "header_levels": "determine_header_levels",
+    }
 
     def __init__(self, *args: Unpack[FormatterArgs]) -> None:
         BaseHtmlFormatter.__init__(self, *args)
-        self.templates.filters.update(
-            {
-                "header_present": self.format_header,
-                "header_description": self.format_header_description,
-                "subrequest_messages": self.format_subrequest_messages,
-                "header_levels": self.determine_header_levels,
-            }
-        )
         self.header_presenter = HeaderPresenter(self)
 
     def finish_output(self) -> None:
@@ -156,43 +159,50 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
 
     def format_body_sample(self, resource: HttpResource) -> Markup:
         """show the stored body sample"""
-        sample = b"".join(resource.response_decoded_sample)
+        sample = resource.response_decoded_sample.getvalue()
         try:
             uni_sample = sample.decode(resource.response.character_encoding or "utf-8", "ignore")
         except (TypeError, LookupError):
             uni_sample = sample.decode("utf-8", "replace")
         safe_sample = escape(uni_sample)
         if self.config.getboolean("content_links", False):
-            for __, link_set in list(resource.links.items()):
-                for link in link_set:
-                    if len(link) > 8000:  # avoid processing inline assets through regex
-                        continue
-                    try:
-                        abs_link = urljoin(resource.response.base_uri, link)
-                    except ValueError:
-                        continue  # we're not interested in raising these upstream
-
-                    link_str = Markup(
-                        self.links.resource_link(
-                            resource,
-                            abs_link,
-                            escape(link),
-                            use_stored=False,
-                            css_class="nocode",
-                        )
-                    )
+            link_strs = self.content_link_markup(resource)
 
-                    def link_to(matchobj: Match[str], link_str: Markup = link_str) -> str:
-                        return rf"{matchobj.group(1)}{link_str}{matchobj.group(1)}"
+            def link_to(matchobj: Match[str]) -> str:
+                link_str = link_strs.get(matchobj.group(2), None)
+                if link_str is None:
+                    return matchobj.group(0)
+                return f"{matchobj.group(1)}{link_str}"
 
-                    safe_sample = Markup(
-                        re.sub(rf"(&#34;|&#39;){re.escape(link)}\1", link_to, safe_sample)
-                    )
+            if link_strs:
+                safe_sample = Markup(QUOTED.sub(link_to, safe_sample))
         message: Union[str, LazyProxy] = ""
-        if not resource.response_decoded_complete:
+        if resource.response_decoded_sample.truncated:
             message = _("<p class='btw'>REDbot isn't showing all content, because it's so big!</p>")
         return Markup(f"<pre class='prettyprint'>{safe_sample}</pre>\n{message}")
 
+    def content_link_markup(self, resource: HttpResource) -> Dict[str, Markup]:
+        "Return the markup to link each of resource's links with in its content."
+        link_strs = {}
+        for link_set in resource.links.values():
+            for link in link_set:
+                if len(link) > 8000 or link in link_strs:  # skip inline assets
+                    continue
+                try:
+                    abs_link = urljoin(resource.response.base_uri, link)
+                except ValueError:
+                    continue  # we're not interested in raising these upstream
+                link_strs[link] = Markup(
+                    self.links.resource_link(
+                        resource,
+                        abs_link,
+                        escape(link),
+                        use_stored=False,
+                        css_class="nocode",
+                    )
+                )
+        return link_strs
+
     def format_subrequest_messages(self, category: categories) -> Markup:
         out = []
         if isinstance(self.resource, HttpResource) and category in self.note_responses:
@@ -329,16 +339,14 @@ class TableHtmlFormatter(BaseHtmlFormatter):
 
     can_multiple = True
     name = "html"
+    template_filters = {
+        "index_problem": "index_problem",
+        "note_description": "format_note_description",
+    }
 
     def __init__(self, *args: Any, **kw: Any) -> None:
         BaseHtmlFormatter.__init__(self, *args, **kw)
         self.problems: List[Note] = []
-        self.templates.filters.update(
-            {
-                "index_problem": self.index_problem,
-                "note_description": self.format_note_description,
-            }
-        )
 
     def finish_output(self) -> None:
         self.final_status()
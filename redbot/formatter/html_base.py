@@ -1,10 +1,19 @@
 import json
 import os
 import time
+from configparser import SectionProxy
+from typing import Any, Callable, Dict
 from urllib.parse import urljoin, urlparse
 
 import httplint
-from jinja2 import Environment, PackageLoader, select_autoescape
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    PackageLoader,
+    pass_context,
+    select_autoescape,
+)
+from jinja2.runtime import Context
 from markupsafe import Markup, escape
 from typing_extensions import Unpack
 
@@ -12,6 +21,7 @@ import redbot
 from redbot.formatter import Formatter, FormatterArgs, f_num, relative_time
 from redbot.formatter.null_links import NullLinkGenerator
 from redbot.i18n import _, ngettext
+from redbot.note import note_render_cache
 from redbot.type import LinkGenerator
 from redbot.utils import (
     e_authority,
@@ -24,6 +34,7 @@ from redbot.utils import (
     e_url,
 )
 from redbot.webui.captcha import CAPTCHA_PROVIDERS
+from redbot.webui.static import static_assets
 
 __all__ = [
     "BaseHtmlFormatter",
@@ -42,11 +53,35 @@ __all__ = [
 NL = "\n"
 
 
+def formatter_filter(method: str) -> Callable[..., Any]:
+    """
+    Make a template filter that calls method on the formatter rendering the template.
+
+    The environment is shared by every formatter, so filters can't be bound to one.
+    """
+
+    @pass_context
+    def call_method(context: Context, *args: Any, **kw: Any) -> Any:
+        return getattr(context["formatter"], method)(*args, **kw)
+
+    return call_method
+
+
+@pass_context
+def static_url(context: Context, name: str) -> str:  # pylint: disable=unused-argument
+    """
+    The URL of the static asset name, relative to the static root. Passing the
+    context stops Jinja from working it out when the template is compiled.
+    """
+    return static_assets.url(name)
+
+
 class BaseHtmlFormatter(Formatter):
     """
     Base class for HTML formatters."""
 
     media_type = "text/html"
+    uses_progress_channel = True
     templates = Environment(
         loader=PackageLoader("redbot.formatter"),
         extensions=["jinja2.ext.i18n"],
@@ -57,15 +92,42 @@ class BaseHtmlFormatter(Formatter):
         ),
     )
     templates.install_gettext_callables(_, ngettext, newstyle=True)  # type: ignore[attr-defined]  # pylint: disable=no-member
+    templates.filters.update(
+        {
+            "f_num": f_num,
+            "relative_time": relative_time,
+            "note_summary": note_render_cache.summary,
+            "note_detail": note_render_cache.detail,
+            "static_url": static_url,
+        }
+    )
+    # filter name: formatter method, for filters that need the formatter.
+    template_filters: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kw: Any) -> None:
+        super().__init_subclass__(**kw)
+        cls.templates.filters.update(
+            {name: formatter_filter(method) for name, method in cls.template_filters.items()}
+        )
+
+    @classmethod
+    def setup_templates(cls, config: SectionProxy) -> int:
+        """
+        Compile all of the templates, so that the first requests don't have to, using
+        a bytecode cache in template_cache_dir if it's configured. Returns how many
+        templates there are.
+        """
+        cache_dir = config.get("template_cache_dir", "")
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            cls.templates.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        names = cls.templates.list_templates(extensions=["html"])
+        for name in names:
+            cls.templates.get_template(name)
+        return len(names)
 
     def __init__(self, *args: Unpack[FormatterArgs]) -> None:
         Formatter.__init__(self, *args)
-        self.templates.filters.update(
-            {
-                "f_num": f_num,
-                "relative_time": relative_time,
-            }
-        )
         captcha_provider = self.config.get("captcha_provider", "")
         captcha_data = CAPTCHA_PROVIDERS.get(captcha_provider, {})
         self.links: LinkGenerator = self.kw.get("link_generator") or NullLinkGenerator()
@@ -85,6 +147,7 @@ class BaseHtmlFormatter(Formatter):
             "captcha_provider": captcha_provider,
             "captcha_script_url": Markup(captcha_data.get("script_url", b"").decode("ascii")),
             "nonce": self.kw["nonce"],
+            "cached_at": self.kw.get("cached_at", None),
         }
         self.start = time.time()
 
@@ -145,11 +208,32 @@ class BaseHtmlFormatter(Formatter):
                         "extra_body_class": extra_body_class,
                         "descend": self.kw.get("descend", False),
                         "test_id": self.kw.get("test_id", ""),
+                        "progress_uri": (
+                            self.links.progress_link(self.kw["progress_id"])
+                            if self.kw.get("progress_id", None)
+                            else ""
+                        ),
                     },
                 )
             )
         )
 
+    def rerun_form(self) -> Markup:
+        "A form to run the test again, rather than showing a cached result."
+        # the headers the user asked for (not those REDbot added, like User-Agent), so that
+        # the fresh run replaces the cached one.
+        req_hdrs = self.kw.get("req_hdrs", [])
+        return Markup(
+            self.links.test_form(
+                str(_("re-run")),
+                [f"{name}:{value}" for (name, value) in req_hdrs],
+                self.resource.request.uri or "",
+                descend=self.kw.get("descend", False),
+                title=str(_("Run this test again, rather than showing cached results")),
+                fresh=True,
+            )
+        )
+
     def finish_output(self) -> None:
         """
         The bottom bits.
@@ -167,7 +251,9 @@ class BaseHtmlFormatter(Formatter):
         self.output(tpl.render(self.template_vars))
 
     def status(self, status: str) -> None:
-        "Update the status bar of the browser"
+        "Update the status bar of the browser, unless the page is following the progress channel."
+        if self.kw.get("progress_id", None):
+            return
         self.output(f"""
 <script nonce="{self.kw['nonce']}">
 <!-- {time.time() - self.start:3.3f}
@@ -177,7 +263,9 @@ document.querySelector('#red_status').textContent = "{escape(status)}"
 """)
 
     def debug(self, message: str) -> None:
-        "Debug to console."
+        "Debug to console, unless the page is following the progress channel."
+        if self.kw.get("progress_id", None):
+            return
         self.output(f"""
 <script nonce="{self.kw['nonce']}">
 <!--
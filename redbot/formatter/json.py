@@ -0,0 +1,144 @@
+"""
+JSON Formatter for REDbot.
+
+The document's layout is versioned by SCHEMA_VERSION; members may be added
+without changing it, but changing or removing one bumps it.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from httplint.note import Note
+
+from redbot import __version__
+from redbot.formatter import Formatter
+from redbot.note import note_render_cache
+from redbot.resource import HttpResource
+from redbot.resource.fetch import RedFetcher
+
+SCHEMA_VERSION = 1
+
+
+class JsonFormatter(Formatter):
+    """
+    Format a HttpResource object (and any descendants) as a JSON document.
+    """
+
+    can_multiple = True
+    name = "json"
+    media_type = "application/json"
+
+    def start_output(self) -> None:
+        pass
+
+    def feed(self, sample: bytes) -> None:
+        pass
+
+    def status(self, status: str) -> None:
+        pass
+
+    def finish_output(self) -> None:
+        self.output(dumps(resource_document(self.resource), self.kw.get("compact", False)))
+
+    def error_output(self, message: str) -> None:
+        self.output(
+            dumps(
+                {"schema": SCHEMA_VERSION, "redbot_version": __version__, "error": message},
+                self.kw.get("compact", False),
+            )
+        )
+
+
+def dumps(value: Any, compact: bool = True) -> str:
+    "Serialise value as JSON; parsed header values that JSON can't represent become strings."
+    if compact:
+        return json.dumps(value, separators=(",", ":"), default=str)
+    return json.dumps(value, indent=4, default=str)
+
+
+def resource_document(resource: HttpResource) -> Dict[str, Any]:
+    "Return the results for a finished HttpResource as a versioned JSON document."
+    document: Dict[str, Any] = {"schema": SCHEMA_VERSION, "redbot_version": __version__}
+    document.update(resource_record(resource))
+    return document
+
+
+def resource_record(resource: RedFetcher, nested: bool = True) -> Dict[str, Any]:
+    """
+    Summarise a RedFetcher's results as a JSON-serialisable dict.
+
+    If nested is True and resource is a HttpResource, its active check
+    subrequests and linked resources are included too.
+    """
+    record: Dict[str, Any] = {
+        "uri": resource.request.uri,
+        "method": resource.request.method,
+        "status": resource.response.status_code if resource.response.complete else None,
+        "error": fetch_error(resource),
+        "request": {"headers": resource.request.headers.text},
+        "response": response_record(resource),
+        "timings": resource.timings.phases() if resource.timings is not None else None,
+        "notes": [note_record(note) for note in resource.response.notes],
+    }
+    if nested and isinstance(resource, HttpResource):
+        record["subrequests"] = {
+            check_id: subrequest_record(check)
+            for check_id, check in resource.subreqs.items()
+            if check.fetch_started
+        }
+        if resource.descend:
+            linked: List[Dict[str, Any]] = []
+            for linked_resource, tag in resource.linked:
+                linked_record = resource_record(linked_resource)
+                linked_record["tag"] = tag
+                linked.append(linked_record)
+            record["linked"] = linked
+    return record
+
+
+def subrequest_record(check: RedFetcher) -> Dict[str, Any]:
+    "Summarise an active check's subrequest; notes about it are on the resource it checks."
+    record = resource_record(check, nested=False)
+    record["check_name"] = str(check.check_name)
+    record["discarded"] = getattr(check, "discarded", False)
+    return record
+
+
+def response_record(resource: RedFetcher) -> Optional[Dict[str, Any]]:
+    "Summarise a RedFetcher's response, or return None if it didn't complete."
+    response = resource.response
+    if not response.complete:
+        return None
+    return {
+        "version": response.version,
+        "status": response.status_code,
+        "phrase": response.status_phrase,
+        "headers": response.headers.text,
+        "parsed_headers": response.headers.parsed,
+        "content_length": response.content_length,
+        "decoded_length": response.decoded.length,
+    }
+
+
+def fetch_error(resource: RedFetcher) -> Optional[str]:
+    "Describe the error that stopped a fetch, if there was one."
+    if not resource.fetch_error:
+        return None
+    error: str = resource.fetch_error.desc
+    if resource.fetch_error.detail:
+        error += f" ({resource.fetch_error.detail})"
+    return error
+
+
+def note_record(note: Note) -> Dict[str, Any]:
+    "Summarise a note as a JSON-serialisable dict."
+    record: Dict[str, Any] = {
+        "note_id": note.__class__.__name__,
+        "subject": note.subject,
+        "category": note.category.name,
+        "level": note.level.name,
+        "summary": note_render_cache.summary(note),
+    }
+    if note.subnotes:
+        record["subnotes"] = [note_record(subnote) for subnote in note.subnotes]
+    return record
@@ -0,0 +1,117 @@
+"""
+NDJSON Formatter for REDbot.
+"""
+
+from functools import partial
+from typing import Any, Counter, Set
+
+from typing_extensions import Unpack
+
+from redbot import __version__
+from redbot.formatter import Formatter, FormatterArgs
+from redbot.formatter.json import SCHEMA_VERSION, dumps, fetch_error, resource_record
+from redbot.resource.fetch import RedFetcher
+
+
+class NdjsonFormatter(Formatter):
+    """
+    Stream events about a HttpResource check as newline-delimited JSON.
+
+    Each line is an object with an "event" member:
+
+    - "start": the check has started (with schema, redbot_version and uri)
+    - "status": a status message
+    - "resource": a fetch is done; role is "resource", "check" or "linked",
+      and the rest is the same as a JSON formatter record, without nesting
+    - "summary": the check is done, with counts of resources and notes by level
+    - "error": the check failed
+    """
+
+    can_multiple = True
+    name = "ndjson"
+    media_type = "application/x-ndjson"
+
+    def __init__(self, *args: Unpack[FormatterArgs]) -> None:
+        Formatter.__init__(self, *args)
+        self._started = False
+        self._finished = False
+        self._written: Set[RedFetcher] = set()
+        self.levels: Counter[str] = Counter()
+
+    def start_output(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        self.event(
+            "start",
+            schema=SCHEMA_VERSION,
+            redbot_version=__version__,
+            uri=self.resource.request.uri,
+        )
+        self.watch(self.resource, "resource")
+        for check in self.resource.subreqs.values():
+            self.watch(check, "check")
+        if self.resource.fetch_done:
+            self.watch_linked()
+        else:
+            self.resource.once("fetch_done", self._wrap_context(self.watch_linked))
+
+    def feed(self, sample: bytes) -> None:
+        pass
+
+    def status(self, status: str) -> None:
+        if not self._finished:
+            self.event("status", message=str(status))
+
+    def finish_output(self) -> None:
+        self.start_output()
+        for linked_resource in self.resource.linked_resources():
+            self.write_resource(linked_resource, "linked")
+        if self._finished:
+            return
+        self._finished = True
+        self.event(
+            "summary",
+            uri=self.resource.request.uri,
+            status=(
+                self.resource.response.status_code if self.resource.response.complete else None
+            ),
+            error=fetch_error(self.resource),
+            resources=len(self._written),
+            notes=dict(self.levels),
+        )
+
+    def error_output(self, message: str) -> None:
+        if not self._finished:
+            self._finished = True
+            self.event("error", message=message)
+
+    def watch(self, fetcher: RedFetcher, role: str) -> None:
+        "Write an event for fetcher when it's done."
+        if fetcher.fetch_done:
+            self.write_resource(fetcher, role)
+        else:
+            fetcher.once(
+                "fetch_done", self._wrap_context(partial(self.write_resource, fetcher, role))
+            )
+
+    def watch_linked(self) -> None:
+        for linked_resource in self.resource.linked_resources():
+            self.watch(linked_resource, "linked")
+
+    def write_resource(self, fetcher: RedFetcher, role: str) -> None:
+        "Write an event for fetcher, unless it's already been written, or is a skipped check."
+        if self._finished or fetcher in self._written:
+            return
+        if role == "check" and (not fetcher.fetch_started or getattr(fetcher, "discarded", False)):
+            return
+        self._written.add(fetcher)
+        record = resource_record(fetcher, nested=False)
+        if role == "check":
+            record["check_name"] = str(fetcher.check_name)
+        self.levels.update(note.level.name for note in fetcher.response.notes)
+        self.event("resource", role=role, **record)
+
+    def event(self, name: str, **members: Any) -> None:
+        "Write an event line."
+        self.output(dumps({"event": name, **members}) + "\n")
@@ -22,6 +22,9 @@ class NullLinkGenerator:
     def client_error_link(self) -> str:
         return ""
 
+    def progress_link(self, channel_id: str) -> str:
+        return ""
+
     def home_link(self, absolute: bool = False) -> str:
         return ""
 
@@ -35,6 +38,7 @@ class NullLinkGenerator:
         descend: bool = False,
         css_class: str = "",
         title: str = "",
+        fresh: bool = False,
     ) -> str:
         return ""
 
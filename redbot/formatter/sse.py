@@ -0,0 +1,61 @@
+"""
+Server-Sent Events Formatter for REDbot.
+"""
+
+from redbot.formatter import Formatter
+from redbot.formatter.json import dumps, fetch_error
+
+
+class SseFormatter(Formatter):
+    """
+    Stream the progress of a HttpResource check as Server-Sent Events.
+
+    Status updates are "status" events, and debug messages (when the debug
+    configuration option is set) are "debug" events. When the check is done,
+    a "done" event carries a JSON object with its test_id, status and error.
+
+    The Web UI's results pages follow their test with this formatter through
+    ProgressHandler; it can also be asked for directly with format=sse, which
+    runs a test (so over EventSource, clients should close the connection on
+    "done", or it will reconnect and run the test again).
+    """
+
+    can_multiple = True
+    name = "sse"
+    media_type = "text/event-stream"
+
+    def start_output(self) -> None:
+        pass
+
+    def feed(self, sample: bytes) -> None:
+        pass
+
+    def status(self, status: str) -> None:
+        self.event("status", str(status))
+
+    def debug(self, message: str) -> None:
+        self.event("debug", message)
+
+    def finish_output(self) -> None:
+        self.event(
+            "done",
+            dumps(
+                {
+                    "test_id": self.kw.get("test_id", None),
+                    "status": (
+                        self.resource.response.status_code
+                        if self.resource.response.complete
+                        else None
+                    ),
+                    "error": fetch_error(self.resource),
+                }
+            ),
+        )
+
+    def error_output(self, message: str) -> None:
+        self.event("error", message)
+
+    def event(self, name: str, data: str) -> None:
+        "Write an event."
+        lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+        self.output(f"event: {name}\n{lines}\n")
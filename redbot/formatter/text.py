@@ -13,9 +13,11 @@ from httplint import HttpResponseLinter
 from httplint.note import Note, categories, levels
 from typing_extensions import Unpack
 
-from redbot.formatter import Formatter, FormatterArgs
+from redbot.formatter import Formatter, FormatterArgs, relative_time
 from redbot.i18n import _
+from redbot.note import note_render_cache
 from redbot.resource import HttpResource
+from redbot.resource.fetch import RedFetcher
 
 NL = "\n"
 
@@ -38,6 +40,15 @@ class BaseTextFormatter(Formatter):
 
     error_template = _("Error: %s\n")
 
+    timing_phases = [
+        ("blocked", _("queued")),
+        ("dns", _("DNS")),
+        ("connect", _("connect")),
+        ("ssl", _("TLS")),
+        ("wait", _("wait")),
+        ("receive", _("receive")),
+    ]
+
     def __init__(self, *args: Unpack[FormatterArgs]) -> None:
         Formatter.__init__(self, *args)
         self.verbose = False
@@ -53,6 +64,8 @@ class BaseTextFormatter(Formatter):
 
     def finish_output(self) -> None:
         "Fill in the template with RED's results."
+        if self.kw.get("cached_at", None):
+            self.output(_("Cached %s") % relative_time(self.kw["cached_at"]) + NL + NL)
         if self.resource.response.complete or self.resource.nonfinal_responses:
             if self.resource.nonfinal_responses:
                 self.output(
@@ -62,6 +75,9 @@ class BaseTextFormatter(Formatter):
                 )
             if self.resource.response.complete:
                 self.output(self.format_headers(self.resource.response) + NL + NL)
+                timings = self.format_timings(self.resource)
+                if timings:
+                    self.output(timings + NL)
             elif isinstance(self.resource.fetch_error, httperr.HttpError):
                 self.output(
                     self.error_template % self._format_fetch_error(self.resource.fetch_error)
@@ -92,6 +108,37 @@ class BaseTextFormatter(Formatter):
         out = [f"HTTP/{response.version} {response.status_code_str} {response.status_phrase}"]
         return NL.join(out + [f"{h[0]}:{h[1]}" for h in response.headers.text])
 
+    def format_timings(self, resource: HttpResource) -> str:
+        out = []
+        fetchers: List[RedFetcher] = [resource]
+        if self.verbose:
+            fetchers.extend(sub for sub in resource.subreqs.values() if sub.fetch_started)
+        for fetcher in fetchers:
+            timings = self.format_fetch_timings(fetcher)
+            if timings:
+                out.append(
+                    f"{fetcher.check_name}: {timings}" if fetcher is not resource else timings
+                )
+        if not out:
+            return ""
+        return f"{_('Timings')}:{NL}" + NL.join(f"  {line}" for line in out) + NL
+
+    def format_fetch_timings(self, fetcher: RedFetcher) -> str:
+        if fetcher.timings is None:
+            return ""
+        phases = fetcher.timings.phases()
+        out = ", ".join(
+            f"{label} {phases[phase]} ms"
+            for phase, label in self.timing_phases
+            if phases[phase] >= 0
+        )
+        if fetcher.deadlines:
+            deadlines = " / ".join(
+                f"{kind} {seconds:g} s" for kind, seconds in fetcher.deadlines.items()
+            )
+            out += f" ({_('deadlines')}: {deadlines})"
+        return out
+
     def format_recommendations(self, resource: HttpResource) -> str:
         return "".join(
             [self.format_recommendation(resource, category) for category in self.note_categories]
@@ -105,13 +152,15 @@ class BaseTextFormatter(Formatter):
         if list(notes):
             out.append(f"* {category.value}:")
         for note in notes:
-            out.append(f"  * {self.colorize(note.level, note.summary)}")
+            out.append(f"  * {self.colorize(note.level, note_render_cache.summary(note))}")
             if self.verbose:
                 out.append("")
                 out.extend("    " + line for line in self.format_text(note))
                 out.append("")
             for subnote in note.subnotes:
-                out.append(f"    * {self.colorize(subnote.level, subnote.summary)}")
+                out.append(
+                    f"    * {self.colorize(subnote.level, note_render_cache.summary(subnote))}"
+                )
                 if self.verbose:
                     out.append("")
                     out.extend("      " + line for line in self.format_text(subnote))
@@ -121,7 +170,7 @@ class BaseTextFormatter(Formatter):
 
     @staticmethod
     def format_text(note: Note) -> List[str]:
-        return textwrap.wrap(strip_tags(re.sub(r"(?m)\s\s+", " ", note.detail)))
+        return textwrap.wrap(strip_tags(re.sub(r"(?m)\s\s+", " ", note_render_cache.detail(note))))
 
     def colorize(self, level: Optional[levels], instr: str) -> str:
         if self.kw.get("tty_out", False):
@@ -0,0 +1,22 @@
+"""
+Process-wide counters for REDbot.
+
+Components that keep caches or queues register a function that returns their
+current counters; the daemon dumps a snapshot of them all in debug mode.
+"""
+
+from typing import Callable, Dict
+
+MetricsSource = Callable[[], Dict[str, int]]
+
+_sources: Dict[str, MetricsSource] = {}
+
+
+def register(name: str, source: MetricsSource) -> None:
+    "Register a function returning the counters for name. Replaces any existing one."
+    _sources[name] = source
+
+
+def snapshot() -> Dict[str, Dict[str, int]]:
+    "Return the current counters from every registered source."
+    return {name: source() for name, source in sorted(_sources.items())}
@@ -1,9 +1,13 @@
+from collections import OrderedDict
+from configparser import SectionProxy
 from threading import local
+from typing import Any, Callable, Dict, Hashable, Tuple
 
 from httplint.note import Note
 from markdown import Markdown
 from markupsafe import Markup, escape
 
+from redbot import metrics
 from redbot.i18n import _, get_locale
 
 
@@ -14,7 +18,8 @@ class _MdLocal(local):
 _md_local = _MdLocal()
 
 
-def _markdown() -> Markdown:
+def shared_markdown() -> Markdown:
+    "Return a Markdown converter for this thread; reset() it before each use."
     if not hasattr(_md_local, "md"):
         _md_local.md = Markdown(output_format="html")
     return _md_local.md
@@ -37,7 +42,7 @@ class RedbotNote(Note):
     def _get_detail(self) -> Markup:
         try:
             return Markup(
-                _markdown()
+                shared_markdown()
                 .reset()
                 .convert(_(self._text) % {k: escape(str(v)) for k, v in self.vars.items()})
             )
@@ -49,3 +54,64 @@ class RedbotNote(Note):
 
     summary = property(_get_summary)
     detail = property(_get_detail)
+
+
+class NoteRenderCache:
+    """
+    Rendered note summaries and details, by note class, locale and vars.
+
+    Rendering a detail runs it through Markdown, and result pages show the same
+    notes (and read each one) many times over. Formatters read summary and
+    detail through here instead of from the note.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def setup(self, config: SectionProxy) -> None:
+        """Configure from config."""
+        self.max_entries = config.getint("note_render_cache", fallback=4096)
+
+    def summary(self, note: Note) -> str:
+        "Return note's summary."
+        summary: str = self._render("summary", note, lambda: note.summary)
+        return summary
+
+    def detail(self, note: Note) -> Markup:
+        "Return note's detail, as HTML."
+        detail: Markup = self._render("detail", note, lambda: note.detail)
+        return detail
+
+    def _render(self, kind: str, note: Note, render: Callable[[], Any]) -> Any:
+        if not self.max_entries:
+            return render()
+        key = (kind, note.__class__, get_locale(), self._vars_key(note.vars))
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        value = render()
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _vars_key(note_vars: Dict[str, Any]) -> Tuple[Tuple[str, type, str], ...]:
+        return tuple(sorted((name, type(value), str(value)) for name, value in note_vars.items()))
+
+    def clear(self) -> None:
+        "Forget everything."
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the cache."""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+note_render_cache = NoteRenderCache()
+metrics.register("note_render", note_render_cache.stats)
@@ -11,14 +11,22 @@ See webui.py for the Web front-end.
 
 import sys
 from configparser import SectionProxy
+from functools import partial
 from typing import Dict, List, Optional, Set, Tuple, Union
 from urllib.parse import urljoin
 
 import thor
+import thor.http.error as httperr
 
 from redbot.resource import link_parse
 from redbot.resource.active_check import active_checks
+from redbot.resource.active_check.base import NEEDS_HEADERS, NEEDS_REQUEST
+from redbot.resource.budget import TEST_BUDGET_EXCEEDED, BudgetExceededError, FetchBudget
 from redbot.resource.fetch import RedFetcher
+from redbot.resource.governor import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from redbot.resource.link_pool import PooledLinkFeed, link_parse_pool
+from redbot.resource.schedule import LinkScheduler
+from redbot.utils import canonical_uri
 
 
 class HttpResource(RedFetcher):
@@ -30,7 +38,18 @@ class HttpResource(RedFetcher):
     its notes; see that class for details.
 
     if descend is true, the response will be parsed for links and HttpResources started for each
-    link, enumerated in .linked.
+    link, enumerated in .linked. A URL linked from several tags (or spelt several ways) is only
+    fetched once; it appears in .linked once for each tag.
+
+    If budget is provided, the resource's fetches count against it; otherwise, it
+    gets a new one (from config) that its subrequests and linked resources will share.
+
+    With speculative_checks configured, active checks that don't need the whole
+    response are started as soon as what they do need is available; see
+    _start_early_checks.
+
+    With link_parse_workers configured, links are parsed in a thread pool (see
+    link_pool), and the resource isn't done until they all have been.
 
     Emits "check_done" when everything has finished.
     """
@@ -38,8 +57,15 @@ class HttpResource(RedFetcher):
     check_name = "default"
     check_id = "default"
 
-    def __init__(self, config: SectionProxy, descend: bool = False) -> None:
+    def __init__(
+        self, config: SectionProxy, descend: bool = False, budget: Optional[FetchBudget] = None
+    ) -> None:
         RedFetcher.__init__(self, config)
+        self._owns_budget = budget is None
+        if budget is not None:
+            self.budget = budget
+        else:
+            self.budget.on("exceeded", self._budget_exceeded)
         self.descend: bool = descend
         self.check_done: bool = False
         self.partial_support: bool = False
@@ -48,26 +74,126 @@ class HttpResource(RedFetcher):
         self.gzip_support: bool = False
         self.gzip_savings: int = 0
         self._task_map: Set[RedFetcher] = set([])
+        self._stopping: bool = False
         self.subreqs = {ac.check_id: ac(config, self) for ac in active_checks}
         self.once("fetch_done", self.run_active_checks)
+        self.once("response_headers_available", self._headers_available)
 
         self.links: Dict[str, Set[str]] = {}
         self.link_count: int = 0
         self.linked: List[Tuple[HttpResource, str]] = []  # linked HttpResources
-        self._link_parser = link_parse.HTMLLinkParser(self.response, [self.process_link])
+        self._linked_uris: Dict[str, HttpResource] = {}  # canonical URI -> HttpResource
+        self._linked_tags: Set[Tuple[str, str]] = set()  # (canonical URI, tag)
+        self._link_scheduler: Optional[LinkScheduler] = None
+        self._link_parser = link_parse.get_link_parser(config)(self.response, [self.process_link])
+        self._link_feed: Optional[PooledLinkFeed] = None
+        self._links_pending: bool = False
         if self.descend or config.getboolean("content_links", False):
-            self.response.decoded.processors.append(self._link_parser.feed_bytes)
+            if link_parse_pool.enabled:
+                self._link_feed = link_parse_pool.feed(self._link_parser, self._pooled_link)
+                self.response.decoded.processors.append(self._link_feed.feed_bytes)
+            else:
+                self.response.decoded.processors.append(self._link_parser.feed_bytes)
+
+    def check(self) -> None:
+        RedFetcher.check(self)
+        if not self.fetch_done:
+            self._start_early_checks(NEEDS_REQUEST)
+
+    def fetch_priority(self) -> int:
+        if self._owns_budget:
+            return PRIORITY_INTERACTIVE
+        return PRIORITY_BACKGROUND
+
+    def _headers_available(self) -> None:
+        self._start_early_checks(NEEDS_HEADERS)
+
+    def _start_early_checks(self, needs: str) -> None:
+        """
+        If configured, start the active checks that only need what's available
+        now, rather than waiting for the response to finish. They don't process
+        their responses until it has, and discard them if it makes them moot.
+        """
+        if self._stopping or not self.config.getboolean("speculative_checks", fallback=False):
+            return
+        if self.config.getboolean("connection_reuse", fallback=False):
+            return
+        checks = [check for check in self.subreqs.values() if check.needs == needs]
+        for active_check in checks:
+            active_check.speculative = True
+        self.add_check(*checks)
+        for active_check in checks:
+            active_check.check()
 
     def run_active_checks(self) -> None:
         """
         Response is available; perform subordinate requests (e.g., conneg check).
         """
+        if self._link_feed is not None and self._link_feed.busy:
+            # links are still being parsed in the pool; don't finish until they're in.
+            self._links_pending = True
+            self._link_feed.when_done(self._links_parsed)
         if self.response.complete:
-            for active_check in list(self.subreqs.values()):
-                self.add_check(active_check)
-                active_check.check()
+            checks: List[RedFetcher] = [
+                check for check in self.subreqs.values() if not check.speculative
+            ]
+            # register them all first, so that one finishing early doesn't finish us.
+            self.add_check(*checks)
+            if self.config.getboolean("connection_reuse", fallback=False):
+                self._run_serially(checks)
+            else:
+                for active_check in checks:
+                    active_check.check()
         else:
-            self.finish_check()
+            for early_check in self.subreqs.values():
+                if early_check.speculative and not early_check.fetch_done:
+                    early_check.stop()
+            if not self.check_done:
+                self.finish_check()
+
+    def _run_serially(self, checks: List[RedFetcher]) -> None:
+        """
+        Run checks one after another, so that each can pick up the connection that
+        the previous request left idle, rather than opening a new one.
+        """
+        while checks and not self._stopping:
+            active_check = checks.pop(0)
+            if active_check.fetch_done:
+                continue
+            if checks:
+                active_check.once("fetch_done", partial(self._run_serially, checks))
+            active_check.check()
+            return
+
+    def connection_counts(self) -> Dict[str, int]:
+        """
+        Return how many of the connections used by this test (including subrequests and
+        linked resources) were newly opened, and how many were reused.
+        """
+        counts = {"new": 0, "reused": 0}
+        fetchers: List[RedFetcher] = [self]
+        fetchers.extend(self.subreqs.values())
+        for fetcher in fetchers:
+            if fetcher.conn_reused is not None:
+                counts["reused" if fetcher.conn_reused else "new"] += 1
+        for linked in self.linked_resources():
+            for kind, count in linked.connection_counts().items():
+                counts[kind] += count
+        return counts
+
+    @property
+    def link_scheduler(self) -> LinkScheduler:
+        "The scheduler for checks of this resource's links."
+        if self._link_scheduler is None:
+            self._link_scheduler = LinkScheduler(
+                self.config.getint("max_link_checks", fallback=8),
+                self.config.getint("max_link_checks_per_origin", fallback=2),
+            )
+        return self._link_scheduler
+
+    def linked_resources(self) -> List["HttpResource"]:
+        "Return the linked resources, once each."
+        return list(self._linked_uris.values())
 
     def descendable(self) -> bool:
         """
@@ -108,8 +234,26 @@ class HttpResource(RedFetcher):
                 raise KeyError(f"* Can't find {resource} in task map: {self._task_map}") from None
         tasks_left = len(self._task_map)
         #        self.emit("debug", "%s checks remaining: %i" % (repr(self), tasks_left))
-        if tasks_left == 0:
+        if tasks_left == 0 and not self._links_pending:
             self.check_done = True
+            if self._owns_budget and self.budget.exceeded:
+                self.response.notes.add(
+                    "", TEST_BUDGET_EXCEEDED, limit=self.budget.describe_limit()
+                )
+            counts = self.connection_counts()
+            self.emit(
+                "debug",
+                f"{self.request.uri}: {counts['new']} new connections, "
+                f"{counts['reused']} reused",
+            )
+            if self._link_scheduler is not None:
+                stats = self._link_scheduler.stats()
+                self.emit(
+                    "debug",
+                    f"{self.request.uri}: {stats['started']} linked checks, "
+                    f"at most {stats['max_queued']} queued, "
+                    f"waiting {stats['mean_wait']:.2f}s on average ({stats['max_wait']:.2f}s max)",
+                )
             self.emit("check_done")
 
     def show_task_map(self, watch: bool = False) -> Union[str, None]:
@@ -133,17 +277,48 @@ class HttpResource(RedFetcher):
                 self.response.base_uri = base
             return
         if self.descend and tag not in ["a"] and link not in self.links[tag]:
-            linked = HttpResource(self.config)
-            linked.set_request(urljoin(base, link), headers=self.request.headers.text)
-            self.linked.append((linked, tag))
-            self.add_check(linked)
-            linked.check()
+            uri = urljoin(base, link)
+            canonical = canonical_uri(uri)
+            linked = self._linked_uris.get(canonical, None)
+            is_new = linked is None
+            if linked is None:
+                linked = HttpResource(self.config, budget=self.budget)
+                linked.set_request(uri, headers=self.request.headers.text)
+                self._linked_uris[canonical] = linked
+            if (canonical, tag) not in self._linked_tags:
+                self._linked_tags.add((canonical, tag))
+                self.linked.append((linked, tag))
+            if is_new:
+                self.add_check(linked)
+                self.link_scheduler.submit(linked)
         self.links[tag].add(link)
         if not self.response.base_uri:
             self.response.base_uri = base
 
-    def stop(self) -> None:
+    def _pooled_link(self, base: str, link: str, tag: str, title: str) -> None:
+        "Handle a link parsed in the pool."
+        if not self._stopping:
+            self.process_link(base, link, tag, title)
+
+    def _links_parsed(self) -> None:
+        "The pool has finished parsing our content."
+        self._links_pending = False
+        if not self._task_map and not self.check_done:
+            self.finish_check()
+
+    @property
+    def stopped(self) -> bool:
+        "Whether the resource was stopped before it finished."
+        return self._stopping
+
+    def _budget_exceeded(self, limit: str) -> None:
+        "The test has hit a limit; stop everything that's still going."
+        self.emit("debug", f"{self.request.uri}: test budget exceeded ({limit})")
+        thor.schedule(0, self.stop, BudgetExceededError(self.budget.describe_limit()))
+
+    def stop(self, error: Optional[httperr.HttpError] = None) -> None:
         "Stop the resource and any sub-resources."
+        self._stopping = True
         for task in list(self._task_map):
-            task.stop()
-        RedFetcher.stop(self)
+            task.stop(error)
+        RedFetcher.stop(self, error)
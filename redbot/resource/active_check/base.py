@@ -18,6 +18,11 @@ from redbot.type import StrHeaderListType
 if TYPE_CHECKING:
     from redbot.resource import HttpResource
 
+# What a check needs from the base resource before it can start.
+NEEDS_REQUEST = "request"  # just the base request
+NEEDS_HEADERS = "headers"  # the base response headers
+NEEDS_CONTENT = "content"  # the base response content (or a sample of it)
+
 
 class SubRequest(RedFetcher, metaclass=ABCMeta):
     """
@@ -27,12 +32,16 @@ class SubRequest(RedFetcher, metaclass=ABCMeta):
 
     check_name = "undefined"
     check_id = "undefined"
+    needs = NEEDS_CONTENT
 
     def __init__(self, config: SectionProxy, base_resource: "HttpResource") -> None:
         self.config = config
         self.base: "HttpResource" = base_resource
         RedFetcher.__init__(self, config)
+        self.budget = base_resource.budget
         self.check_done = False
+        self.speculative = False
+        self.discarded = False
         self.on("fetch_done", self._check_done)
 
     @abstractmethod
@@ -41,7 +50,13 @@ class SubRequest(RedFetcher, metaclass=ABCMeta):
         raise NotImplementedError
 
     def _check_done(self) -> None:
-        if self.preflight():
+        if not self.base.fetch_done:
+            # started speculatively; the base response is needed to make sense of this one.
+            self.base.once("fetch_done", self._check_done)
+            return
+        if self.speculative and (not self.base.response.complete or self.moot()):
+            self.discarded = True
+        elif self.preflight():
             self.done()
         self.check_done = True
         self.emit("check_done")
@@ -59,6 +74,13 @@ class SubRequest(RedFetcher, metaclass=ABCMeta):
         )
         RedFetcher.check(self)
 
+    def moot(self) -> bool:
+        """
+        Whether the base response means that this check, having been started before
+        it arrived, won't tell us anything useful. May be overridden.
+        """
+        return False
+
     @abstractmethod
     def modify_request_headers(self, base_headers: StrHeaderListType) -> StrHeaderListType:
         """Usually overridden; modifies the request headers."""
@@ -7,7 +7,7 @@ from httplint.note import categories, levels
 from redbot.formatter import f_num
 from redbot.i18n import _
 from redbot.note import RedbotNote
-from redbot.resource.active_check.base import SubRequest
+from redbot.resource.active_check.base import NEEDS_REQUEST, SubRequest
 from redbot.type import StrHeaderListType
 
 
@@ -19,6 +19,7 @@ class ConnegCheck(SubRequest):
     check_name = _("Content Negotiation")
     check_id = "conneg"
     response_phrase = _("The compressed response")
+    needs = NEEDS_REQUEST
 
     def modify_request_headers(self, base_headers: StrHeaderListType) -> StrHeaderListType:
         return [h for h in base_headers if h[0].lower() != "accept-encoding"] + [
@@ -32,6 +33,10 @@ class ConnegCheck(SubRequest):
             return False
         return True
 
+    def moot(self) -> bool:
+        status = self.base.response.status_code
+        return status is not None and (status == 206 or 300 <= status <= 399)
+
     def done(self) -> None:
         negotiated = self.response
         bare = self.base.response
@@ -94,20 +99,21 @@ class ConnegCheck(SubRequest):
             if not negotiated.decoded.decode_ok:
                 return
 
-            # check body
-            if bare.content_hash != negotiated.decoded.hash:
+            # check body, unless we only have part of it
+            truncated = self.content_truncated or self.base.content_truncated
+            if not truncated and bare.content_hash != negotiated.decoded.hash:
                 self.add_notes("body", VARY_BODY_MISMATCH)
 
             # check compression efficiency
-            if negotiated.content_length > 0 and bare.content_length > 0:
-                savings = int(
-                    100
-                    * (
-                        (float(bare.content_length) - negotiated.content_length)
-                        / bare.content_length
-                    )
-                )
-            elif negotiated.content_length > 0 and bare.content_length == 0:
+            bare_length = self.base.full_content_length
+            negotiated_length = self.full_content_length
+            if bare_length is None or negotiated_length is None:
+                # we don't know how big the whole responses are.
+                self.base.gzip_support = True
+                return
+            if negotiated_length > 0 and bare_length > 0:
+                savings = int(100 * ((float(bare_length) - negotiated_length) / bare_length))
+            elif negotiated_length > 0 and bare_length == 0:
                 # weird.
                 return
             else:
@@ -119,16 +125,16 @@ class ConnegCheck(SubRequest):
                     "field-content-encoding",
                     CONNEG_GZIP_GOOD,
                     savings=savings,
-                    orig_size=f_num(bare.content_length),
-                    gzip_size=f_num(negotiated.content_length),
+                    orig_size=f_num(bare_length),
+                    gzip_size=f_num(negotiated_length),
                 )
             else:
                 self.add_base_note(
                     "field-content-encoding",
                     CONNEG_GZIP_BAD,
                     savings=abs(savings),
-                    orig_size=f_num(bare.content_length),
-                    gzip_size=f_num(negotiated.content_length),
+                    orig_size=f_num(bare_length),
+                    gzip_size=f_num(negotiated_length),
                 )
 
 
@@ -6,7 +6,7 @@ from httplint.note import categories, levels
 
 from redbot.i18n import _
 from redbot.note import RedbotNote
-from redbot.resource.active_check.base import MISSING_HDRS_304, SubRequest
+from redbot.resource.active_check.base import MISSING_HDRS_304, NEEDS_HEADERS, SubRequest
 from redbot.type import StrHeaderListType
 
 
@@ -18,6 +18,7 @@ class ETagValidate(SubRequest):
     check_name = _("ETag Validation")
     check_id = "etag_validate"
     response_phrase = _("The ETag validation response")
+    needs = NEEDS_HEADERS
     _validate_hdrs = set(
         [
             "if-modified-since",
@@ -70,7 +71,7 @@ class ETagValidate(SubRequest):
                 MISSING_HDRS_304,
             )
         elif self.response.status_code == self.base.response.status_code:
-            if self.response.content_hash == self.base.response.content_hash:
+            if self.same_content(self.base):
                 self.base.inm_support = False
                 self.add_notes("field-etag", INM_FULL)
             else:  # bodies are different
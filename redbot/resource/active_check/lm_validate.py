@@ -8,7 +8,7 @@ from httplint.note import categories, levels
 
 from redbot.i18n import _
 from redbot.note import RedbotNote
-from redbot.resource.active_check.base import MISSING_HDRS_304, SubRequest
+from redbot.resource.active_check.base import MISSING_HDRS_304, NEEDS_HEADERS, SubRequest
 from redbot.type import StrHeaderListType
 
 
@@ -20,6 +20,7 @@ class LmValidate(SubRequest):
     check_name = _("Last-Modified Validation")
     check_id = "lm_validate"
     response_phrase = _("The Last-Modified validation response")
+    needs = NEEDS_HEADERS
     _weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     _months = [
         None,
@@ -90,7 +91,7 @@ class LmValidate(SubRequest):
                 MISSING_HDRS_304,
             )
         elif self.response.status_code == self.base.response.status_code:
-            if self.response.content_hash == self.base.response.content_hash:
+            if self.same_content(self.base):
                 self.base.ims_support = False
                 self.add_notes("field-last-modified", IMS_FULL)
             else:
@@ -36,13 +36,12 @@ class RangeRequest(SubRequest):
         SubRequest.__init__(self, config, resource)
 
     def modify_request_headers(self, base_headers: StrHeaderListType) -> StrHeaderListType:
-        samples = [s for s in self.base.response_content_sample if s[1]]
-        if samples:
-            sample_num = random.randint(0, len(samples) - 1)
-            sample_len = min(96, len(samples[sample_num][1]))
-            self.range_start = samples[sample_num][0]
-            self.range_end = self.range_start + sample_len
-            self.range_target = samples[sample_num][1][: sample_len + 1]
+        sample = self.base.response_content_sample.getvalue()
+        if sample:
+            sample_len = min(97, len(sample))
+            self.range_start = random.randint(0, len(sample) - sample_len)
+            self.range_end = self.range_start + sample_len - 1
+            self.range_target = sample[self.range_start : self.range_end + 1]
             base_headers.append(("Range", f"bytes={self.range_start}-{self.range_end}"))
         return base_headers
 
@@ -89,26 +88,27 @@ class RangeRequest(SubRequest):
                 MISSING_HDRS_206,
             )
 
-            if self.response.content_length == self.base.response.content_length:
+            full_length = self.base.full_content_length
+            if full_length is not None and self.response.content_length == full_length:
                 self.add_notes("field-content-length", RANGE_CL_FULL)
 
             content_range = self.response.headers.parsed.get("content-range", None)
-            if content_range:
+            if content_range and full_length is not None:
                 if (
                     content_range.complete_length is not None
-                    and content_range.complete_length != self.base.response.content_length
+                    and content_range.complete_length != full_length
                 ):
                     self.add_notes(
                         "field-content-range",
                         RANGE_INCORRECT_LENGTH,
                         length_206=f_num(content_range.complete_length),
-                        length_full=f_num(self.base.response.content_length),
+                        length_full=f_num(full_length),
                     )
 
             if self.response.headers.parsed.get(
                 "etag", None
             ) == self.base.response.headers.parsed.get("etag", None):
-                content = b"".join([chunk[1] for chunk in self.response_content_sample])
+                content = self.response_content_sample.getvalue()
                 if content == self.range_target:
                     self.base.partial_support = True
                     self.add_notes("field-accept-ranges", RANGE_CORRECT)
@@ -0,0 +1,100 @@
+"""
+Limits on how much traffic a single test can generate.
+
+One FetchBudget is shared by a HttpResource, its subrequests and every linked
+resource it descends into, so that the limits apply to the whole test.
+"""
+
+from configparser import SectionProxy
+from typing import Optional
+
+import thor.http.error as httperr
+from httplint.note import categories, levels
+from thor.events import EventEmitter
+
+from redbot.note import RedbotNote
+
+
+class BudgetExceededError(httperr.HttpError):
+    desc = "The test reached its traffic limit"
+
+
+class FetchBudget(EventEmitter):
+    """
+    Count requests and bytes for a test, enforcing optional caps on each (0 is
+    unlimited). Emits 'exceeded' with the name of the limit the first time one is hit.
+
+    client_id identifies who the test is being run for, if known.
+    """
+
+    def __init__(self, max_requests: int = 0, max_bytes_in: int = 0, max_bytes_out: int = 0):
+        EventEmitter.__init__(self)
+        self.max_requests = max_requests
+        self.max_bytes_in = max_bytes_in
+        self.max_bytes_out = max_bytes_out
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.exceeded: Optional[str] = None
+        self.client_id: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: SectionProxy) -> "FetchBudget":
+        "Create a budget with the limits in config."
+        return cls(
+            config.getint("max_test_requests", fallback=0),
+            config.getint("max_test_kbytes_in", fallback=0) * 1024,
+            config.getint("max_test_kbytes_out", fallback=0) * 1024,
+        )
+
+    def start_request(self) -> bool:
+        """
+        Account for a new request. Returns False (and doesn't count it) if the
+        budget has been exceeded, or if it would be.
+        """
+        if self.exceeded:
+            return False
+        if self.max_requests and self.requests >= self.max_requests:
+            self._exceed("requests")
+            return False
+        self.requests += 1
+        return True
+
+    def add_in(self, count: int) -> None:
+        "Account for count bytes received."
+        self.bytes_in += count
+        if self.max_bytes_in and self.bytes_in > self.max_bytes_in:
+            self._exceed("bytes_in")
+
+    def add_out(self, count: int) -> None:
+        "Account for count bytes sent."
+        self.bytes_out += count
+        if self.max_bytes_out and self.bytes_out > self.max_bytes_out:
+            self._exceed("bytes_out")
+
+    def _exceed(self, limit: str) -> None:
+        if not self.exceeded:
+            self.exceeded = limit
+            self.emit("exceeded", limit)
+
+    def describe_limit(self) -> str:
+        "Describe the limit that was reached."
+        if self.exceeded == "requests":
+            return f"{self.max_requests:,} requests"
+        if self.exceeded == "bytes_in":
+            return f"{self.max_bytes_in // 1024:,}K received"
+        if self.exceeded == "bytes_out":
+            return f"{self.max_bytes_out // 1024:,}K sent"
+        return ""
+
+
+class TEST_BUDGET_EXCEEDED(RedbotNote):
+    category = categories.GENERAL
+    level = levels.WARN
+    _summary = "REDbot stopped this test early."
+    _text = """\
+To limit the load that a single test can put on servers (and on REDbot), each test is only
+allowed to make so many requests and transfer so much data. This test reached its limit of
+%(limit)s, so REDbot stopped any requests that were still in progress and didn't start any more.
+
+Some results (particularly for subrequests and embedded links) may be missing as a result."""
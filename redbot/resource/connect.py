@@ -0,0 +1,115 @@
+"""
+Connection setup for RedHttpClient.
+
+This follows thor.http.client.initiate, but resolves names through REDbot's
+shared resolver cache rather than going to DNS for every new connection,
+records how long each step of setting up the connection took, and allows each
+origin a connect deadline based upon how it's behaved before.
+"""
+
+import socket
+import time
+from typing import TYPE_CHECKING, Callable, Optional, Union
+from weakref import WeakKeyDictionary
+
+from thor.http.client.connection import HttpClientConnection
+from thor.loop import LoopBase
+from thor.tcp import TcpClient, TcpConnection
+from thor.tls import TlsClient
+from thor.types import DnsResultList, OriginType
+
+from redbot.resource.latency import latency_tracker
+from redbot.resource.resolve import resolver
+from redbot.resource.timing import ConnectionTimings
+
+if TYPE_CHECKING:
+    from thor.http.client import HttpClient
+
+_conn_timings: "WeakKeyDictionary[HttpClientConnection, ConnectionTimings]" = WeakKeyDictionary()
+
+
+def connection_timings(conn: HttpClientConnection) -> Optional[ConnectionTimings]:
+    "Return the timings for setting up conn, if it was set up by initiate_connection."
+    return _conn_timings.get(conn, None)
+
+
+class TimedTlsClient(TlsClient):
+    "A TlsClient that notes when the TCP connection is up, before the TLS handshake."
+
+    def __init__(self, loop: LoopBase, timings: ConnectionTimings) -> None:
+        TlsClient.__init__(self, loop)
+        self.timings = timings
+
+    def handle_connect(self) -> None:
+        self.timings.tcp_done = time.monotonic()
+        TlsClient.handle_connect(self)
+
+
+def initiate_connection(
+    client: "HttpClient",
+    origin: OriginType,
+    handle_connect: Callable[[HttpClientConnection], None],
+    handle_error: Callable[[str, int, str], None],
+) -> None:
+    """
+    Create a new TCP connection to origin for client.
+    """
+    attempts = 0
+    dns_results: DnsResultList = []
+    timings = ConnectionTimings()
+
+    def handle_dns(results: Union[DnsResultList, Exception]) -> None:
+        nonlocal dns_results
+        timings.dns_done = time.monotonic()
+        if isinstance(results, Exception):
+            handle_error("gai", results.args[0], results.args[1])
+        elif not results:
+            handle_error("gai", 0, "No addresses found")
+        else:
+            dns_results = results
+            initiate_internal()
+
+    def initiate_internal() -> None:
+        nonlocal attempts
+        dns_result = dns_results[attempts % len(dns_results)]
+        scheme, host, _ = origin
+        timings.connect_start = time.monotonic()
+        timings.tcp_done = None
+        if scheme == "http":
+            tcp_client: Union[TcpClient, TlsClient] = TcpClient(client.loop)
+        elif scheme == "https":
+            tcp_client = TimedTlsClient(client.loop, timings)
+        else:
+            raise ValueError(f"unknown scheme {scheme}")
+        tcp_client.check_ip = client.check_ip
+        tcp_client.once("connect", handle_connect_cb)
+        tcp_client.once("connect_error", handle_connect_error_cb)
+        attempts += 1
+        tcp_client.connect_dns(
+            host.encode("idna"), dns_result, latency_tracker.connect_deadline(origin)
+        )
+
+    def handle_connect_cb(tcp_conn: TcpConnection) -> None:
+        if origin[0] == "https":
+            timings.tls_done = time.monotonic()
+        else:
+            timings.tcp_done = time.monotonic()
+        client.conn_counts[origin] += 1
+        conn = HttpClientConnection(client, origin, tcp_conn)
+        _conn_timings[conn] = timings
+        if timings.connect_start is not None and timings.ready is not None:
+            latency_tracker.observe_connect(origin, timings.ready - timings.connect_start)
+        handle_connect(conn)
+
+    def handle_connect_error_cb(err_type: str, err_id: int, err_str: str) -> None:
+        if err_type in ["access"]:
+            handle_error(err_type, err_id, err_str)
+        elif attempts > client.connect_attempts:
+            latency_tracker.observe_connect_failure(origin)
+            handle_error("retry", attempts, "Too many connection attempts")
+        else:
+            client.loop.schedule(0, initiate_internal)
+
+    _, host, port = origin
+    timings.dns_start = time.monotonic()
+    resolver.lookup(client.loop, host.encode("idna"), port, socket.SOCK_STREAM, handle_dns)
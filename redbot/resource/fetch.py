@@ -8,21 +8,34 @@ based upon the provided headers.
 
 import time
 from configparser import SectionProxy
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from weakref import WeakSet
 
 import thor
 import thor.http.error as httperr
 from httplint import HttpRequestLinter, HttpResponseLinter
-from httplint.note import categories, levels
-from netaddr import IPAddress  # type: ignore
+from httplint.message import CL_INCORRECT
+from httplint.note import Notes, categories, levels
 from thor.http.client import HttpClientExchange
+from thor.types import OriginType
 
 from redbot import __version__
 from redbot.i18n import _
 from redbot.note import RedbotNote
+from redbot.resource.budget import BudgetExceededError, FetchBudget
+from redbot.resource.connect import connection_timings, initiate_connection
+from redbot.resource.governor import PRIORITY_BACKGROUND, governor
+from redbot.resource.latency import latency_tracker
+from redbot.resource.resolve import is_global_address
+from redbot.resource.sample import SampleBuffer
+from redbot.resource.timing import FetchTimings
 from redbot.type import RawHeaderListType, StrHeaderListType
 from redbot.webbotauth import WebBotAuthError, load_signer
 
+if TYPE_CHECKING:
+    from thor.http.client.connection import HttpClientConnection
+
 # Fallback UI URL advertised in the User-Agent when ui_uri is not configured
 # (e.g. the CLI). The public instance's ui_uri defaults to the same value.
 DEFAULT_UI_URI = "https://redbot.org/"
@@ -56,6 +69,60 @@ class RedHttpClient(thor.http.HttpClient):
         self.retry_delay = 1
         self.careful = False
 
+    def _new_conn(
+        self,
+        origin: OriginType,
+        handle_connect: Callable[["HttpClientConnection"], None],
+        handle_error: Callable[[str, int, str], None],
+    ) -> None:
+        "Create a new connection, resolving the origin's name through the shared cache."
+        if self.conn_counts[origin] >= self.max_server_conn:
+            self._req_q[origin].append((handle_connect, handle_error))
+            return
+        initiate_connection(self, origin, handle_connect, handle_error)
+
+    def attach_conn(
+        self,
+        origin: OriginType,
+        handle_connect: Callable[["HttpClientConnection"], None],
+        handle_connect_error: Callable[[str, int, str], None],
+    ) -> None:
+        """
+        Attach a connection, giving it a deadline for the response headers based upon
+        the origin's latency.
+        """
+
+        def connected(conn: "HttpClientConnection") -> None:
+            handle_connect(conn)
+            exchange = conn.active_exchange
+            if exchange is not None:
+                conn.set_timeout(latency_tracker.read_deadline(origin), "read")
+                exchange.once("response_start", partial(self._headers_received, conn, exchange))
+
+        thor.http.HttpClient.attach_conn(self, origin, connected, handle_connect_error)
+
+    def _headers_received(
+        self, conn: "HttpClientConnection", exchange: HttpClientExchange, *args: Any
+    ) -> None:
+        """
+        The latency-based deadline is only for the response headers; the content gets
+        read_timeout, so that large or slow downloads aren't cut off.
+        """
+        if conn.active_exchange is exchange and conn.tcp_connected:
+            conn.set_timeout(self.read_timeout or self.connect_timeout, "read")
+
+
+# Connections that have carried a response, so we can tell new ones from reused ones.
+_used_conns: "WeakSet[HttpClientConnection]" = WeakSet()
+
+
+def note_connection(conn: "HttpClientConnection") -> bool:
+    "Record that conn is carrying a response; return whether it has carried one before."
+    if conn in _used_conns:
+        return True
+    _used_conns.add(conn)
+    return False
+
 
 class RedFetcher(thor.events.EventEmitter):
     """
@@ -80,20 +147,25 @@ class RedFetcher(thor.events.EventEmitter):
         self.request_content: bytes
         self.response_header_length: int = 0
         self.response_content_processors: List[Callable[[bytes], None]] = []
-        self.response_content_processors.append(self.sample_response)
-        self.response_content_sample: List[Tuple[int, bytes]] = []
-        self.response_decoded_sample: List[bytes] = []
-        self.response_decoded_complete: bool = True
         self.max_sample_size = config.getint("max_sample_size", fallback=8192)
+        self.response_content_sample = SampleBuffer(self.max_sample_size)
+        self.response_decoded_sample = SampleBuffer(self.max_sample_size)
+        self.max_fetch_size = config.getint("max_fetch_size", fallback=0)
+        self.content_truncated = False
 
         self.request = HttpRequestLinter()
         self.nonfinal_responses: List[HttpResponseLinter] = []
         self.response = HttpResponseLinter()
-        self.response.decoded.processors.append(self.sample_decoded)
+        self.response.decoded.processors.append(self.response_decoded_sample.feed)
         self.exchange: HttpClientExchange
         self.fetch_started = False
         self.fetch_error: Optional[httperr.HttpError] = None
         self.fetch_done = False
+        self.conn_reused: Optional[bool] = None
+        self.timings: Optional[FetchTimings] = None
+        self.origin: Optional[OriginType] = None
+        self.deadlines: Dict[str, float] = {}
+        self.budget = FetchBudget.from_config(config)
         self._wba_retried = False
         self.setup_check_ip()
 
@@ -130,14 +202,7 @@ class RedFetcher(thor.events.EventEmitter):
         if (
             not self.config.getboolean("enable_local_access", fallback=False)
         ) and self.client.check_ip is None:
-
-            def check_ip(dns_result: str) -> bool:
-                addr = IPAddress(dns_result)
-                if not addr.is_global():
-                    return False
-                return True
-
-            self.client.check_ip = check_ip
+            self.client.check_ip = is_global_address
 
     def set_request(
         self,
@@ -175,6 +240,11 @@ class RedFetcher(thor.events.EventEmitter):
             self._fetch_done()
             return
 
+        if not self.budget.start_request():
+            self.fetch_error = BudgetExceededError(self.budget.describe_limit())
+            self._fetch_done()
+            return
+
         self.fetch_started = True
         assert self.request.method, "method not set in check"
         assert self.request.uri, "uri not set in check"
@@ -183,7 +253,11 @@ class RedFetcher(thor.events.EventEmitter):
             self.request.headers.process([(b"User-Agent", ua_string(self.config))])
         # Requests are sent unsigned; Web Bot Auth signatures are only added when
         # the origin challenges for them (see _response_start).
-        self._send_request()
+        governor.submit(self, self.budget.client_id, self.fetch_priority(), self._send_request)
+
+    def fetch_priority(self) -> int:
+        "How urgent this fetch is, relative to others waiting to start. Can be overridden."
+        return PRIORITY_BACKGROUND
 
     def _send_request(self, extra_headers: Optional[RawHeaderListType] = None) -> None:
         "Start an exchange for the current request, optionally adding extra headers."
@@ -208,15 +282,23 @@ class RedFetcher(thor.events.EventEmitter):
         if extra_headers:
             req_hdrs += extra_headers
         self.request.start_time = time.time()
+        self.timings = FetchTimings(time.monotonic())
         self.exchange.request_start(
             self.request.method.encode("ascii"),
             self.request.uri.encode("ascii"),
             req_hdrs,
         )
+        self.origin = getattr(getattr(self, "exchange", None), "origin", None)
+        if self.origin is not None:
+            self.deadlines = {
+                "connect": latency_tracker.connect_deadline(self.origin),
+                "read": latency_tracker.read_deadline(self.origin),
+            }
         if not self.fetch_done:  # the request could have immediately failed.
             if self.request_content:
                 self.exchange.request_body(self.request_content)
                 self.transfer_out += len(self.request_content)
+                self.budget.add_out(len(self.request_content))
         if not self.fetch_done:  # the request could have immediately failed.
             self.exchange.request_done([])
 
@@ -284,6 +366,18 @@ class RedFetcher(thor.events.EventEmitter):
                     self._send_request(signer.sign_request(self.request.uri))
                     return
         self.response.start_time = time.time()
+        if self.timings is not None:
+            self.timings.first_byte = time.monotonic()
+        conn = getattr(self.exchange, "conn", None)
+        if conn is not None:
+            self.conn_reused = note_connection(conn)
+            if self.timings is not None and not self.conn_reused:
+                self.timings.connection = connection_timings(conn)
+        if self.origin is not None and self.timings and self.timings.first_byte:
+            ready = self.timings.start
+            if self.timings.connection and self.timings.connection.ready:
+                ready = self.timings.connection.ready
+            latency_tracker.observe_response(self.origin, self.timings.first_byte - ready)
         assert self.exchange.res_version, "exchange.res_version not set in _response_start"
         self.response.process_response_topline(self.exchange.res_version, status, phrase)
         self.response.process_headers(res_headers)
@@ -292,9 +386,62 @@ class RedFetcher(thor.events.EventEmitter):
     def _response_body(self, chunk: bytes) -> None:
         "Process a chunk of the response body."
         self.transfer_in += len(chunk)
+        self.budget.add_in(len(chunk))
         self.response.feed_content(chunk)
+        self.response_content_sample.feed(chunk)
         for processor in self.response_content_processors:
             processor(chunk)
+        if (
+            self.max_fetch_size
+            and self.response.content_length >= self.max_fetch_size
+            and self.response.content_length >= self.max_sample_size
+        ):
+            self._truncate_response()
+
+    def _truncate_response(self) -> None:
+        "Stop downloading the response content, and finish with what we have."
+        if self.fetch_done:
+            return
+        self.emit(
+            "debug",
+            f"truncated {self.request.uri} ({self.check_name}) at "
+            f"{self.response.content_length} bytes",
+        )
+        self.content_truncated = True
+        self.response.transfer_length = self.exchange.input_transfer_length
+        self.response_header_length = self.exchange.input_header_length
+        self._abort_exchange()
+        self.response.finish_content(True)
+        # Content-Length can't be checked against partial content.
+        notes = self.response.notes
+        if isinstance(notes, Notes):
+            notes[:] = [note for note in notes if not isinstance(note, CL_INCORRECT)]
+        self.response.notes.add(
+            "body", CONTENT_TRUNCATED, fetch_size=f"{self.response.content_length:,}"
+        )
+        self._fetch_done()
+
+    @property
+    def full_content_length(self) -> Optional[int]:
+        "The length of the whole response content, if known."
+        if not self.content_truncated:
+            return self.response.content_length
+        content_length: Optional[int] = self.response.headers.parsed.get("content-length", None)
+        return content_length
+
+    def same_content(self, other: "RedFetcher") -> bool:
+        """
+        Whether other's response content is the same as ours. If either was truncated,
+        only the lengths and the content both have samples of are compared.
+        """
+        if not (self.content_truncated or other.content_truncated):
+            return bool(self.response.content_hash == other.response.content_hash)
+        if self.full_content_length != other.full_content_length:
+            return False
+        ours = self.response_content_sample.getvalue()
+        theirs = other.response_content_sample.getvalue()
+        size = min(len(ours), len(theirs))
+        return ours[:size] == theirs[:size]
 
     def _response_done(self, trailers: List[Tuple[bytes, bytes]]) -> None:
         "Finish analysing the response, handling any parse errors."
@@ -306,21 +453,6 @@ class RedFetcher(thor.events.EventEmitter):
         self.response.finish_content(True, trailers)
         self._fetch_done()
 
-    def sample_response(self, chunk: bytes) -> None:
-        "Sample the response content."
-        if not chunk:
-            return
-        start_offset = self.response.content_length - len(chunk)
-        if self.max_sample_size == 0 or start_offset < self.max_sample_size:
-            self.response_content_sample.append((start_offset, chunk))
-
-    def sample_decoded(self, decoded_chunk: bytes) -> None:
-        "Sample the decoded response content."
-        if self.max_sample_size == 0 or self.response.decoded.length < self.max_sample_size:
-            self.response_decoded_sample.append(decoded_chunk)
-        else:
-            self.response_decoded_complete = False
-
     def _response_error(self, error: httperr.HttpError) -> None:
         "Handle an error encountered while fetching the response."
         self.emit(
@@ -346,21 +478,36 @@ class RedFetcher(thor.events.EventEmitter):
 
     def _fetch_done(self) -> None:
         self.response.finish_time = time.time()
+        if self.timings is not None and self.timings.last_byte is None:
+            self.timings.last_byte = time.monotonic()
         if not self.fetch_done:
             self.fetch_done = True
             try:
                 delattr(self, "exchange")
             except AttributeError:
                 pass
+            governor.release(self)
             self.emit("fetch_done")
 
-    def stop(self) -> None:
-        "Stop the fetcher."
+    def stop(self, error: Optional[httperr.HttpError] = None) -> None:
+        "Stop the fetcher, recording error as the reason if it hadn't finished."
         if hasattr(self, "exchange") and self.exchange.conn:
             self.exchange.conn.close()
+        if error is not None and not self.fetch_done:
+            self.fetch_error = error
         self._fetch_done()
 
 
+class CONTENT_TRUNCATED(RedbotNote):
+    category = categories.GENERAL
+    level = levels.INFO
+    _summary = "REDbot didn't download all of the content."
+    _text = """\
+To save bandwidth, REDbot stopped downloading this response after %(fetch_size)s bytes of
+content. Checks that need the whole response (like comparing it with other responses) use only
+what was downloaded, or are skipped."""
+
+
 class BODY_NOT_ALLOWED(RedbotNote):
     category = categories.CONNECTION
     level = levels.BAD
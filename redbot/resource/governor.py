@@ -0,0 +1,165 @@
+"""
+A process-wide limit on outbound fetches.
+
+Each test makes its own fetches, so without some coordination one client
+running large descend tests can crowd out everyone else. Every RedFetcher asks
+the governor before it sends its request; the governor runs it straight away if
+there's room, and otherwise queues it until there is.
+
+Room is limited overall, for each origin, and for each client: a client can use
+a fixed maximum, and no more than its fair share of the overall limit when other
+clients are waiting. Queued fetches for a test's main request go ahead of those
+for subrequests and linked resources; within a priority, clients take turns.
+"""
+
+from collections import OrderedDict, deque
+from configparser import SectionProxy
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from redbot import metrics
+from redbot.utils import uri_origin
+
+if TYPE_CHECKING:
+    from redbot.resource.fetch import RedFetcher
+
+PRIORITY_INTERACTIVE = 0  # the main request of a test
+PRIORITY_BACKGROUND = 1  # subrequests and linked resources
+PRIORITIES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+_Waiting = Tuple["RedFetcher", str, str, Callable[[], None]]  # fetcher, origin, client, start
+
+
+class FetchGovernor:
+    """
+    Limit concurrent fetches across the process (0 is unlimited).
+    """
+
+    def __init__(self, max_active: int = 0, max_per_origin: int = 0, max_per_client: int = 0):
+        self.max_active = max_active
+        self.max_per_origin = max_per_origin
+        self.max_per_client = max_per_client
+        self.queued_total = 0
+        self._active: Dict["RedFetcher", Tuple[str, str]] = {}
+        self._by_origin: Dict[str, int] = {}
+        self._by_client: Dict[str, int] = {}
+        # priority -> client -> fetches waiting, in order
+        self._queues: Dict[int, "OrderedDict[str, Deque[_Waiting]]"] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+
+    def setup(self, config: SectionProxy) -> None:
+        """Configure from config."""
+        self.max_active = config.getint("max_fetches", fallback=0)
+        self.max_per_origin = config.getint("max_fetches_per_origin", fallback=0)
+        self.max_per_client = config.getint("max_fetches_per_client", fallback=0)
+
+    def submit(
+        self,
+        fetcher: "RedFetcher",
+        client_id: Optional[str],
+        priority: int,
+        start: Callable[[], None],
+    ) -> None:
+        "Call start when fetcher can go ahead."
+        origin = uri_origin(fetcher.request.uri or "")
+        client = client_id or ""
+        if not self._queued() and self._has_room(origin, client, 0):
+            self._start((fetcher, origin, client, start))
+            return
+        self._queues[priority].setdefault(client, deque()).append((fetcher, origin, client, start))
+        self.queued_total += 1
+        self._run()
+
+    def release(self, fetcher: "RedFetcher") -> None:
+        "fetcher is finished (or stopped); let queued fetches use its room."
+        if fetcher in self._active:
+            origin, client = self._active.pop(fetcher)
+            self._decrement(self._by_origin, origin)
+            self._decrement(self._by_client, client)
+            self._run()
+        else:
+            self._forget(fetcher)
+
+    def _run(self) -> None:
+        while self._queued():
+            waiting = self._next()
+            if waiting is None:
+                return
+            self._start(waiting)
+
+    def _next(self) -> Optional[_Waiting]:
+        "Take the next fetch that can go ahead off the queue."
+        demand = self._clients_with_demand()
+        for priority in PRIORITIES:
+            clients = self._queues[priority]
+            for client, waiting in clients.items():
+                for index, entry in enumerate(waiting):
+                    if self._has_room(entry[1], client, demand):
+                        del waiting[index]
+                        if waiting:
+                            clients.move_to_end(client)
+                        else:
+                            del clients[client]
+                        return entry
+        return None
+
+    def _start(self, waiting: _Waiting) -> None:
+        fetcher, origin, client, start = waiting
+        self._active[fetcher] = (origin, client)
+        self._by_origin[origin] = self._by_origin.get(origin, 0) + 1
+        self._by_client[client] = self._by_client.get(client, 0) + 1
+        start()
+
+    def _has_room(self, origin: str, client: str, demand: int) -> bool:
+        if self.max_active and len(self._active) >= self.max_active:
+            return False
+        if self.max_per_origin and self._by_origin.get(origin, 0) >= self.max_per_origin:
+            return False
+        client_active = self._by_client.get(client, 0)
+        if self.max_per_client and client_active >= self.max_per_client:
+            return False
+        if self.max_active and demand > 1 and client_active >= max(1, self.max_active // demand):
+            return False
+        return True
+
+    def _clients_with_demand(self) -> int:
+        clients: Set[str] = set(self._by_client)
+        for queue in self._queues.values():
+            clients.update(queue)
+        return len(clients)
+
+    def _queued(self) -> int:
+        return sum(len(waiting) for queue in self._queues.values() for waiting in queue.values())
+
+    def _forget(self, fetcher: "RedFetcher") -> None:
+        for clients in self._queues.values():
+            for client, waiting in list(clients.items()):
+                remaining = [entry for entry in waiting if entry[0] is not fetcher]
+                if len(remaining) != len(waiting):
+                    if remaining:
+                        clients[client] = deque(remaining)
+                    else:
+                        del clients[client]
+                    return
+
+    @staticmethod
+    def _decrement(counts: Dict[str, int], key: str) -> None:
+        counts[key] -= 1
+        if not counts[key]:
+            del counts[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the governor."""
+        out = {
+            "active": len(self._active),
+            "clients": len(self._by_client),
+            "queued_total": self.queued_total,
+        }
+        for priority, name in PRIORITIES.items():
+            queued: List[int] = [len(waiting) for waiting in self._queues[priority].values()]
+            out[f"queued_{name}"] = sum(queued)
+        return out
+
+
+governor = FetchGovernor()
+metrics.register("governor", governor.stats)
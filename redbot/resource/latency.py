@@ -0,0 +1,127 @@
+"""
+Per-origin latency tracking, used to set connect and read deadlines.
+
+Rather than giving every origin the same fixed timeouts, REDbot keeps smoothed
+connect and response times for each origin it talks to (in the style of TCP's
+retransmission timer; see RFC 6298), and derives deadlines from them within
+configured bounds. Origins we haven't heard from get the ceiling, so slow ones
+aren't cut off; origins whose connections are failing get the floor, so that
+a dead host doesn't tie up a test for long.
+"""
+
+from collections import OrderedDict
+from configparser import SectionProxy
+from typing import Dict, Optional
+
+from thor.types import OriginType
+
+from redbot import metrics
+
+ALPHA = 1 / 8
+BETA = 1 / 4
+MARGIN = 3  # how many RTOs to allow before giving up
+
+
+class LatencyStats:
+    """
+    Smoothed latency and its variation for one kind of operation on one origin.
+    """
+
+    __slots__ = ("srtt", "rttvar", "failing")
+
+    def __init__(self) -> None:
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.failing = False
+
+    def observe(self, sample: float) -> None:
+        "Update the statistics with a latency sample (in seconds)."
+        if self.srtt is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+        else:
+            self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - sample)
+            self.srtt = (1 - ALPHA) * self.srtt + ALPHA * sample
+        self.failing = False
+
+    def deadline(self, floor: float, ceiling: float) -> float:
+        "Return a deadline (in seconds) between floor and ceiling."
+        if self.failing:
+            return floor
+        if self.srtt is None:
+            return ceiling
+        return min(max(MARGIN * (self.srtt + 4 * self.rttvar), floor), ceiling)
+
+
+class OriginLatency:
+    __slots__ = ("connect", "response")
+
+    def __init__(self) -> None:
+        self.connect = LatencyStats()
+        self.response = LatencyStats()
+
+
+class LatencyTracker:
+    """
+    Latency statistics for recently-seen origins.
+    """
+
+    def __init__(self) -> None:
+        self.connect_floor = 3.0
+        self.connect_ceiling = 30.0
+        self.read_floor = 10.0
+        self.read_ceiling = 60.0
+        self.max_origins = 1000
+        self._origins: "OrderedDict[OriginType, OriginLatency]" = OrderedDict()
+
+    def setup(self, config: SectionProxy) -> None:
+        """Configure from config."""
+        self.connect_floor = config.getfloat("connect_timeout_floor", fallback=3)
+        self.connect_ceiling = config.getfloat("connect_timeout_ceiling", fallback=30)
+        self.read_floor = config.getfloat("read_timeout_floor", fallback=10)
+        self.read_ceiling = config.getfloat("read_timeout_ceiling", fallback=60)
+
+    def _get(self, origin: OriginType) -> OriginLatency:
+        latency = self._origins.get(origin, None)
+        if latency is None:
+            latency = self._origins[origin] = OriginLatency()
+            while len(self._origins) > self.max_origins:
+                self._origins.popitem(last=False)
+        else:
+            self._origins.move_to_end(origin)
+        return latency
+
+    def observe_connect(self, origin: OriginType, seconds: float) -> None:
+        "Note that connecting to origin took seconds."
+        self._get(origin).connect.observe(seconds)
+
+    def observe_connect_failure(self, origin: OriginType) -> None:
+        "Note that we couldn't connect to origin."
+        self._get(origin).connect.failing = True
+
+    def observe_response(self, origin: OriginType, seconds: float) -> None:
+        "Note that origin took seconds to start responding to a request."
+        self._get(origin).response.observe(seconds)
+
+    def connect_deadline(self, origin: OriginType) -> float:
+        "How long to allow for connecting to origin."
+        latency = self._origins.get(origin, None)
+        if latency is None:
+            return self.connect_ceiling
+        return latency.connect.deadline(self.connect_floor, self.connect_ceiling)
+
+    def read_deadline(self, origin: OriginType) -> float:
+        "How long to allow for origin to respond, once a request is sent."
+        latency = self._origins.get(origin, None)
+        if latency is None:
+            return self.read_ceiling
+        return latency.response.deadline(self.read_floor, self.read_ceiling)
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the tracker."""
+        failing = sum(1 for latency in self._origins.values() if latency.connect.failing)
+        return {"origins": len(self._origins), "failing": failing}
+
+
+latency_tracker = LatencyTracker()
+metrics.register("latency", latency_tracker.stats)
@@ -2,11 +2,19 @@
 
 """
 Parse links from a stream of HTML data.
+
+There are two engines: HTMLLinkParser uses the standard library's HTMLParser,
+which tokenises the whole document; LinkScanner only looks at the tags that can
+contain links, and is much faster. The link_parser configuration option selects
+one; see get_link_parser.
 """
 
 import codecs
+import html
+import re
+from configparser import SectionProxy
 from html.parser import HTMLParser
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 
 from httplint.field.utils import split_string, unquote_string
 from httplint.message import HttpMessageLinter
@@ -16,12 +24,12 @@ DEFAULT_ENCODING = "utf-8"
 MAX_FEED_BYTES = 2 * 1024 * 1024
 
 
-class HTMLLinkParser(HTMLParser):
+class LinkParser:
     """
-    Parse the links out of an HTML document in a very forgiving way.
+    Base class for parsing the links out of an HTML document in a very forgiving way.
 
-    feed() accepts a HttpMessageLinter object and a chunk of the document at a
-    time.
+    feed() accepts a chunk of the document at a time, which is parsed in the
+    context of the HttpMessageLinter it was created with.
 
     When links are found, link_procs will be called for each with the
     following arguments;
@@ -59,7 +67,9 @@ class HTMLLinkParser(HTMLParser):
         self.last_err_pos: int = 0
         self.ok = True
         self.bytes_fed = 0
-        HTMLParser.__init__(self)
+        self._encoding: Optional[str] = None
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._carried = ""
 
     def __getstate__(self) -> Dict[str, Any]:
         return {"errors": self.errors, "last_err_pos": self.last_err_pos, "ok": self.ok}
@@ -71,17 +81,49 @@ class HTMLLinkParser(HTMLParser):
             if self.bytes_fed > MAX_FEED_BYTES:
                 self.ok = False
                 return
-            encoding = self.message.character_encoding or DEFAULT_ENCODING
-            decoded = bchunk.decode(encoding, "ignore")
+            decoded = self._get_decoder().decode(bchunk)
+            if self._carried:
+                decoded = self._carried + decoded
+                self._carried = ""
+            elif b"<" not in bchunk and self.idle:
+                return  # nothing in this chunk can start a tag.
             self.feed(decoded)
 
+    def _get_decoder(self) -> codecs.IncrementalDecoder:
+        """
+        Return the decoder for the message's current character encoding.
+
+        It's kept between chunks so that characters split across them are decoded
+        properly. If the encoding changes (e.g., because of a meta tag), any bytes
+        the old decoder was holding on to are handed to the new one, and whatever
+        they decode to is carried over to the next chunk.
+        """
+        encoding = self.message.character_encoding or DEFAULT_ENCODING
+        if encoding != self._encoding or self._decoder is None:
+            try:
+                decoder = codecs.getincrementaldecoder(encoding)("ignore")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder(DEFAULT_ENCODING)("ignore")
+            if self._decoder is not None:
+                held = self._decoder.getstate()[0]
+                if held:
+                    self._carried += decoder.decode(held)
+            self._encoding = encoding
+            self._decoder = decoder
+        return self._decoder
+
+    @property
+    def idle(self) -> bool:
+        "True when the parser isn't part-way through a tag or comment."
+        return True
+
     def feed(self, data: str) -> None:
         "Feed a given chunk of str to the parser"
         if not self.ok:
             return
         if self.message.headers.parsed.get("content-type", [None])[0] in self.link_parseable_types:
             try:
-                HTMLParser.feed(self, data)
+                self.parse(data)
             except BadErrorIReallyMeanIt:
                 pass
             except Exception as why:  # pylint: disable=broad-except
@@ -91,7 +133,12 @@ class HTMLLinkParser(HTMLParser):
         else:
             self.ok = False
 
+    def parse(self, data: str) -> None:
+        "Parse a chunk of the document. Must be overridden."
+        raise NotImplementedError
+
     def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        "Process a start tag, with its (lowercased) name and attributes."
         if tag in self.link_types:
             attr_d = dict(attrs)
             url_attr, rels = self.link_types[tag]
@@ -130,6 +177,28 @@ class HTMLLinkParser(HTMLParser):
                 except LookupError:
                     pass
 
+
+class HTMLLinkParser(LinkParser, HTMLParser):
+    """
+    Parse links with HTMLParser.
+    """
+
+    def __init__(
+        self,
+        message: HttpMessageLinter,
+        link_procs: List[Callable[[str, str, str, str], None]],
+        err: Optional[Callable[[str], int]] = None,
+    ) -> None:
+        LinkParser.__init__(self, message, link_procs, err)
+        HTMLParser.__init__(self)
+
+    def parse(self, data: str) -> None:
+        HTMLParser.feed(self, data)
+
+    @property
+    def idle(self) -> bool:
+        return not self.rawdata
+
     def error(self, message: str) -> None:
         self.errors += 1
         if self.getpos()[0] == self.last_err_pos:
@@ -145,3 +214,157 @@ class HTMLLinkParser(HTMLParser):
 
 class BadErrorIReallyMeanIt(Exception):
     """See http://bugs.python.org/issue8885 for why this is necessary."""
+
+
+# The tags LinkScanner stops at; style is only there so its content is skipped.
+_SCAN_TAGS = sorted(set(LinkParser.link_types) | {"base", "meta", "style"}, key=len, reverse=True)
+_CANDIDATE = re.compile(rf"<(?:!--|((?i:{'|'.join(_SCAN_TAGS)}))(?=[\s/>]|\Z))")
+# these follow HTMLParser's tolerant patterns, so that both engines read tags the same way.
+_STARTTAG_END = re.compile(
+    r"""
+  <[a-zA-Z][^\t\n\r\f />\x00]*
+  (?:[\s/]*
+    (?:(?<=['"\s/])[^\s/>][^\s/=>]*
+      (?:\s*=+\s*
+        (?:'[^']*'
+          |"[^"]*"
+          |(?!['"])[^>\s]*
+         )
+        \s*
+       )?(?:\s|/(?!>))*
+     )*
+   )?
+  \s*
+""",
+    re.VERBOSE,
+)
+_ATTR = re.compile(
+    r"((?<=['\"\s/])[^\s/>][^\s/=>]*)(\s*=+\s*"
+    r"('[^']*'|\"[^\"]*\"|(?!['\"])[^>\s]*))?(?:\s|/(?!>))*"
+)
+_TAG_GAP = re.compile(r"(?:\s|/(?!>))*")
+# HTMLParser ends comments at "--" and ">" with whitespace between; newer versions accept "--!>".
+_COMMENT_END = re.compile(r"--!?\s*>")
+_CDATA_END = {
+    "script": re.compile(r"</\s*script\s*>", re.I),
+    "style": re.compile(r"</\s*style\s*>", re.I),
+}
+_ATTR_START = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ=")
+MAX_PENDING = 64 * 1024
+
+
+class LinkScanner(LinkParser):
+    """
+    Parse links by scanning for the tags that can contain them.
+
+    Everything else in the document -- text, end tags and other elements -- is
+    skipped without being tokenised. Comments and the content of script and style
+    elements are skipped too, as HTMLParser does.
+    """
+
+    def __init__(
+        self,
+        message: HttpMessageLinter,
+        link_procs: List[Callable[[str, str, str, str], None]],
+        err: Optional[Callable[[str], int]] = None,
+    ) -> None:
+        LinkParser.__init__(self, message, link_procs, err)
+        self._pending = ""
+        self._cdata: Optional[str] = None
+
+    @property
+    def idle(self) -> bool:
+        return not self._pending
+
+    def parse(self, data: str) -> None:
+        buf = self._pending + data
+        end = len(buf)
+        pos = 0
+        while pos < end:
+            if self._cdata:
+                match = _CDATA_END[self._cdata].search(buf, pos)
+                if match is None:
+                    pos = self._tail(buf, pos)
+                    break
+                pos = match.end()
+                self._cdata = None
+                continue
+            match = _CANDIDATE.search(buf, pos)
+            if match is None:
+                pos = self._tail(buf, pos)
+                break
+            start = match.start()
+            tag = match.group(1)
+            if tag is None:  # comment
+                close = _COMMENT_END.search(buf, match.end())
+                if close is None:
+                    pos = start
+                    break
+                pos = close.end()
+                continue
+            tagend = self._tag_end(buf, start)
+            if tagend is None:
+                pos = start
+                break
+            pos = self._start_tag(buf, tagend, match.end(), tag.lower())
+        self._pending = buf[pos:]
+        if len(self._pending) > MAX_PENDING:
+            self._pending = ""
+            if self.err:
+                self.err("giving up on an unterminated tag or comment")
+            self.errors += 1
+
+    @staticmethod
+    def _tail(buf: str, pos: int) -> int:
+        "Return where a tag split across chunks might start, if there is one at the end of buf."
+        last = buf.rfind("<", max(pos, len(buf) - 64))
+        if last == -1 or buf.find(">", last) != -1:
+            return len(buf)
+        return last
+
+    @staticmethod
+    def _tag_end(buf: str, start: int) -> Optional[int]:
+        "Return where the start tag at start ends, or None if it isn't all here yet."
+        j = _STARTTAG_END.match(buf, start).end()  # type: ignore[union-attr]
+        following = buf[j : j + 1]
+        if following == ">":
+            return j + 1
+        if following == "/":
+            if buf.startswith("/>", j):
+                return j + 2
+            return None if j + 1 == len(buf) else j
+        if following == "" or following in _ATTR_START:
+            return None
+        return j if j > start else start + 1
+
+    def _start_tag(self, buf: str, tagend: int, attrstart: int, tag: str) -> int:
+        attrs: List[Tuple[str, Optional[str]]] = []
+        k = _TAG_GAP.match(buf, attrstart).end()  # type: ignore[union-attr]
+        while k < tagend:
+            match = _ATTR.match(buf, k, tagend)
+            if not match:
+                break
+            name, rest, value = match.group(1, 2, 3)
+            if not rest:
+                value = None
+            elif value[:1] == "'" == value[-1:] or value[:1] == '"' == value[-1:]:
+                value = value[1:-1]
+            if value:
+                value = html.unescape(value)
+            attrs.append((name.lower(), value))
+            k = match.end()
+        closing = buf[k:tagend].strip()
+        if closing not in (">", "/>"):
+            return tagend  # HTMLParser treats this as text
+        self.handle_starttag(tag, attrs)
+        if closing == ">" and tag in _CDATA_END:
+            self._cdata = tag
+        return tagend
+
+
+link_parsers: Dict[str, Type[LinkParser]] = {"html": HTMLLinkParser, "scan": LinkScanner}
+
+
+def get_link_parser(config: SectionProxy) -> Type[LinkParser]:
+    "Return the link parser class selected by config."
+    return link_parsers.get(config.get("link_parser", "html"), HTMLLinkParser)
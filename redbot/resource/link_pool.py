@@ -0,0 +1,153 @@
+"""
+Parsing links off the event loop.
+
+Link parsing is pure Python and can take a while on a large page; done on the
+loop thread, it holds up every other test in the process. With link_parse_workers
+configured, LinkParsePool hands each parser's chunks to a thread pool instead.
+
+Each parser's chunks are parsed in the order they arrived, one at a time, and the
+links it finds are handed back to the loop (with thor's run_in_loop) in the order
+they were found. The pool only holds so many bytes waiting to be parsed; past
+that, chunks for parsers that have nothing outstanding are parsed on the loop
+thread as before.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from configparser import SectionProxy
+from typing import Callable, Deque, Dict, Optional
+
+from thor.loop import run_in_loop
+
+from redbot import metrics
+from redbot.resource.link_parse import LinkParser
+
+LinkProc = Callable[[str, str, str, str], None]
+
+
+class PooledLinkFeed:
+    """
+    Feed one parser's chunks to the pool, and pass the links it finds to
+    link_proc on the loop thread.
+    """
+
+    def __init__(self, pool: "LinkParsePool", parser: LinkParser, link_proc: LinkProc) -> None:
+        self.pool = pool
+        self.parser = parser
+        self.link_proc = link_proc
+        parser.link_procs = [self._found]
+        self._chunks: Deque[bytes] = deque()
+        self._lock = threading.Lock()
+        self._running = False  # a worker is draining _chunks
+        self._outstanding = 0  # chunks not yet parsed, counted on the loop thread
+        self._on_done: Optional[Callable[[], None]] = None
+
+    @property
+    def busy(self) -> bool:
+        "Whether there are chunks that haven't been parsed yet."
+        return self._outstanding > 0
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        "Parse chunk, in the pool if it has room. Call on the loop thread."
+        if not self.busy and self.pool.backlogged:
+            self.pool.inline += 1
+            self.parser.feed_bytes(chunk)
+            return
+        self._outstanding += 1
+        self.pool.queued_bytes += len(chunk)
+        with self._lock:
+            self._chunks.append(chunk)
+            if self._running:
+                return
+            self._running = True
+        self.pool.submit(self._drain)
+
+    def when_done(self, callback: Callable[[], None]) -> None:
+        "Call callback on the loop thread once everything fed so far is parsed."
+        if self.busy:
+            self._on_done = callback
+        else:
+            callback()
+
+    def _drain(self) -> None:
+        "Parse queued chunks until there are none. Runs in a worker thread."
+        while True:
+            with self._lock:
+                if not self._chunks:
+                    self._running = False
+                    return
+                chunk = self._chunks.popleft()
+            try:
+                self.parser.feed_bytes(chunk)
+            finally:
+                run_in_loop(self._parsed, len(chunk))
+
+    def _found(self, base: str, link: str, tag: str, title: str) -> None:
+        run_in_loop(self.link_proc, base, link, tag, title)
+
+    def _parsed(self, size: int) -> None:
+        self._outstanding -= 1
+        self.pool.queued_bytes -= size
+        self.pool.parsed += 1
+        if not self.busy and self._on_done is not None:
+            callback, self._on_done = self._on_done, None
+            callback()
+
+
+class LinkParsePool:
+    """
+    A pool of threads for parsing links (none, and so disabled, by default).
+    """
+
+    def __init__(self, workers: int = 0, max_queued_bytes: int = 8 * 1024 * 1024) -> None:
+        self.workers = workers
+        self.max_queued_bytes = max_queued_bytes
+        self.queued_bytes = 0
+        self.parsed = 0
+        self.inline = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def setup(self, config: SectionProxy) -> None:
+        """Configure from config."""
+        self.workers = config.getint("link_parse_workers", fallback=0)
+        self.max_queued_bytes = config.getint("link_parse_queue_kbytes", fallback=8192) * 1024
+
+    @property
+    def enabled(self) -> bool:
+        "Whether links should be parsed in the pool."
+        return self.workers > 0
+
+    @property
+    def backlogged(self) -> bool:
+        "Whether the pool has as much waiting as it should hold."
+        return self.queued_bytes >= self.max_queued_bytes
+
+    def feed(self, parser: LinkParser, link_proc: LinkProc) -> PooledLinkFeed:
+        "Return a feed that parses for parser in the pool."
+        return PooledLinkFeed(self, parser, link_proc)
+
+    def submit(self, job: Callable[[], None]) -> None:
+        "Run job in a worker thread."
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="link-parse")
+        self._executor.submit(job)
+
+    def shutdown(self) -> None:
+        "Stop the worker threads, once they've finished what they have."
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the pool."""
+        return {
+            "threads": self.workers if self._executor is not None else 0,
+            "queued_bytes": self.queued_bytes,
+            "parsed": self.parsed,
+            "inline": self.inline,
+        }
+
+
+link_parse_pool = LinkParsePool()
+metrics.register("link_parse_pool", link_parse_pool.stats)
@@ -0,0 +1,139 @@
+"""
+Name resolution for REDbot's fetches.
+
+A check of a single page resolves the same few hostnames many times over; the
+main request, its active checks and any descended links usually share an origin.
+The resolver here sits in front of thor's DNS lookup and remembers answers
+(and failures) for a while, coalescing concurrent lookups for the same name.
+"""
+
+import time
+from configparser import SectionProxy
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple, Union
+
+import thor.loop
+from netaddr import AddrFormatError, IPAddress  # type: ignore
+from thor.dns import lookup
+from thor.types import DnsResultList
+
+from redbot import metrics
+
+DnsCallback = Callable[[Union[DnsResultList, Exception]], None]
+DnsKey = Tuple[bytes, int, int]
+
+
+class DnsCache:
+    """
+    Cache DNS results for a while, keyed by host, port and socket type.
+
+    thor doesn't expose the TTLs of the records it resolves, so successful
+    answers are kept for dns_cache_ttl seconds and failures for dns_negative_ttl.
+    Both can be set to zero to disable caching.
+    """
+
+    def __init__(self) -> None:
+        self.ttl: float = 60
+        self.negative_ttl: float = 10
+        self.max_entries = 1000
+        self._entries: Dict[DnsKey, Tuple[float, Union[DnsResultList, Exception]]] = {}
+        self._pending: Dict[DnsKey, List[DnsCallback]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def setup(self, config: SectionProxy) -> None:
+        """Configure from config."""
+        self.ttl = config.getfloat("dns_cache_ttl", fallback=60)
+        self.negative_ttl = config.getfloat("dns_negative_ttl", fallback=10)
+        self.max_entries = config.getint("dns_cache_size", fallback=1000)
+
+    def lookup(
+        self,
+        loop: thor.loop.LoopBase,
+        host: bytes,
+        port: int,
+        proto: int,
+        callback: DnsCallback,
+    ) -> None:
+        """
+        Look up host, calling callback with the results (or an Exception) on loop.
+        Cached results are delivered on the next loop turn, like fresh ones.
+        """
+        key = (host.lower(), port, proto)
+        entry = self._entries.get(key, None)
+        if entry is not None:
+            expires, results = entry
+            if expires > time.monotonic():
+                self.hits += 1
+                loop.schedule(0, callback, results)
+                return
+            del self._entries[key]
+        if key in self._pending:
+            self.coalesced += 1
+            self._pending[key].append(callback)
+            return
+        self.misses += 1
+        self._pending[key] = [callback]
+
+        def handle_results(results: Union[DnsResultList, Exception]) -> None:
+            ttl = self.negative_ttl if isinstance(results, Exception) else self.ttl
+            if ttl > 0 and self.max_entries > 0:
+                now = time.monotonic()
+                self._store(key, now + ttl, results, now)
+            for waiting in self._pending.pop(key, []):
+                waiting(results)
+
+        lookup(loop, host, port, proto, handle_results)
+
+    def _store(
+        self,
+        key: DnsKey,
+        expires: float,
+        results: Union[DnsResultList, Exception],
+        now: float,
+    ) -> None:
+        if len(self._entries) >= self.max_entries:
+            for stale in [k for k, (exp, _) in self._entries.items() if exp <= now]:
+                del self._entries[stale]
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (expires, results)
+
+    def clear(self) -> None:
+        """Forget all cached results."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+        }
+
+
+resolver = DnsCache()
+metrics.register("dns", resolver.stats)
+
+
+@lru_cache(maxsize=4096)
+def is_global_address(address: str) -> bool:
+    """
+    Whether address is a globally routable IP address; used to stop REDbot
+    being pointed at local services. The verdict for an address never changes,
+    so it's memoised.
+    """
+    try:
+        return bool(IPAddress(address).is_global())
+    except (AddrFormatError, ValueError):
+        return False
+
+
+def _check_ip_stats() -> Dict[str, int]:
+    info = is_global_address.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize}
+
+
+metrics.register("check_ip", _check_ip_stats)
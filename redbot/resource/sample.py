@@ -0,0 +1,44 @@
+"""
+Bounded samples of response content.
+"""
+
+
+class SampleBuffer:
+    """
+    Keep the first `capacity` bytes fed to it; if capacity is 0, keep everything.
+
+    Chunks that run past the capacity are trimmed through a memoryview rather
+    than sliced, and once the buffer is full further chunks are only noted.
+    """
+
+    __slots__ = ("capacity", "truncated", "_buf")
+
+    def __init__(self, capacity: int = 0) -> None:
+        self.capacity = capacity
+        self.truncated = False
+        self._buf = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        "Add chunk to the sample, as far as there's room for it."
+        if not self.capacity:
+            self._buf += chunk
+            return
+        room = self.capacity - len(self._buf)
+        if room >= len(chunk):
+            self._buf += chunk
+        elif chunk:
+            self.truncated = True
+            if room > 0:
+                self._buf += memoryview(chunk)[:room]
+
+    @property
+    def full(self) -> bool:
+        "Whether no more content will be kept."
+        return bool(self.capacity) and len(self._buf) >= self.capacity
+
+    def getvalue(self) -> bytes:
+        "Return the sample."
+        return bytes(self._buf)
+
+    def __len__(self) -> int:
+        return len(self._buf)
@@ -0,0 +1,107 @@
+"""
+Scheduling of linked resource checks in descend mode.
+
+A page can link to a hundred or more resources, and checking each of those
+makes several requests, mostly to the same one or two origins. LinkScheduler
+queues them and only runs so many at once, both overall and for each origin,
+taking turns between origins so that one with many links doesn't hold up the
+others.
+"""
+
+import time
+from collections import OrderedDict, deque
+from functools import partial
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Tuple
+
+from redbot import metrics
+from redbot.utils import uri_origin
+
+if TYPE_CHECKING:
+    from redbot.resource import HttpResource
+
+# counters across all schedulers in the process
+_totals = {"queued": 0, "started": 0, "wait_ms": 0, "max_wait_ms": 0}
+metrics.register("link_scheduler", lambda: dict(_totals))
+
+
+class LinkScheduler:
+    """
+    Run checks of linked resources, at most max_active at a time and at most
+    max_per_origin at a time for any one origin (0 is unlimited).
+    """
+
+    def __init__(self, max_active: int = 0, max_per_origin: int = 0) -> None:
+        self.max_active = max_active
+        self.max_per_origin = max_per_origin
+        self.active = 0
+        self.max_queued = 0
+        self.started = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._active_by_origin: Dict[str, int] = {}
+        # origin -> resources waiting to start, with when they were queued.
+        # Origins take turns by moving to the end when one of theirs is started.
+        self._queues: "OrderedDict[str, Deque[Tuple[HttpResource, float]]]" = OrderedDict()
+
+    @property
+    def queued(self) -> int:
+        "How many checks are waiting to start."
+        return sum(len(queue) for queue in self._queues.values())
+
+    def submit(self, resource: "HttpResource") -> None:
+        "Check resource when there's room to."
+        origin = uri_origin(resource.request.uri or "")
+        self._queues.setdefault(origin, deque()).append((resource, time.monotonic()))
+        _totals["queued"] += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        self._run()
+
+    def _run(self) -> None:
+        while not self.max_active or self.active < self.max_active:
+            origin = self._next_origin()
+            if origin is None:
+                return
+            resource, queued_at = self._queues[origin].popleft()
+            if not self._queues[origin]:
+                del self._queues[origin]
+            else:
+                self._queues.move_to_end(origin)
+            _totals["queued"] -= 1
+            if resource.check_done or resource.fetch_done:
+                continue  # stopped while it was waiting.
+            wait = time.monotonic() - queued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.started += 1
+            _totals["started"] += 1
+            _totals["wait_ms"] += int(wait * 1000)
+            _totals["max_wait_ms"] = max(_totals["max_wait_ms"], int(wait * 1000))
+            self.active += 1
+            self._active_by_origin[origin] = self._active_by_origin.get(origin, 0) + 1
+            resource.once("check_done", partial(self._finished, origin))
+            resource.check()
+
+    def _next_origin(self) -> Optional[str]:
+        for origin in self._queues:
+            if not self.max_per_origin or (
+                self._active_by_origin.get(origin, 0) < self.max_per_origin
+            ):
+                return origin
+        return None
+
+    def _finished(self, origin: str) -> None:
+        self.active -= 1
+        self._active_by_origin[origin] -= 1
+        if not self._active_by_origin[origin]:
+            del self._active_by_origin[origin]
+        self._run()
+
+    def stats(self) -> Dict[str, float]:
+        "Return counters for the scheduler."
+        return {
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "started": self.started,
+            "mean_wait": self.total_wait / self.started if self.started else 0.0,
+            "max_wait": self.max_wait,
+        }
@@ -0,0 +1,65 @@
+"""
+Timings for the phases of a fetch.
+
+All times are from time.monotonic(); they're only meaningful relative to each other.
+"""
+
+from typing import Dict, Optional
+
+
+class ConnectionTimings:
+    """
+    When each step of setting up a connection happened.
+    """
+
+    def __init__(self) -> None:
+        self.dns_start: Optional[float] = None
+        self.dns_done: Optional[float] = None
+        self.connect_start: Optional[float] = None
+        self.tcp_done: Optional[float] = None
+        self.tls_done: Optional[float] = None
+
+    @property
+    def ready(self) -> Optional[float]:
+        "When the connection was ready to send a request on."
+        return self.tls_done or self.tcp_done
+
+
+class FetchTimings:
+    """
+    When each step of a fetch happened. The connection's timings are only present
+    when the fetch opened a new connection.
+    """
+
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.connection: Optional[ConnectionTimings] = None
+        self.first_byte: Optional[float] = None
+        self.last_byte: Optional[float] = None
+
+    def phases(self) -> Dict[str, int]:
+        """
+        Return how long each phase took in milliseconds, using HAR's names for them.
+        Phases that didn't happen (or weren't seen) are -1.
+        """
+        conn = self.connection
+        ready = self.start
+        out = {"blocked": -1, "dns": -1, "connect": -1, "ssl": -1, "send": 0}
+        if conn is not None and conn.ready is not None:
+            ready = conn.ready
+            if conn.dns_start is not None:
+                out["blocked"] = _ms(self.start, conn.dns_start)
+                out["dns"] = _ms(conn.dns_start, conn.dns_done)
+            if conn.connect_start is not None:
+                out["connect"] = _ms(conn.connect_start, conn.ready)
+            if conn.tls_done is not None:
+                out["ssl"] = _ms(conn.tcp_done, conn.tls_done)
+        out["wait"] = _ms(ready, self.first_byte)
+        out["receive"] = _ms(self.first_byte, self.last_byte)
+        return out
+
+
+def _ms(start: Optional[float], end: Optional[float]) -> int:
+    if start is None or end is None:
+        return -1
+    return max(0, round((end - start) * 1000))
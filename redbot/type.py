@@ -64,6 +64,7 @@ class LinkGenerator(Protocol):
     ) -> str: ...
 
     def client_error_link(self) -> str: ...
+    def progress_link(self, channel_id: str) -> str: ...
     def home_link(self, absolute: bool = False) -> str: ...
 
     def test_form(
@@ -76,6 +77,7 @@ class LinkGenerator(Protocol):
         descend: bool = False,
         css_class: str = "",
         title: str = "",
+        fresh: bool = False,
     ) -> str: ...
 
     def resource_link(
@@ -4,6 +4,7 @@ Utility functions for REDbot.
 
 from functools import partial
 from urllib.parse import quote as urlquote
+from urllib.parse import urldefrag, urlsplit, urlunsplit
 
 from markupsafe import Markup
 
@@ -29,6 +30,39 @@ e_query_arg = partial(unicode_url_escape, safe=r"!$'()*+,:@/?")
 e_fragment = partial(unicode_url_escape, safe=r"!$&'()*+,;:@=/?")
 
 
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_uri(uri: str) -> str:
+    """
+    Normalise an absolute URI so that different spellings of it compare equal:
+    drop the fragment, lowercase the scheme and host, remove a default port,
+    and use "/" for an empty path.
+    """
+    uri = urldefrag(uri)[0]
+    try:
+        parts = urlsplit(uri)
+        port = parts.port
+    except ValueError:
+        return uri
+    scheme = parts.scheme.lower()
+    if not parts.netloc:
+        return urlunsplit((scheme, parts.netloc, parts.path, parts.query, ""))
+    host = parts.hostname or ""
+    if ":" in host:
+        host = f"[{host}]"
+    if port is not None and port != DEFAULT_PORTS.get(scheme, None):
+        host = f"{host}:{port}"
+    userinfo, at, _ = parts.netloc.rpartition("@")
+    return urlunsplit((scheme, f"{userinfo}{at}{host}", parts.path or "/", parts.query, ""))
+
+
+def uri_origin(uri: str) -> str:
+    "Return the origin of uri (as scheme://host[:port]), normalised as in canonical_uri."
+    parts = urlsplit(canonical_uri(uri))
+    return f"{parts.scheme}://{parts.netloc.rpartition('@')[2]}"
+
+
 def e_js(instr: str) -> Markup:
     """
     Make sure instr is safe for writing into a double-quoted
@@ -23,10 +23,12 @@ from redbot.type import (
     LinkGenerator,
     RawHeaderListType,
 )
+from redbot.webui.compress import compressing_exchange
 from redbot.webui.handlers import (
     ClientErrorHandler,
     ErrorHandler,
     LoadSavedTestHandler,
+    ProgressHandler,
     RedirectHandler,
     RunTestHandler,
     SaveHandler,
@@ -49,6 +51,7 @@ class RedWebUi:
         SaveHandler,
         LoadSavedTestHandler,
         ClientErrorHandler,
+        ProgressHandler,
         RunTestHandler,
         RedirectHandler,
         ShowHandler,
@@ -76,7 +79,7 @@ class RedWebUi:
         self.query_string = parse_qs(query_string.decode(self.charset, "replace"))
         self.req_headers = req_headers
         self.req_body = req_body
-        self.exchange = exchange
+        self.exchange = compressing_exchange(exchange, req_headers, config)
         self.client_ip = client_ip
         self.console = console  # function to log errors to
 
@@ -0,0 +1,76 @@
+"""
+Coalescing of identical tests for RED, the Resource Expert Droid.
+
+When several people ask for the same test while it's running (as tends to
+happen when a site is having problems), they all share one HttpResource,
+rather than each sending the same requests to the origin.
+"""
+
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from redbot import metrics
+from redbot.resource import HttpResource
+
+CoalesceKey = Tuple[str, Tuple[Tuple[str, str], ...], bool]
+
+
+def coalesce_key(uri: str, req_hdrs: List[Tuple[str, str]], descend: bool) -> CoalesceKey:
+    """
+    Return the key that identifies a test. The set of checks run is always the
+    same; which of them is shown doesn't affect what's fetched, so isn't included.
+    """
+    return (uri, tuple((name.lower(), value) for (name, value) in req_hdrs), descend)
+
+
+class Coalescer:
+    """
+    Keep track of running tests and how many clients are watching each.
+    """
+
+    def __init__(self) -> None:
+        self._running: Dict[CoalesceKey, HttpResource] = {}
+        self._clients: Dict[HttpResource, int] = {}
+        self.coalesced = 0
+
+    def find(self, key: CoalesceKey) -> Optional[HttpResource]:
+        "Return the running test for key, if there is one."
+        resource = self._running.get(key, None)
+        if resource is not None:
+            self.coalesced += 1
+        return resource
+
+    def attach(self, key: CoalesceKey, resource: HttpResource) -> bool:
+        """
+        Note that a client is watching resource, which is the test for key.
+        Returns False (and doesn't count the client) if the test has already finished.
+        """
+        if resource.check_done:
+            return False
+        self._clients[resource] = self._clients.get(resource, 0) + 1
+        if key not in self._running:
+            self._running[key] = resource
+            resource.once("check_done", partial(self._finished, key, resource))
+        return True
+
+    def detach(self, resource: HttpResource) -> bool:
+        "A client has stopped watching resource. Returns True if nobody else is watching it."
+        count = self._clients.get(resource, 0) - 1
+        if count > 0:
+            self._clients[resource] = count
+            return False
+        self._clients.pop(resource, None)
+        return True
+
+    def _finished(self, key: CoalesceKey, resource: HttpResource) -> None:
+        if self._running.get(key, None) is resource:
+            del self._running[key]
+        self._clients.pop(resource, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the coalescer."""
+        return {"running": len(self._running), "coalesced": self.coalesced}
+
+
+coalescer = Coalescer()
+metrics.register("coalesce", coalescer.stats)
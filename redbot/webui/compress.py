@@ -0,0 +1,183 @@
+"""
+Compressing responses for the Web UI.
+
+CompressingExchange wraps a response exchange, compressing the content of
+textual responses with the best content-coding that the client's
+Accept-Encoding allows. Compression is streaming: whatever has been written
+is flushed to the client at the end of each turn of the loop, so that status
+updates and the like aren't held up waiting for more content.
+"""
+
+import zlib
+from configparser import SectionProxy
+from typing import Any, Dict, Optional
+
+import thor
+from thor.http import get_header
+
+from redbot import metrics
+from redbot.type import HttpResponseExchange, RawHeaderListType
+
+# content-codings, in order of preference, with the zlib wbits that produce them.
+CODINGS = {b"gzip": 31, b"deflate": 15}
+
+COMPRESSIBLE_TYPES = [
+    b"text/",
+    b"application/json",
+    b"application/javascript",
+    b"application/x-ndjson",
+    b"image/svg+xml",
+]
+
+
+def select_coding(req_headers: RawHeaderListType) -> Optional[bytes]:
+    "Return the most preferred content-coding that the request accepts, if any."
+    qvalues = {}
+    for value in get_header(req_headers, b"accept-encoding"):
+        for item in value.split(b","):
+            coding, _, params = item.partition(b";")
+            qvalue = 1.0
+            for param in params.split(b";"):
+                name, _, val = param.partition(b"=")
+                if name.strip().lower() == b"q":
+                    try:
+                        qvalue = float(val.strip())
+                    except ValueError:
+                        qvalue = 0.0
+            qvalues[coding.strip().lower()] = qvalue
+    best: Optional[bytes] = None
+    best_q = 0.0
+    for coding in CODINGS:
+        qvalue = qvalues.get(coding, qvalues.get(b"*", 0.0))
+        if qvalue > best_q:
+            best, best_q = coding, qvalue
+    return best
+
+
+def is_compressible(res_hdrs: RawHeaderListType) -> bool:
+    "Whether a response with res_hdrs is worth compressing."
+    if get_header(res_hdrs, b"content-encoding"):
+        return False
+    content_types = get_header(res_hdrs, b"content-type")
+    if not content_types:
+        return False
+    content_type = content_types[0].lower()
+    return any(content_type.startswith(compressible) for compressible in COMPRESSIBLE_TYPES)
+
+
+class CompressingExchange:
+    """
+    Compress a response, if the request and response allow.
+
+    Anything other than starting, writing and finishing the response is
+    passed through to the wrapped exchange.
+    """
+
+    def __init__(
+        self, exchange: HttpResponseExchange, req_headers: RawHeaderListType, level: int = 6
+    ) -> None:
+        self.exchange = exchange
+        self.coding = select_coding(req_headers)
+        self.level = level
+        self._compressor: Optional[Any] = None  # zlib's compression object isn't exposed
+        self._flush_scheduled: Optional[thor.loop.ScheduledEvent] = None
+        self._bytes_in = 0
+        self._bytes_out = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.exchange, name)
+
+    def response_start(
+        self, status_code: bytes, status_phrase: bytes, res_hdrs: RawHeaderListType
+    ) -> None:
+        if status_code not in [b"204", b"304"] and is_compressible(res_hdrs):
+            res_hdrs = add_vary(res_hdrs, b"Accept-Encoding")
+            if self.coding:
+                self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, CODINGS[self.coding])
+                res_hdrs = [(n, v) for (n, v) in res_hdrs if n.lower() != b"content-length"]
+                res_hdrs.append((b"Content-Encoding", self.coding))
+        self.exchange.response_start(status_code, status_phrase, res_hdrs)
+
+    def response_body(self, chunk: bytes) -> None:
+        if self._compressor is None:
+            self.exchange.response_body(chunk)
+            return
+        self._bytes_in += len(chunk)
+        self._write(self._compressor.compress(chunk))
+        if self._flush_scheduled is None:
+            self._flush_scheduled = thor.schedule(0, self.flush)
+
+    def flush(self) -> None:
+        "Send everything written so far to the client."
+        self._flush_scheduled = None
+        if self._compressor is not None:
+            self._write(self._compressor.flush(zlib.Z_SYNC_FLUSH))
+
+    def response_done(self, trailers: RawHeaderListType) -> None:
+        if self._compressor is not None:
+            if self._flush_scheduled is not None:
+                self._flush_scheduled.delete()
+                self._flush_scheduled = None
+            self._write(self._compressor.flush(zlib.Z_FINISH))
+            self._compressor = None
+            compression_counters.add(self._bytes_in, self._bytes_out)
+        self.exchange.response_done(trailers)
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self._bytes_out += len(data)
+            self.exchange.response_body(data)
+
+
+def add_vary(res_hdrs: RawHeaderListType, field_name: bytes) -> RawHeaderListType:
+    "Return res_hdrs with field_name added to Vary."
+    out: RawHeaderListType = []
+    added = False
+    for name, value in res_hdrs:
+        if name.lower() == b"vary" and not added:
+            value = value + b", " + field_name
+            added = True
+        out.append((name, value))
+    if not added:
+        out.append((b"Vary", field_name))
+    return out
+
+
+def compressing_exchange(
+    exchange: HttpResponseExchange, req_headers: RawHeaderListType, config: SectionProxy
+) -> HttpResponseExchange:
+    "Wrap exchange so that its responses are compressed, unless compress_level is 0."
+    level = config.getint("compress_level", fallback=6)
+    if not level:
+        return exchange
+    return CompressingExchange(exchange, req_headers, level)
+
+
+class CompressionCounters:
+    """
+    Counts of compressed responses, and how much they were compressed.
+    """
+
+    def __init__(self) -> None:
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def add(self, bytes_in: int, bytes_out: int) -> None:
+        "Count a compressed response."
+        self.responses += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+    def stats(self) -> Dict[str, int]:
+        "Return counters for compressed responses."
+        return {
+            "responses": self.responses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+        }
+
+
+compression_counters = CompressionCounters()
+metrics.register("compression", compression_counters.stats)
@@ -6,6 +6,7 @@ This package contains all request handlers implementing the RequestHandler patte
 
 from redbot.webui.handlers.client_error import ClientErrorHandler
 from redbot.webui.handlers.error import ErrorHandler
+from redbot.webui.handlers.progress import ProgressHandler
 from redbot.webui.handlers.run_test import RunTestHandler
 from redbot.webui.handlers.save import LoadSavedTestHandler, SaveHandler
 from redbot.webui.handlers.show import RedirectHandler, ShowHandler
@@ -14,6 +15,7 @@ __all__ = [
     "SaveHandler",
     "LoadSavedTestHandler",
     "ClientErrorHandler",
+    "ProgressHandler",
     "RunTestHandler",
     "ShowHandler",
     "RedirectHandler",
@@ -0,0 +1,94 @@
+"""
+Progress handler for REDbot Web UI.
+
+This module provides a handler that streams the progress of a running test
+as Server-Sent Events.
+"""
+
+from urllib.parse import urlencode
+
+import thor.events
+
+from redbot.formatter import find_formatter
+from redbot.type import RedWebUiProtocol
+from redbot.webui.handlers.base import RequestHandler
+from redbot.webui.progress import progress_channels
+
+
+class ProgressHandler(RequestHandler):
+    """
+    Handler for following a running test.
+
+    This handler responds to GET requests with 'id' in the query string,
+    naming a progress channel opened when the test was started. It streams
+    the test's status (and debug, when enabled) as Server-Sent Events until
+    the test is done. It doesn't start a test, so it isn't rate limited.
+    """
+
+    @classmethod
+    def can_handle(cls, ui: RedWebUiProtocol) -> bool:
+        """
+        Determine if this handler should process the request.
+
+        Handles GET requests for progress with 'id' in query string.
+        """
+        return (
+            ui.method == "GET"
+            and len(ui.path) > 0
+            and ui.path[0] == "progress"
+            and "id" in ui.query_string
+        )
+
+    @classmethod
+    def handle(cls, ui: RedWebUiProtocol) -> None:
+        """
+        Stream the progress of the test, or if it has already finished (or never
+        existed), respond with 204 No Content, which tells EventSource not to
+        reconnect.
+        """
+        resource = progress_channels.get(ui.query_string.get("id", [""])[0])
+        if resource is None:
+            ui.exchange.response_start(b"204", b"No Content", [(b"Cache-Control", b"no-store")])
+            ui.exchange.response_done([])
+            ui.response_done = True
+            return
+
+        formatter = find_formatter("sse")(
+            ui.config,
+            resource,
+            ui.output,
+            {"locale": ui.locale},
+        )
+
+        @thor.events.on(formatter)
+        def formatter_done() -> None:
+            if not ui.response_done:
+                ui.exchange.response_done([])
+                ui.response_done = True
+
+        ui.exchange.response_start(
+            b"200",
+            b"OK",
+            [
+                (b"Content-Type", formatter.content_type()),
+                (b"Cache-Control", b"no-store"),
+            ],
+        )
+        ui.response_started = True
+        formatter.bind_resource(resource)
+
+    @classmethod
+    def render_link(cls, ui: RedWebUiProtocol, absolute: bool = False, **kwargs: str) -> str:
+        """
+        Generate a URI for following a test's progress.
+
+        Args:
+            ui: The WebUI instance
+            absolute: If True, return absolute URI
+            **kwargs: Supported keys:
+                - id (str): The progress channel id
+
+        Returns:
+            URI for the progress endpoint
+        """
+        return f"{cls.get_base_uri(ui, absolute)}progress?{urlencode({'id': kwargs['id']})}"
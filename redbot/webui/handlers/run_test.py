@@ -19,8 +19,11 @@ from redbot.resource.active_check import active_checks
 from redbot.type import RawHeaderListType, RedWebUiProtocol
 from redbot.utils import e_url
 from redbot.webui.captcha import CaptchaHandler
+from redbot.webui.coalesce import CoalesceKey, coalesce_key, coalescer
 from redbot.webui.handlers.base import RequestHandler
+from redbot.webui.progress import progress_channels
 from redbot.webui.ratelimit import ratelimiter
+from redbot.webui.result_cache import result_cache
 from redbot.webui.saved_tests import init_save_file, save_test
 
 if TYPE_CHECKING:
@@ -97,8 +100,23 @@ class RunTestHandler(RequestHandler):
             return
         descend = "descend" in ui.query_string
 
-        top_resource = HttpResource(ui.config, descend=descend)
-        top_resource.set_request(test_uri, headers=test_req_hdrs)
+        # if the same test has just finished or is already running, show that one rather
+        # than starting another.
+        key = coalesce_key(test_uri, test_req_hdrs, descend)
+        shared_resource = None
+        cached_at = None
+        if "fresh" not in ui.query_string:
+            cached = result_cache.get(key)
+            if cached is not None:
+                shared_resource, cached_at = cached
+        if shared_resource is None and ui.config.getboolean("coalesce_tests", fallback=True):
+            shared_resource = coalescer.find(key)
+        if shared_resource is not None:
+            top_resource = shared_resource
+        else:
+            top_resource = HttpResource(ui.config, descend=descend)
+            top_resource.set_request(test_uri, headers=test_req_hdrs)
+            top_resource.budget.client_id = ui.get_client_id()
         format_ = ui.query_string.get("format", ["html"])[0]
 
         check_name = ui.query_string.get("check_name", [""])[0]
@@ -118,13 +136,24 @@ class RunTestHandler(RequestHandler):
                 "is_saved": False,
                 "test_id": test_id,
                 "descend": descend,
+                "req_hdrs": test_req_hdrs,
                 "nonce": ui.nonce,
                 "locale": ui.locale,
                 "link_generator": ui.link_generator,
                 "check_name": check_title or check_name,
+                "cached_at": cached_at,
+                "compact": "compact" in ui.query_string,
             },
         )
-        continue_test = partial(cls._continue_test, ui, top_resource, formatter)
+        continue_test = partial(
+            cls._continue_test,
+            ui,
+            top_resource,
+            formatter,
+            key,
+            shared_resource is not None,
+            cached_at is not None,
+        )
         timeout_error = partial(ui.timeout_error, formatter)
         update_wrapper(timeout_error, ui.timeout_error)
 
@@ -159,7 +188,9 @@ class RunTestHandler(RequestHandler):
 
         # enforce client limits
         try:
-            ratelimiter.process(ui, test_uri, ui.error_response)
+            ratelimiter.process(
+                ui, test_uri, ui.error_response, count_origin=shared_resource is None
+            )
         except ValueError:
             return  # over limit, don't continue.
 
@@ -180,9 +211,15 @@ class RunTestHandler(RequestHandler):
         ui: RedWebUiProtocol,
         top_resource: HttpResource,
         formatter: "Formatter",
+        key: CoalesceKey,
+        shared: bool,
+        cached: bool,
         extra_headers: Optional[RawHeaderListType] = None,
     ) -> None:
-        """Preliminary checks are done; actually run the test."""
+        """
+        Preliminary checks are done; actually run the test, or if shared, follow
+        the one that's already running (or show the cached one).
+        """
 
         # The response may already have been finalized while we were waiting
         # for captcha verification (e.g. the runtime timeout fired and sent a
@@ -193,8 +230,20 @@ class RunTestHandler(RequestHandler):
         if not extra_headers:
             extra_headers = []
 
+        # cached results have already finished, so there's nothing to watch.
+        watching = not cached and coalescer.attach(key, top_resource)
+
+        def stop_watching() -> bool:
+            "Stop counting this client as watching; returns True if it was the last one."
+            nonlocal watching
+            if not watching:
+                return False
+            watching = False
+            return coalescer.detach(top_resource)
+
         @thor.events.on(formatter)
         def formatter_done() -> None:
+            stop_watching()
             if ui.timeout:
                 ui.timeout.delete()
                 ui.timeout = None
@@ -202,30 +251,27 @@ class RunTestHandler(RequestHandler):
                 ui.exchange.response_done([])
                 ui.response_done = True
             save_test(ui, top_resource)
+            result_cache.add(key, top_resource)
 
             # log excessive traffic
             log_traffic = ui.config.getint("log_traffic", None)
             if log_traffic:
-                ti = sum(
-                    [i.transfer_in for i, t in top_resource.linked],
-                    top_resource.transfer_in,
-                )
-                to = sum(
-                    [i.transfer_out for i, t in top_resource.linked],
-                    top_resource.transfer_out,
-                )
+                ti = top_resource.budget.bytes_in
+                to = top_resource.budget.bytes_out
                 if ti + to > log_traffic * 1024:
-
+                    conns = top_resource.connection_counts()
                     ui.error_log(
                         f"{ti / 1024:n}K in "
                         f"{to / 1024:n}K out "
+                        f"({conns['new']} new / {conns['reused']} reused connections) "
                         f"for <{e_url(str(top_resource.request.uri))}> "
                     )
 
         # Stop the resource if the client disconnects
         @thor.events.on(cast(thor.events.EventEmitter, ui.exchange))
         def close() -> None:
-            top_resource.stop()
+            if stop_watching() and not top_resource.check_done:
+                top_resource.stop()
 
         ui.exchange.response_start(
             b"200",
@@ -249,8 +295,11 @@ class RunTestHandler(RequestHandler):
             )
         else:
             display_resource = top_resource
+        if formatter.uses_progress_channel:
+            formatter.kw["progress_id"] = progress_channels.open(display_resource)
         formatter.bind_resource(display_resource)
-        top_resource.check()
+        if not shared:
+            top_resource.check()
 
     @classmethod
     def render_link(cls, ui: RedWebUiProtocol, absolute: bool = False, **kwargs: str) -> str:
@@ -266,6 +315,7 @@ class RunTestHandler(RequestHandler):
                 - format (str): Output format (default: html)
                 - descend (str): "True" to descend into linked resources
                 - check_name (str): Specific check to display
+                - fresh (str): "True" to run the test even if a cached result is available
 
         Returns:
             URI for the test endpoint
@@ -287,6 +337,8 @@ class RunTestHandler(RequestHandler):
             params.append(("descend", "True"))
         if kwargs.get("check_name"):
             params.append(("check_name", kwargs["check_name"]))
+        if kwargs.get("fresh") == "True":
+            params.append(("fresh", "True"))
 
         return f"{base_uri}check?{urlencode(params)}"
 
@@ -310,6 +362,7 @@ class RunTestHandler(RequestHandler):
                 - format (str): Output format (default: html)
                 - descend (str): "True" to descend into linked resources
                 - check_name (str): Specific check to display
+                - fresh (str): "True" to run the test even if a cached result is available
                 - css_class (str): CSS class for the submit button
                 - title (str): Title attribute for the submit button
 
@@ -329,6 +382,8 @@ class RunTestHandler(RequestHandler):
             query_params.append(("descend", "True"))
         if kwargs.get("check_name"):
             query_params.append(("check_name", kwargs["check_name"]))
+        if kwargs.get("fresh") == "True":
+            query_params.append(("fresh", "True"))
 
         action = f"{base_uri}check"
         if query_params:
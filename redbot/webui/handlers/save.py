@@ -194,6 +194,7 @@ class LoadSavedTestHandler(RequestHandler):
                 "test_id": test_id,
                 "nonce": ui.nonce,
                 "link_generator": ui.link_generator,
+                "compact": "compact" in ui.query_string,
             },
         )
 
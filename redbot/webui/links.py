@@ -8,6 +8,7 @@ from redbot.type import RedWebUiProtocol
 from redbot.webui.handlers import (
     ClientErrorHandler,
     LoadSavedTestHandler,
+    ProgressHandler,
     RunTestHandler,
     SaveHandler,
     ShowHandler,
@@ -48,6 +49,10 @@ class WebUiLinkGenerator:
         """Generate a link for client error reporting."""
         return ClientErrorHandler.render_link(self.ui)
 
+    def progress_link(self, channel_id: str) -> str:
+        """Generate a link for following a test's progress."""
+        return ProgressHandler.render_link(self.ui, id=channel_id)
+
     def home_link(self, absolute: bool = False) -> str:
         """Generate a link to the home page."""
         return ShowHandler.render_link(self.ui, absolute=absolute)
@@ -62,6 +67,7 @@ class WebUiLinkGenerator:
         descend: bool = False,
         css_class: str = "",
         title: str = "",
+        fresh: bool = False,
     ) -> str:
         """Generate a form for running a test."""
         return RunTestHandler.render_form(
@@ -74,6 +80,7 @@ class WebUiLinkGenerator:
             descend="True" if descend else "",
             css_class=css_class,
             title=title,
+            fresh="True" if fresh else "",
         )
 
     def resource_link(
@@ -0,0 +1,51 @@
+"""
+Progress channels for running tests.
+
+Rather than writing an inline script into the results page for every status
+update, the page follows the test's progress as Server-Sent Events (see
+ProgressHandler), using the channel id it was given when the test started.
+"""
+
+from functools import partial
+from secrets import token_urlsafe
+from typing import Dict, Optional
+
+from redbot import metrics
+from redbot.resource import HttpResource
+
+
+class ProgressChannels:
+    """
+    The running tests that can be followed, by channel id.
+    """
+
+    def __init__(self) -> None:
+        self._channels: Dict[str, HttpResource] = {}
+
+    def open(self, resource: HttpResource) -> Optional[str]:
+        """
+        Return the id of a new channel for following resource, or None if it has
+        already finished. The channel closes when the test does.
+        """
+        if resource.check_done:
+            return None
+        channel_id = token_urlsafe(16)
+        self._channels[channel_id] = resource
+        resource.once("check_done", partial(self.close, channel_id))
+        return channel_id
+
+    def get(self, channel_id: str) -> Optional[HttpResource]:
+        "Return the running test for channel_id, if there is one."
+        return self._channels.get(channel_id, None)
+
+    def close(self, channel_id: str) -> None:
+        "Stop following a test."
+        self._channels.pop(channel_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the progress channels."""
+        return {"open": len(self._channels)}
+
+
+progress_channels = ProgressChannels()
+metrics.register("progress", progress_channels.stats)
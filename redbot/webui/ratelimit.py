@@ -27,8 +27,12 @@ class RateLimiter:
         webui: RedWebUiProtocol,
         test_uri: str,
         error_response: Callable[..., None],
+        count_origin: bool = True,
     ) -> None:
-        """Enforce limits on webui."""
+        """
+        Enforce limits on webui. If count_origin is False, the test doesn't count
+        against the origin's limit (e.g., because it doesn't cause any requests).
+        """
         if not self.running:
             self.setup(webui.config)
 
@@ -48,7 +52,7 @@ class RateLimiter:
 
         # enforce origin limits
         origin = url_to_origin(test_uri)
-        if origin:
+        if origin and count_origin:
             try:
                 self.increment("origin", origin)
             except RateLimitViolation as exc:
@@ -0,0 +1,111 @@
+"""
+Caching of finished tests for RED, the Resource Expert Droid.
+
+People refresh results pages and share links to them, so the same test is often
+asked for again seconds after it finished. Keeping finished tests for a short
+while lets us show those results again rather than re-running them.
+"""
+
+import time
+from collections import OrderedDict
+from configparser import SectionProxy
+from typing import Dict, List, Optional, Tuple
+
+from redbot import metrics
+from redbot.resource import HttpResource
+from redbot.resource.fetch import RedFetcher
+from redbot.webui.coalesce import CoalesceKey
+
+FETCHER_OVERHEAD = 4096  # rough size of a fetcher's objects and notes, less content
+
+
+def footprint(resource: HttpResource) -> int:
+    "Estimate how much memory a test's resources use, in bytes."
+    fetchers: List[RedFetcher] = [resource]
+    fetchers.extend(resource.subreqs.values())
+    size = 0
+    for fetcher in fetchers:
+        size += FETCHER_OVERHEAD + fetcher.response_header_length
+        size += len(fetcher.response_content_sample) + len(fetcher.response_decoded_sample)
+    for linked in resource.linked_resources():
+        size += footprint(linked)
+    return size
+
+
+class ResultCache:
+    """
+    Finished tests, kept for ttl seconds; when they take up more than max_size
+    bytes, the least recently used are dropped. A ttl of 0 disables the cache.
+    """
+
+    def __init__(self, ttl: float = 0, max_size: int = 0) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # key -> (resource, expiry (monotonic), when it was stored (epoch), size)
+        self._entries: "OrderedDict[CoalesceKey, Tuple[HttpResource, float, float, int]]" = (
+            OrderedDict()
+        )
+
+    def setup(self, config: SectionProxy) -> None:
+        """Configure from config."""
+        self.ttl = config.getfloat("result_cache_ttl", fallback=0)
+        self.max_size = config.getint("result_cache_kbytes", fallback=65536) * 1024
+
+    def get(self, key: CoalesceKey) -> Optional[Tuple[HttpResource, float]]:
+        "Return the cached test for key and when it finished, if there's a fresh one."
+        entry = self._entries.get(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        resource, expiry, stored, _ = entry
+        if expiry <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return resource, stored
+
+    def add(self, key: CoalesceKey, resource: HttpResource) -> None:
+        "Cache a finished test."
+        if not self.ttl or not resource.check_done or resource.stopped:
+            return
+        if key in self._entries:
+            if self._entries[key][0] is resource:
+                return
+            self._remove(key)
+        size = footprint(resource)
+        if self.max_size and size > self.max_size:
+            return
+        now = time.monotonic()
+        for expired in [k for (k, entry) in self._entries.items() if entry[1] <= now]:
+            self._remove(expired)
+        self._entries[key] = (resource, now + self.ttl, time.time(), size)
+        self.size += size
+        while self.max_size and self.size > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: CoalesceKey) -> None:
+        _, _, _, size = self._entries.pop(key)
+        self.size -= size
+
+    def clear(self) -> None:
+        "Empty the cache."
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the cache."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+result_cache = ResultCache()
+metrics.register("result_cache", result_cache.stats)
@@ -0,0 +1,217 @@
+"""
+Static assets for the Web UI, held in memory.
+
+StaticAssets loads every asset once at startup, along with its gzip and
+deflate variants (when they're smaller, and compress_level isn't 0) and a
+strong ETag for each, so serving one never touches the filesystem and
+conditional requests get 304s.
+
+With static_hashed_urls, each asset can also be fetched at a URL with a hash
+of its content in the name (see url()), which can be cached forever.
+"""
+
+import copy
+import hashlib
+import os
+import zlib
+from configparser import SectionProxy
+from typing import Dict, Iterator, Optional, Tuple
+
+from importlib_resources.abc import Traversable
+from thor.http import get_header
+
+import redbot
+from redbot import metrics
+from redbot.type import RawHeaderListType
+from redbot.webui.compress import CODINGS, compression_counters, is_compressible, select_coding
+
+STATIC_TYPES = {
+    b".html": b"text/html",
+    b".js": b"text/javascript",
+    b".css": b"text/css",
+    b".png": b"image/png",
+    b".txt": b"text/plain",
+    b".woff": b"font/woff",
+    b".ttf": b"font/ttf",
+    b".eot": b"application/vnd.ms-fontobject",
+    b".svg": b"image/svg+xml",
+}
+
+CACHE_CONTROL = b"max-age=86400"
+IMMUTABLE_CACHE_CONTROL = b"max-age=31536000, immutable"
+
+StaticResponse = Tuple[bytes, bytes, RawHeaderListType, bytes]
+
+
+class StaticAsset:
+    """
+    A static asset, ready to serve.
+    """
+
+    def __init__(
+        self,
+        content: bytes,
+        content_type: bytes,
+        cache_control: bytes = CACHE_CONTROL,
+        compress_level: int = 9,
+    ) -> None:
+        self.content = content
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.compress_level = compress_level
+        self.digest = hashlib.sha256(content).hexdigest()
+        self.encoded: Dict[bytes, bytes] = {}
+        if compress_level and is_compressible([(b"Content-Type", content_type)]):
+            for coding, wbits in CODINGS.items():
+                compressor = zlib.compressobj(compress_level, zlib.DEFLATED, wbits)
+                encoded = compressor.compress(content) + compressor.flush()
+                if len(encoded) < len(content):
+                    self.encoded[coding] = encoded
+
+    def etag(self, coding: Optional[bytes] = None) -> bytes:
+        "The strong ETag for the asset, when sent with coding."
+        tag = self.digest[:20].encode("ascii")
+        if coding:
+            tag += b"-" + coding
+        return b'"%s"' % tag
+
+    def response(self, req_headers: RawHeaderListType) -> StaticResponse:
+        "Return the status code, phrase, headers and content to respond to a request with."
+        coding = select_coding(req_headers) if self.encoded else None
+        if coding not in self.encoded:
+            coding = None
+        etag = self.etag(coding)
+        headers = [
+            (b"Content-Type", self.content_type),
+            (b"Cache-Control", self.cache_control),
+            (b"ETag", etag),
+        ]
+        if self.compress_level and is_compressible(headers):
+            headers.append((b"Vary", b"Accept-Encoding"))
+        content = self.content
+        if coding:
+            headers.append((b"Content-Encoding", coding))
+            content = self.encoded[coding]
+        # also on 304s, so that the server knows there's no content to delimit.
+        headers.append((b"Content-Length", str(len(content)).encode("ascii")))
+        if etag_matches(etag, req_headers):
+            return b"304", b"Not Modified", headers, b""
+        if coding:
+            compression_counters.add(len(self.content), len(content))
+        return b"200", b"OK", headers, content
+
+
+def etag_matches(etag: bytes, req_headers: RawHeaderListType) -> bool:
+    "Whether the request's If-None-Match matches etag (using weak comparison)."
+    for value in get_header(req_headers, b"if-none-match"):
+        for candidate in value.split(b","):
+            candidate = candidate.strip()
+            if candidate == b"*" or candidate.replace(b"W/", b"", 1) == etag:
+                return True
+    return False
+
+
+def hashed_name(path: str, digest: str) -> str:
+    "Return path with digest worked into the file name."
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:12]}{ext}"
+
+
+class StaticAssets:
+    """
+    The static assets served by the daemon, by request path.
+    """
+
+    def __init__(self) -> None:
+        self.assets: Dict[bytes, StaticAsset] = {}
+        self.hashed_names: Dict[str, str] = {}
+        self.hits = 0
+        self.not_modified = 0
+
+    def setup(
+        self,
+        config: SectionProxy,
+        static_root: bytes,
+        static_files: Traversable,
+        extra_files: Dict[bytes, bytes],
+    ) -> None:
+        """
+        Load the assets in static_files (to be served under static_root) and
+        extra_files (a dictionary of request paths to content), compressing them
+        at compress_level.
+        """
+        hashed = config.getboolean("static_hashed_urls", fallback=False)
+        level = config.getint("compress_level", fallback=6)
+        self.assets = {}
+        self.hashed_names = {}
+        for name, content in walk_traversable(static_files):
+            asset = StaticAsset(content, media_type_for(name), compress_level=level)
+            self.assets[static_root + b"/" + name.encode("utf-8")] = asset
+            if hashed:
+                hashed_path = hashed_name(name, asset.digest)
+                self.hashed_names[name] = hashed_path
+                immutable = copy.copy(asset)
+                immutable.cache_control = IMMUTABLE_CACHE_CONTROL
+                self.assets[static_root + b"/" + hashed_path.encode("utf-8")] = immutable
+        for path, content in extra_files.items():
+            self.assets[os.path.normpath(path)] = StaticAsset(
+                content, media_type_for(path.decode("utf-8", "replace")), compress_level=level
+            )
+
+    def get(self, path: bytes) -> Optional[StaticAsset]:
+        "Return the asset for a request path, if there is one."
+        return self.assets.get(os.path.normpath(path), None)
+
+    def respond(self, path: bytes, req_headers: RawHeaderListType) -> Optional[StaticResponse]:
+        "Return the response to a request for path, or None if there's no such asset."
+        asset = self.get(path)
+        if asset is None:
+            return None
+        response = asset.response(req_headers)
+        self.hits += 1
+        if response[0] == b"304":
+            self.not_modified += 1
+        return response
+
+    def url(self, name: str) -> str:
+        """
+        Return the URL (relative to the static root) to refer to the asset name with:
+        its hashed name if there is one, otherwise name with a version query.
+        """
+        hashed = self.hashed_names.get(name, None)
+        if hashed:
+            return hashed
+        return f"{name}?{redbot.__version__}"
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for the static assets."""
+        loaded = {id(asset.content): asset for asset in self.assets.values()}.values()
+        return {
+            "assets": len(self.assets),
+            "bytes": sum(
+                len(asset.content) + sum(len(e) for e in asset.encoded.values()) for asset in loaded
+            ),
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+        }
+
+
+def media_type_for(name: str) -> bytes:
+    "Return the media type to serve the file name with."
+    file_ext = os.path.splitext(name)[1].lower().encode("ascii", "replace") or b".html"
+    return STATIC_TYPES.get(file_ext, b"application/octet-stream")
+
+
+def walk_traversable(root: Traversable, prefix: str = "") -> Iterator[Tuple[str, bytes]]:
+    "Yield the relative name and content of each asset file under root."
+    for entry in root.iterdir():
+        if entry.name.startswith("__") or entry.name.endswith((".py", ".pyc")):
+            continue
+        if entry.is_dir():
+            yield from walk_traversable(entry, f"{prefix}{entry.name}/")
+        else:
+            yield f"{prefix}{entry.name}", entry.read_bytes()
+
+
+static_assets = StaticAssets()
+metrics.register("static_assets", static_assets.stats)
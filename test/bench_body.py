@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+"""
+Throughput benchmark for RedFetcher's response body handling.
+
+Feeds multi-megabyte bodies through RedFetcher._response_body in network-sized
+chunks, with a formatter bound as the Web UI does, and reports MB/s. Run with:
+
+    python test/bench_body.py [size_mb ...]
+"""
+
+import sys
+import time
+from configparser import ConfigParser
+
+from redbot.formatter import find_formatter
+from redbot.resource import HttpResource
+
+CHUNK_SIZE = 16 * 1024
+
+
+def make_resource():
+    config = ConfigParser()
+    config.read_dict({"redbot": {"enable_local_access": "true"}})
+    resource = HttpResource(config["redbot"])
+    resource.set_request("http://example.com/")
+    formatter = find_formatter("html")(
+        config["redbot"], resource, lambda out: None, {"nonce": "", "locale": "en"}
+    )
+    formatter.bind_resource(resource)
+    resource.response.process_response_topline(b"1.1", b"200", b"OK")
+    resource.response.process_headers([(b"Content-Type", b"text/plain")])
+    return resource
+
+
+def bench(size_mb):
+    resource = make_resource()
+    chunk = b"x" * CHUNK_SIZE
+    chunks = size_mb * 1024 * 1024 // CHUNK_SIZE
+    start = time.perf_counter()
+    for _ in range(chunks):
+        resource._response_body(chunk)  # pylint: disable=protected-access
+    elapsed = time.perf_counter() - start
+    print(f"{size_mb:>4} MB: {elapsed * 1000:8.1f} ms  {size_mb / elapsed:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or [4, 16, 64]:
+        bench(size)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark for linking content links in the HTML body sample.
+
+Builds pages with a given number of distinct links, padded to a given size, and
+times SingleEntryHtmlFormatter.format_body_sample with content_links on. Time
+per MB should stay flat as either grows. Run with:
+
+    python test/bench_content_links.py [links ...]
+"""
+
+import sys
+import time
+from configparser import ConfigParser
+
+from redbot.formatter.html import SingleEntryHtmlFormatter
+from redbot.resource import HttpResource
+
+SIZES_KB = [64, 256, 1024]
+
+
+def make_formatter(links, size):
+    config = ConfigParser()
+    config.read_dict({"redbot": {"content_links": "yes"}})
+    resource = HttpResource(config["redbot"])
+    resource.set_request("http://example.com/")
+    resource.response.base_uri = "http://example.com/"
+    resource.response_decoded_sample.capacity = 0
+    uris = [f"/page/{i}.html" for i in range(links)]
+    resource.links = {"a": set(uris)}
+    tags = "".join(f'<p>Some "text" it\'s <a href="{uri}">link</a></p>\n' for uri in uris)
+    padding = "<p>Some &amp; more 'text' here, and no links at all.</p>\n"
+    body = tags + padding * max(0, (size - len(tags)) // len(padding))
+    resource.response_decoded_sample.feed(body.encode("utf-8"))
+    formatter = SingleEntryHtmlFormatter(
+        config["redbot"], resource, lambda out: None, {"nonce": "", "locale": "en"}
+    )
+    return formatter, resource
+
+
+def bench(links):
+    line = f"{links:>6} links:"
+    for size_kb in SIZES_KB:
+        formatter, resource = make_formatter(links, size_kb * 1024)
+        start = time.perf_counter()
+        formatter.format_body_sample(resource)
+        elapsed = time.perf_counter() - start
+        line += f"  {size_kb:>5} KB {elapsed * 1000:7.1f} ms ({elapsed * 1024 / size_kb:.3f} s/MB)"
+    print(line)
+
+
+if __name__ == "__main__":
+    for count in [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000]:
+        bench(count)
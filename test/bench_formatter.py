@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark for HTML formatter construction.
+
+Creates formatters as the Web UI does for each test, and reports how long each
+takes to construct. Run with:
+
+    python test/bench_formatter.py [count]
+"""
+
+import sys
+import time
+from configparser import ConfigParser
+
+from redbot.formatter.html import SingleEntryHtmlFormatter, TableHtmlFormatter
+from redbot.resource import HttpResource
+
+
+def bench(count):
+    config = ConfigParser()
+    config.read_dict({"redbot": {}})
+    resource = HttpResource(config["redbot"])
+    resource.set_request("http://example.com/")
+    for cls in [SingleEntryHtmlFormatter, TableHtmlFormatter]:
+        start = time.perf_counter()
+        for _ in range(count):
+            cls(config["redbot"], resource, lambda out: None, {"nonce": "", "locale": "en"})
+        elapsed = time.perf_counter() - start
+        print(f"{cls.__name__:>26}: {elapsed / count * 1000000:8.1f} us each")
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if sys.argv[1:] else 10000)
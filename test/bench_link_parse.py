@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Throughput benchmark for the link parsers.
+
+Feeds HTML documents through each engine in network-sized chunks, checks that
+they find the same links, and reports MB/s. Pass paths to saved pages to use
+real-world HTML; otherwise a synthetic page is used. Run with:
+
+    python test/bench_link_parse.py [page.html ...]
+"""
+
+import sys
+import time
+
+from httplint.message import HttpMessageLinter
+
+from redbot.resource.link_parse import link_parsers
+
+CHUNK_SIZE = 16 * 1024
+ROUNDS = 5
+
+SYNTHETIC = (
+    "<html><head><title>bench</title>"
+    '<link rel="stylesheet" href="/s.css"><script src="/a.js"></script></head><body>'
+    + (
+        '<div class="row"><p>Some <em>text</em> &amp; a <a href="/p?id=1&amp;x=2" '
+        'title="link">link</a>.</p><img src="/i.png" alt="i"><!-- note -->'
+        "<script>if (a < b) { document.write('<a href=x>'); }</script></div>\n"
+    )
+    * 5000
+    + "</body></html>"
+)
+
+
+def parse(cls, chunks):
+    links = []
+    message = HttpMessageLinter()
+    message.headers.parsed.update({"content-type": ["text/html"]})
+    message.base_uri = "http://example.com/"
+    parser = cls(message, [lambda base, link, tag, title: links.append((link, tag))])
+    for chunk in chunks:
+        parser.feed_bytes(chunk)
+    return links
+
+
+def bench(name, body):
+    chunks = [body[i : i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)]
+    size_mb = len(body) / (1024 * 1024)
+    results = {}
+    line = f"{name[-40:]:>40} {size_mb:6.2f} MB"
+    for engine, cls in link_parsers.items():
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            results[engine] = parse(cls, chunks)
+        elapsed = (time.perf_counter() - start) / ROUNDS
+        line += f"  {engine}: {size_mb / elapsed:7.1f} MB/s"
+    links = list(results.values())
+    same = all(found == links[0] for found in links)
+    print(f"{line}  {len(links[0])} links{'' if same else '  MISMATCH'}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:]:
+        for path in sys.argv[1:]:
+            with open(path, "rb") as fh:
+                bench(path, fh.read())
+    else:
+        bench("synthetic", SYNTHETIC.encode("utf-8"))
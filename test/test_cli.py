@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+from configparser import ConfigParser
+
+import thor
+
+from redbot.cli import BulkRunner, read_urls
+
+
+class TestReadUrls(unittest.TestCase):
+    def test_skips_blanks_and_comments(self):
+        infile = io.StringIO("http://a.example/\n\n  # comment\n  http://b.example/  \n")
+        self.assertEqual(list(read_urls(infile)), ["http://a.example/", "http://b.example/"])
+
+    def test_is_lazy(self):
+        infile = io.StringIO("http://a.example/\nhttp://b.example/\n")
+        urls = read_urls(infile)
+        self.assertEqual(next(urls), "http://a.example/")
+        self.assertEqual(infile.readline(), "http://b.example/\n")
+
+
+class TestBulkRunner(unittest.TestCase):
+    def setUp(self):
+        parser = ConfigParser()
+        parser.read_dict({"redbot": {"enable_local_access": "True"}})
+        self.config = parser["redbot"]
+
+    def test_records_every_url_within_concurrency(self):
+        # Unparseable URLs fail synchronously, so this runs without the network.
+        urls = [f"bad url {i}" for i in range(25)]
+        records = []
+        runner = BulkRunner(self.config, iter(urls), records.append, concurrency=3)
+        peak = 0
+        original_start = runner.start
+
+        def start(url):
+            nonlocal peak
+            peak = max(peak, runner.running + 1)
+            original_start(url)
+
+        runner.start = start
+        thor.schedule(0, runner.fill)
+        thor.run()
+        self.assertEqual(len(records), len(urls))
+        self.assertLessEqual(peak, 3)
+        self.assertEqual(runner.running, 0)
+        for record in records:
+            self.assertIsNone(record["status"])
+            self.assertTrue(record["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import unittest
+from configparser import ConfigParser
+from unittest.mock import MagicMock
+
+from redbot.resource import HttpResource
+from redbot.webui.coalesce import Coalescer, coalesce_key
+from redbot.webui.ratelimit import RateLimiter
+
+
+def make_resource():
+    parser = ConfigParser()
+    parser.read_dict({"redbot": {}})
+    resource = HttpResource(parser["redbot"])
+    resource.set_request("http://example.com/")
+    return resource
+
+
+class TestCoalesceKey(unittest.TestCase):
+    def test_header_names_case_insensitive(self):
+        self.assertEqual(
+            coalesce_key("http://example.com/", [("Accept", "text/html")], False),
+            coalesce_key("http://example.com/", [("accept", "text/html")], False),
+        )
+
+    def test_distinguishes(self):
+        base = coalesce_key("http://example.com/", [], False)
+        self.assertNotEqual(base, coalesce_key("http://example.com/", [], True))
+        self.assertNotEqual(base, coalesce_key("http://example.com/a", [], False))
+        self.assertNotEqual(base, coalesce_key("http://example.com/", [("A", "b")], False))
+
+
+class TestCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.coalescer = Coalescer()
+        self.key = coalesce_key("http://example.com/", [], False)
+
+    def test_shares_running_test(self):
+        resource = make_resource()
+        self.assertIsNone(self.coalescer.find(self.key))
+        self.coalescer.attach(self.key, resource)
+        self.assertIs(self.coalescer.find(self.key), resource)
+        self.assertEqual(self.coalescer.stats(), {"running": 1, "coalesced": 1})
+
+    def test_forgets_finished_test(self):
+        resource = make_resource()
+        self.coalescer.attach(self.key, resource)
+        resource.emit("check_done")
+        self.assertIsNone(self.coalescer.find(self.key))
+        self.assertEqual(self.coalescer.stats()["running"], 0)
+
+    def test_only_last_client_stops(self):
+        resource = make_resource()
+        self.coalescer.attach(self.key, resource)
+        self.coalescer.attach(self.key, resource)
+        self.assertFalse(self.coalescer.detach(resource))
+        self.assertTrue(self.coalescer.detach(resource))
+        self.assertEqual(self.coalescer._clients, {})
+
+    def test_finished_test_not_watched(self):
+        resource = make_resource()
+        resource.check_done = True
+        for _ in range(3):
+            self.assertFalse(self.coalescer.attach(self.key, resource))
+        self.assertEqual(self.coalescer._clients, {})
+        self.assertIsNone(self.coalescer.find(self.key))
+
+    def test_clients_released_when_done(self):
+        resource = make_resource()
+        self.coalescer.attach(self.key, resource)
+        self.coalescer.attach(self.key, resource)
+        resource.emit("check_done")
+        self.coalescer.detach(resource)
+        self.coalescer.detach(resource)
+        self.assertEqual(self.coalescer._clients, {})
+
+
+class TestRateLimitOrigin(unittest.TestCase):
+    def test_shared_test_not_counted(self):
+        limiter = RateLimiter()
+        limiter.watching = {"origin"}
+        limiter.limits = {"origin": 1}
+        limiter.counts = {"origin": {"http://example.com:80": 1}}
+        limiter.running = True
+        webui = MagicMock()
+        webui.get_client_id.return_value = None
+        error_response = MagicMock()
+        limiter.process(webui, "http://example.com/", error_response, count_origin=False)
+        error_response.assert_not_called()
+        with self.assertRaises(ValueError):
+            limiter.process(webui, "http://example.com/", error_response)
+
+
+if __name__ == "__main__":
+    unittest.main()
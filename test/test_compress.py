@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import gzip
+import unittest
+import zlib
+
+import thor
+
+from redbot.webui.compress import CompressingExchange, compression_counters, select_coding
+
+
+class RecordingExchange:
+    def __init__(self):
+        self.status = None
+        self.headers = None
+        self.body = []
+        self.done = False
+        self.listeners = []
+
+    def response_start(self, status_code, status_phrase, res_hdrs):
+        self.status = status_code
+        self.headers = res_hdrs
+
+    def response_body(self, chunk):
+        self.body.append(chunk)
+
+    def response_done(self, trailers):
+        self.done = True
+
+    def on(self, event, listener):
+        self.listeners.append(event)
+
+
+def accept(value):
+    return [(b"Accept-Encoding", value)]
+
+
+class TestSelectCoding(unittest.TestCase):
+    def test_select(self):
+        self.assertEqual(select_coding([]), None)
+        self.assertEqual(select_coding(accept(b"gzip, deflate, br")), b"gzip")
+        self.assertEqual(select_coding(accept(b"deflate")), b"deflate")
+        self.assertEqual(select_coding(accept(b"gzip;q=0.5, deflate")), b"deflate")
+        self.assertEqual(select_coding(accept(b"GZIP;q=0, deflate;q=0")), None)
+        self.assertEqual(select_coding(accept(b"*")), b"gzip")
+        self.assertEqual(select_coding(accept(b"br, identity")), None)
+
+
+class TestCompressingExchange(unittest.TestCase):
+    def setUp(self):
+        self.raw = RecordingExchange()
+
+    def test_gzip(self):
+        before = compression_counters.stats()
+        exchange = CompressingExchange(self.raw, accept(b"gzip"))
+        exchange.response_start(
+            b"200",
+            b"OK",
+            [
+                (b"Content-Type", b"text/html; charset=utf-8"),
+                (b"Content-Length", b"100"),
+                (b"Vary", b"Accept-Language"),
+            ],
+        )
+        content = b"<p>hello, world</p>" * 1000
+        exchange.response_body(content)
+        exchange.response_done([])
+        self.assertIn((b"Content-Encoding", b"gzip"), self.raw.headers)
+        self.assertIn((b"Vary", b"Accept-Language, Accept-Encoding"), self.raw.headers)
+        self.assertNotIn(b"Content-Length", [n for (n, v) in self.raw.headers])
+        self.assertEqual(gzip.decompress(b"".join(self.raw.body)), content)
+        self.assertTrue(self.raw.done)
+        after = compression_counters.stats()
+        self.assertEqual(after["responses"], before["responses"] + 1)
+        self.assertEqual(after["bytes_in"], before["bytes_in"] + len(content))
+        self.assertGreater(after["bytes_saved"], before["bytes_saved"])
+
+    def test_flushes_each_loop_turn(self):
+        exchange = CompressingExchange(self.raw, accept(b"deflate"))
+        exchange.response_start(b"200", b"OK", [(b"Content-Type", b"text/html")])
+        decompressor = zlib.decompressobj()
+
+        def check():
+            self.assertEqual(decompressor.decompress(b"".join(self.raw.body)), b"status")
+            exchange.response_done([])
+            thor.stop()
+
+        exchange.response_body(b"status")
+        thor.schedule(0.01, check)
+        thor.run()
+
+    def test_uncompressed(self):
+        exchange = CompressingExchange(self.raw, [])
+        exchange.response_start(b"200", b"OK", [(b"Content-Type", b"text/plain")])
+        exchange.response_body(b"hello")
+        exchange.response_done([])
+        self.assertEqual(
+            self.raw.headers, [(b"Content-Type", b"text/plain"), (b"Vary", b"Accept-Encoding")]
+        )
+        self.assertEqual(self.raw.body, [b"hello"])
+
+    def test_not_compressible(self):
+        exchange = CompressingExchange(self.raw, accept(b"gzip"))
+        exchange.response_start(b"200", b"OK", [(b"Content-Type", b"image/png")])
+        exchange.response_body(b"png")
+        exchange.response_done([])
+        self.assertEqual(self.raw.headers, [(b"Content-Type", b"image/png")])
+        self.assertEqual(self.raw.body, [b"png"])
+
+    def test_passes_through(self):
+        exchange = CompressingExchange(self.raw, accept(b"gzip"))
+        exchange.on("close", lambda: None)
+        self.assertEqual(self.raw.listeners, ["close"])
+
+
+if __name__ == "__main__":
+    unittest.main()
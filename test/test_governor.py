@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import unittest
+from types import SimpleNamespace
+
+from redbot.resource.governor import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, FetchGovernor
+
+
+class MockFetcher:
+    def __init__(self, uri, started):
+        self.request = SimpleNamespace(uri=uri)
+        self.started = started
+
+    def start(self):
+        self.started.append(self)
+
+
+class TestFetchGovernor(unittest.TestCase):
+    def setUp(self):
+        self.started = []
+
+    def submit(self, governor, uri, client="a", priority=PRIORITY_BACKGROUND):
+        fetcher = MockFetcher(uri, self.started)
+        governor.submit(fetcher, client, priority, fetcher.start)
+        return fetcher
+
+    def uris(self):
+        return [fetcher.request.uri for fetcher in self.started]
+
+    def test_unlimited(self):
+        governor = FetchGovernor()
+        for i in range(10):
+            self.submit(governor, f"http://x/{i}")
+        self.assertEqual(len(self.started), 10)
+        self.assertEqual(governor.stats()["active"], 10)
+
+    def test_global_limit(self):
+        governor = FetchGovernor(max_active=2)
+        fetchers = [self.submit(governor, f"http://x/{i}") for i in range(3)]
+        self.assertEqual(len(self.started), 2)
+        self.assertEqual(governor.stats()["queued_background"], 1)
+        governor.release(fetchers[0])
+        self.assertEqual(len(self.started), 3)
+        self.assertEqual(governor.stats()["queued_background"], 0)
+
+    def test_origin_limit(self):
+        governor = FetchGovernor(max_per_origin=1)
+        first = self.submit(governor, "http://x/1")
+        self.submit(governor, "http://X:80/2")
+        self.submit(governor, "http://y/1")
+        self.assertEqual(self.uris(), ["http://x/1", "http://y/1"])
+        governor.release(first)
+        self.assertEqual(self.uris()[-1], "http://X:80/2")
+
+    def test_client_limit(self):
+        governor = FetchGovernor(max_per_client=1)
+        self.submit(governor, "http://x/1", client="a")
+        self.submit(governor, "http://x/2", client="a")
+        self.submit(governor, "http://x/3", client="b")
+        self.assertEqual(self.uris(), ["http://x/1", "http://x/3"])
+
+    def test_fair_share(self):
+        governor = FetchGovernor(max_active=4)
+        hog = [self.submit(governor, f"http://x/{i}", client="a") for i in range(6)]
+        self.assertEqual(len(self.started), 4)
+        self.submit(governor, "http://y/1", client="b")
+        self.submit(governor, "http://y/2", client="b")
+        for fetcher in hog[:2]:
+            governor.release(fetcher)
+        # a is over its half share, so b gets both free slots.
+        self.assertEqual(self.uris()[4:], ["http://y/1", "http://y/2"])
+
+    def test_interactive_first(self):
+        governor = FetchGovernor(max_active=1)
+        first = self.submit(governor, "http://x/0")
+        self.submit(governor, "http://x/sub", client="a")
+        self.submit(governor, "http://x/main", client="b", priority=PRIORITY_INTERACTIVE)
+        governor.release(first)
+        self.assertEqual(self.uris(), ["http://x/0", "http://x/main"])
+
+    def test_clients_take_turns(self):
+        governor = FetchGovernor(max_active=1)
+        first = self.submit(governor, "http://x/0")
+        for uri, client in [("a1", "a"), ("a2", "a"), ("b1", "b"), ("b2", "b")]:
+            self.submit(governor, f"http://x/{uri}", client=client)
+        governor.release(first)
+        while len(self.started) < 5:
+            governor.release(self.started[-1])
+        self.assertEqual(
+            self.uris()[1:], ["http://x/a1", "http://x/b1", "http://x/a2", "http://x/b2"]
+        )
+
+    def test_release_queued(self):
+        governor = FetchGovernor(max_active=1)
+        first = self.submit(governor, "http://x/0")
+        stopped = self.submit(governor, "http://x/1")
+        self.submit(governor, "http://x/2")
+        governor.release(stopped)
+        governor.release(first)
+        self.assertEqual(self.uris(), ["http://x/0", "http://x/2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
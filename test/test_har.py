@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import json
+import unittest
+from configparser import ConfigParser
+
+from redbot.formatter.har import HarFormatter
+from redbot.resource import HttpResource
+
+
+def make_formatter(output, **params):
+    parser = ConfigParser()
+    parser.read_dict({"redbot": {}})
+    resource = HttpResource(parser["redbot"])
+    resource.set_request("http://example.com/")
+    return HarFormatter(parser["redbot"], resource, output, params)
+
+
+def complete(fetcher):
+    fetcher.request.start_time = 1700000000.0
+    fetcher.response.start_time = 1700000000.25
+    fetcher.response.process_response_topline(b"1.1", b"200", b"OK")
+    fetcher.response.process_headers([(b"Content-Type", b"text/plain")])
+    fetcher.response.finish_content(True)
+    fetcher.response.finish_time = 1700000000.5
+    fetcher.fetch_done = True
+    fetcher.emit("fetch_done")
+
+
+def load(out):
+    return json.loads("".join(out))["log"]
+
+
+class TestHarFormatter(unittest.TestCase):
+    def setUp(self):
+        self.out = []
+        self.formatter = make_formatter(self.out.append)
+        self.resource = self.formatter.resource
+
+    def har(self):
+        return load(self.out)
+
+    def test_streams_entries(self):
+        self.formatter.start_output()
+        self.assertNotIn("_red_messages", "".join(self.out))
+        complete(self.resource)
+        self.assertIn("_red_messages", "".join(self.out))
+        self.formatter.finish_output()
+        log = self.har()
+        self.assertEqual(len(log["entries"]), 1)
+        self.assertEqual(log["entries"][0]["pageref"], "page1")
+        self.assertEqual(log["pages"][0]["id"], "page1")
+        self.assertEqual(log["entries"][0]["timings"]["wait"], 250)
+
+    def test_subrequests(self):
+        # just the formatter's listeners; don't run or finish the checks
+        for fetcher in [self.resource, *self.resource.subreqs.values()]:
+            fetcher.remove_listeners("fetch_done")
+        self.formatter.start_output()
+        complete(self.resource)
+        for subreq in self.resource.subreqs.values():
+            complete(subreq)
+        self.formatter.finish_output()
+        names = [entry.get("_check_name") for entry in self.har()["entries"]]
+        self.assertEqual(len(names), len(self.resource.subreqs) + 1)
+        self.assertIsNone(names[0])
+        self.assertTrue(all(isinstance(name, str) for name in names[1:]))
+
+    def test_incomplete_left_out(self):
+        self.formatter.start_output()
+        self.formatter.finish_output()
+        log = self.har()
+        self.assertEqual(log["entries"], [])
+        self.assertEqual(log["pages"], [])
+
+    def test_error_closes_log(self):
+        self.formatter.start_output()
+        complete(self.resource)
+        self.formatter.error_output("oops")
+        log = self.har()
+        self.assertEqual(log["_error"], "oops")
+        self.assertEqual(len(log["entries"]), 1)
+        self.formatter.finish_output()
+        self.har()
+
+    def test_compact(self):
+        out = []
+        formatter = make_formatter(out.append, compact=True)
+        formatter.start_output()
+        complete(formatter.resource)
+        formatter.finish_output()
+        self.assertNotIn("\n", "".join(out))
+        self.assertEqual(len(load(out)["entries"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
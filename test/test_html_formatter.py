@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+from configparser import ConfigParser
+
+from redbot.formatter.html import SingleEntryHtmlFormatter, TableHtmlFormatter
+from redbot.formatter.html_base import BaseHtmlFormatter
+from redbot.formatter.null_links import NullLinkGenerator
+from redbot.resource import HttpResource
+
+
+def make_formatter(cls, output=None, **config):
+    parser = ConfigParser()
+    parser.read_dict({"redbot": config})
+    resource = HttpResource(parser["redbot"])
+    resource.set_request("http://example.com/")
+    return cls(parser["redbot"], resource, output or (lambda out: None), {"nonce": "x"})
+
+
+class MarkLinks(NullLinkGenerator):
+    def resource_link(self, resource, link, label, *args, **kw):
+        return f"<{link}>"
+
+
+class TestTemplateFilters(unittest.TestCase):
+    def test_construction_leaves_environment_alone(self):
+        filters = dict(BaseHtmlFormatter.templates.filters)
+        make_formatter(SingleEntryHtmlFormatter)
+        make_formatter(TableHtmlFormatter)
+        self.assertEqual(BaseHtmlFormatter.templates.filters, filters)
+
+    def test_filters_use_rendering_formatter(self):
+        first = make_formatter(TableHtmlFormatter)
+        second = make_formatter(TableHtmlFormatter)
+        tpl = BaseHtmlFormatter.templates.from_string("{{ problem|index_problem }}")
+        self.assertEqual(tpl.render(formatter=second, problem="a"), "1")
+        self.assertEqual(tpl.render(formatter=first, problem="b"), "1")
+        self.assertEqual(tpl.render(formatter=second, problem="c"), "2")
+        self.assertEqual(first.problems, ["b"])
+        self.assertEqual(second.problems, ["a", "c"])
+
+    def test_finish_output(self):
+        out = []
+        formatter = make_formatter(SingleEntryHtmlFormatter, out.append)
+        formatter.resource.response.process_response_topline(b"1.1", b"200", b"OK")
+        formatter.resource.response.process_headers([(b"Content-Type", b"text/plain")])
+        formatter.resource.response.finish_content(True)
+        formatter.finish_output()
+        self.assertIn("Content-Type", "".join(out))
+
+
+class CaptureForms(NullLinkGenerator):
+    def test_form(self, link_value, headers, uri, **kw):
+        self.headers = headers
+        return ""
+
+
+class TestRerunForm(unittest.TestCase):
+    def test_user_headers(self):
+        formatter = make_formatter(SingleEntryHtmlFormatter)
+        formatter.kw["req_hdrs"] = [("Accept", "text/html")]
+        formatter.resource.request.headers.process([(b"User-Agent", b"RED")])
+        formatter.links = CaptureForms()
+        formatter.rerun_form()
+        self.assertEqual(formatter.links.headers, ["Accept:text/html"])
+
+
+class TestSetupTemplates(unittest.TestCase):
+    def tearDown(self):
+        BaseHtmlFormatter.templates.bytecode_cache = None
+
+    def test_bytecode_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            parser = ConfigParser()
+            parser.read_dict({"redbot": {"template_cache_dir": cache_dir}})
+            BaseHtmlFormatter.templates.cache.clear()
+            count = BaseHtmlFormatter.setup_templates(parser["redbot"])
+            self.assertGreater(count, 0)
+            self.assertEqual(len(os.listdir(cache_dir)), count)
+
+
+class TestContentLinks(unittest.TestCase):
+    def format(self, body, links):
+        formatter = make_formatter(SingleEntryHtmlFormatter, content_links="yes")
+        formatter.links = MarkLinks()
+        resource = formatter.resource
+        resource.response.base_uri = "http://example.com/dir/"
+        resource.links = {"a": set(links)}
+        resource.response_decoded_sample.feed(body.encode("utf-8"))
+        out = str(formatter.format_body_sample(resource))
+        return out[len("<pre class='prettyprint'>") : out.index("</pre>")]
+
+    def test_links_quoted(self):
+        body = """<a href="/a">/a</a> <img src='b.png'> "c" <a href="/a">"""
+        self.assertEqual(
+            self.format(body, ["/a", "b.png", "c"]),
+            "&lt;a href=&#34;<http://example.com/a>&#34;&gt;/a&lt;/a&gt; "
+            "&lt;img src=&#39;<http://example.com/dir/b.png>&#39;&gt; "
+            "&#34;<http://example.com/dir/c>&#34; "
+            "&lt;a href=&#34;<http://example.com/a>&#34;&gt;",
+        )
+
+    def test_adjacent_and_mismatched_quotes(self):
+        body = "\"/a\"/b\" '/a\" it's \"/b\""
+        self.assertEqual(
+            self.format(body, ["/a", "/b"]),
+            "&#34;<http://example.com/a>&#34;<http://example.com/b>&#34; "
+            "&#39;/a&#34; it&#39;s &#34;<http://example.com/b>&#34;",
+        )
+
+    def test_no_links(self):
+        self.assertEqual(self.format('"/a"', []), "&#34;/a&#34;")
+
+
+if __name__ == "__main__":
+    unittest.main()
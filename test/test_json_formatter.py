@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import json
+import unittest
+from configparser import ConfigParser
+
+from redbot.formatter import find_formatter
+from redbot.formatter.json import SCHEMA_VERSION, JsonFormatter
+from redbot.formatter.ndjson import NdjsonFormatter
+from redbot.resource import HttpResource
+
+
+def make_formatter(cls, output, **params):
+    parser = ConfigParser()
+    parser.read_dict({"redbot": {}})
+    resource = HttpResource(parser["redbot"])
+    resource.set_request("http://example.com/")
+    # just the formatter's listeners; don't run or finish the checks
+    for fetcher in [resource, *resource.subreqs.values()]:
+        fetcher.remove_listeners("fetch_done")
+    return cls(parser["redbot"], resource, output, params)
+
+
+def complete(fetcher, started=True):
+    fetcher.fetch_started = started
+    fetcher.response.process_response_topline(b"1.1", b"200", b"OK")
+    fetcher.response.process_headers(
+        [(b"Content-Type", b"text/plain; charset=utf-8"), (b"Cache-Control", b"max-age=60")]
+    )
+    fetcher.response.finish_content(True)
+    fetcher.fetch_done = True
+    fetcher.emit("fetch_done")
+
+
+class TestJsonFormatter(unittest.TestCase):
+    def test_find(self):
+        self.assertIs(find_formatter("json"), JsonFormatter)
+        self.assertIs(find_formatter("ndjson"), NdjsonFormatter)
+
+    def test_document(self):
+        out = []
+        formatter = make_formatter(JsonFormatter, out.append)
+        complete(formatter.resource)
+        complete(formatter.resource.subreqs["conneg"])
+        formatter.finish_output()
+        document = json.loads("".join(out))
+        self.assertEqual(document["schema"], SCHEMA_VERSION)
+        self.assertEqual(document["status"], 200)
+        self.assertIsNone(document["error"])
+        self.assertEqual(
+            document["response"]["parsed_headers"]["content-type"],
+            ["text/plain", {"charset": "utf-8"}],
+        )
+        self.assertEqual(list(document["subrequests"]), ["conneg"])
+        self.assertEqual(document["subrequests"]["conneg"]["check_name"], "Content Negotiation")
+        note = document["notes"][0]
+        self.assertEqual(set(note), {"note_id", "subject", "category", "level", "summary"})
+        self.assertNotIn("linked", document)
+
+    def test_error(self):
+        out = []
+        formatter = make_formatter(JsonFormatter, out.append, compact=True)
+        formatter.error_output("oops")
+        self.assertEqual(json.loads("".join(out))["error"], "oops")
+
+
+class TestNdjsonFormatter(unittest.TestCase):
+    def setUp(self):
+        self.out = []
+        self.formatter = make_formatter(NdjsonFormatter, self.out.append)
+        self.resource = self.formatter.resource
+
+    def events(self):
+        lines = "".join(self.out).splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_events(self):
+        self.formatter.start_output()
+        self.formatter.status("fetching")
+        complete(self.resource)
+        self.assertEqual(
+            [event["event"] for event in self.events()], ["start", "status", "resource"]
+        )
+        complete(self.resource.subreqs["conneg"])
+        complete(self.resource.subreqs["range"], started=False)
+        self.formatter.finish_output()
+        events = self.events()
+        self.assertEqual([event.get("role") for event in events[2:4]], ["resource", "check"])
+        self.assertEqual(events[3]["check_name"], "Content Negotiation")
+        summary = events[-1]
+        self.assertEqual(summary["event"], "summary")
+        self.assertEqual(summary["resources"], 2)
+        self.assertEqual(sum(summary["notes"].values()), len(self.resource.response.notes) * 2)
+
+    def test_error(self):
+        self.formatter.start_output()
+        self.formatter.error_output("oops")
+        self.formatter.finish_output()
+        self.assertEqual([event["event"] for event in self.events()], ["start", "error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import socket
+import threading
+import time
+import unittest
+from configparser import ConfigParser
+
+import thor
+
+from redbot.resource.fetch import RedHttpClient
+from redbot.resource.latency import LatencyStats, LatencyTracker, latency_tracker
+
+ORIGIN = ("https", "www.example.com", 443)
+OTHER = ("http", "www.example.org", 80)
+
+
+class TestLatencyStats(unittest.TestCase):
+    def test_no_data(self):
+        self.assertEqual(LatencyStats().deadline(3, 30), 30)
+
+    def test_first_sample(self):
+        stats = LatencyStats()
+        stats.observe(1.0)
+        self.assertEqual(stats.srtt, 1.0)
+        self.assertEqual(stats.rttvar, 0.5)
+        self.assertEqual(stats.deadline(3, 30), 9.0)
+
+    def test_smoothing(self):
+        stats = LatencyStats()
+        stats.observe(1.0)
+        stats.observe(2.0)
+        self.assertAlmostEqual(stats.srtt, 1.125)
+        self.assertAlmostEqual(stats.rttvar, 0.625)
+
+    def test_bounds(self):
+        stats = LatencyStats()
+        stats.observe(0.01)
+        self.assertEqual(stats.deadline(3, 30), 3)
+        stats = LatencyStats()
+        stats.observe(20)
+        self.assertEqual(stats.deadline(3, 30), 30)
+
+    def test_failing(self):
+        stats = LatencyStats()
+        stats.observe(5)
+        stats.failing = True
+        self.assertEqual(stats.deadline(3, 30), 3)
+        stats.observe(5)
+        self.assertFalse(stats.failing)
+
+
+class TestLatencyTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = LatencyTracker()
+
+    def test_unknown_origin(self):
+        self.assertEqual(self.tracker.connect_deadline(ORIGIN), 30)
+        self.assertEqual(self.tracker.read_deadline(ORIGIN), 60)
+        self.assertEqual(self.tracker.stats()["origins"], 0)
+
+    def test_per_origin(self):
+        self.tracker.observe_connect(ORIGIN, 0.1)
+        self.tracker.observe_response(ORIGIN, 0.2)
+        self.assertEqual(self.tracker.connect_deadline(ORIGIN), 3)
+        self.assertEqual(self.tracker.read_deadline(ORIGIN), 10)
+        self.assertEqual(self.tracker.connect_deadline(OTHER), 30)
+        self.assertEqual(self.tracker.read_deadline(OTHER), 60)
+
+    def test_connect_failure(self):
+        self.tracker.observe_connect_failure(ORIGIN)
+        self.assertEqual(self.tracker.connect_deadline(ORIGIN), 3)
+        self.assertEqual(self.tracker.read_deadline(ORIGIN), 60)
+        self.assertEqual(self.tracker.stats()["failing"], 1)
+        self.tracker.observe_connect(ORIGIN, 5)
+        self.assertEqual(self.tracker.connect_deadline(ORIGIN), 30)
+        self.assertEqual(self.tracker.stats()["failing"], 0)
+
+    def test_eviction(self):
+        self.tracker.max_origins = 2
+        self.tracker.observe_connect(ORIGIN, 0.1)
+        self.tracker.observe_connect(OTHER, 0.1)
+        self.tracker.observe_connect(ORIGIN, 0.1)
+        self.tracker.observe_connect(("http", "www.example.net", 80), 0.1)
+        self.assertEqual(self.tracker.stats()["origins"], 2)
+        self.assertEqual(self.tracker.connect_deadline(ORIGIN), 3)
+        self.assertEqual(self.tracker.connect_deadline(OTHER), 30)
+
+    def test_setup(self):
+        config = ConfigParser()
+        config.read_dict(
+            {
+                "redbot": {
+                    "connect_timeout_floor": "1",
+                    "connect_timeout_ceiling": "5",
+                    "read_timeout_floor": "2",
+                    "read_timeout_ceiling": "20",
+                }
+            }
+        )
+        self.tracker.setup(config["redbot"])
+        self.assertEqual(self.tracker.connect_deadline(ORIGIN), 5)
+        self.assertEqual(self.tracker.read_deadline(ORIGIN), 20)
+
+
+class SlowServer(threading.Thread):
+    "Answer one request, pausing before the headers and before the content."
+
+    def __init__(self, header_delay, body_delay):
+        threading.Thread.__init__(self, daemon=True)
+        self.header_delay = header_delay
+        self.body_delay = body_delay
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(1)
+        self.port = self.sock.getsockname()[1]
+
+    def run(self):
+        conn, _ = self.sock.accept()
+        with conn:
+            conn.recv(4096)
+            time.sleep(self.header_delay)
+            try:
+                conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 4\r\nConnection: close\r\n\r\n")
+                time.sleep(self.body_delay)
+                conn.sendall(b"body")
+                time.sleep(0.1)
+            except OSError:
+                pass  # the client gave up
+        self.sock.close()
+
+
+class TestReadDeadline(unittest.TestCase):
+    def setUp(self):
+        ceiling = latency_tracker.read_ceiling
+        latency_tracker.read_ceiling = 0.3
+        self.addCleanup(setattr, latency_tracker, "read_ceiling", ceiling)
+
+    def fetch(self, header_delay, body_delay):
+        server = SlowServer(header_delay, body_delay)
+        server.start()
+        client = RedHttpClient()
+        client.read_timeout = 5
+        exchange = client.exchange()
+        result = {}
+
+        def done(key, value):
+            result[key] = value
+            thor.stop()
+
+        exchange.on("response_done", lambda trailers: done("done", True))
+        exchange.on("error", lambda err: done("error", err))
+        exchange.request_start(b"GET", f"http://127.0.0.1:{server.port}/".encode("ascii"), [])
+        exchange.request_done([])
+        stopper = thor.schedule(5, thor.stop)
+        thor.run()
+        stopper.delete()
+        server.join()
+        return result
+
+    def test_slow_content(self):
+        self.assertEqual(self.fetch(0, 0.6), {"done": True})
+
+    def test_slow_headers(self):
+        result = self.fetch(0.6, 0)
+        self.assertIsInstance(result.get("error"), thor.http.error.ReadTimeoutError)
+
+
+if __name__ == "__main__":
+    unittest.main()
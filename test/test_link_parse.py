@@ -2,9 +2,11 @@
 
 import gzip
 import unittest
+from html import parser as html_parser
+from unittest.mock import patch
 from configparser import ConfigParser
 from redbot.resource import HttpResource
-from redbot.resource.link_parse import HTMLLinkParser
+from redbot.resource.link_parse import HTMLLinkParser, LinkScanner, get_link_parser
 from httplint.message import HttpMessageLinter
 
 class TestLinkParse(unittest.TestCase):
@@ -95,5 +97,149 @@ class TestLinkParse(unittest.TestCase):
         self.assertIn(("a", "/bar"), captured)
 
 
+SAMPLE = """<!DOCTYPE html>
+<HTML><HEAD>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=iso-8859-1">
+<base href="http://base.example.com/dir/">
+<link rel=stylesheet href='/a.css' title=" Style ">
+<link rel="icon" href="/favicon.ico">
+<script src="/app.js"></script>
+<script>var s = "<a href='/not-a-link'>"; if (a<b) {}</script>
+<style>a > b { background: url(<img src=/nope>) }</style>
+</HEAD><BODY>
+<!-- <a href="/commented"> -->
+<!-- spaced -- ><a href="/after-spaced-comment">x</a>
+<!-- newline --
+><a href="/after-newline-comment">x</a>
+<p class="x > y">text with a < b and <abbr>abbr</abbr></p>
+<a href="/q?a=1&amp;b=2#frag" title="Q &amp; A">q</a>
+<A HREF=/bare>bare</A>
+<a name="anchor">no href</a>
+<img src="/img.png" alt='a > b'/>
+<iframe src="/frame"></iframe><frame src="/f2">
+<a
+  href="/multi"
+  >multi</a>
+<ahref="/not-a-tag">
+<script/>
+<a href="/after-empty-script">x</a>
+</BODY></HTML>
+"""
+
+
+class TestLinkScanner(unittest.TestCase):
+    def parse(self, cls, chunks):
+        links = []
+        message = HttpMessageLinter()
+        message.headers.parsed.update({"content-type": ["text/html"]})
+        message.base_uri = "http://example.com/"
+        parser = cls(message, [lambda base, link, tag, title: links.append((base, link, tag, title))])
+        for chunk in chunks:
+            parser.feed(chunk)
+        return links, message
+
+    def test_same_as_htmlparser(self):
+        expected, expected_msg = self.parse(HTMLLinkParser, [SAMPLE])
+        links, message = self.parse(LinkScanner, [SAMPLE])
+        self.assertEqual(links, expected)
+        self.assertEqual(message.character_encoding, expected_msg.character_encoding)
+        self.assertIn(("http://base.example.com/dir/", "/q?a=1&b=2", "a", "Q & A"), links)
+        self.assertNotIn("/commented", [link[1] for link in links])
+        self.assertNotIn("/not-a-link", [link[1] for link in links])
+
+    def test_comment_ends(self):
+        links, _ = self.parse(LinkScanner, [SAMPLE])
+        targets = [link[1] for link in links]
+        self.assertIn("/after-spaced-comment", targets)
+        self.assertIn("/after-newline-comment", targets)
+
+    BANG_COMMENT = '<!-- nav --!><a href="/one">x</a><img src="/two.png"><script src="/three.js">'
+
+    def test_bang_comment_end(self):
+        links, _ = self.parse(LinkScanner, [self.BANG_COMMENT])
+        self.assertEqual([link[1] for link in links], ["/one", "/two.png", "/three.js"])
+
+    @unittest.skipUnless(
+        html_parser.commentclose.search("--!>"),
+        "this version of HTMLParser doesn't end comments with --!>",
+    )
+    def test_bang_comment_end_same_as_htmlparser(self):
+        expected, _ = self.parse(HTMLLinkParser, [self.BANG_COMMENT])
+        links, _ = self.parse(LinkScanner, [self.BANG_COMMENT])
+        self.assertEqual(links, expected)
+
+    def test_any_chunking(self):
+        expected, _ = self.parse(HTMLLinkParser, [SAMPLE])
+        for split in range(1, len(SAMPLE)):
+            links, _ = self.parse(LinkScanner, [SAMPLE[:split], SAMPLE[split:]])
+            self.assertEqual(links, expected, f"split at {split}")
+
+    def test_one_char_at_a_time(self):
+        expected, _ = self.parse(HTMLLinkParser, [SAMPLE])
+        links, _ = self.parse(LinkScanner, list(SAMPLE))
+        self.assertEqual(links, expected)
+
+    def test_get_link_parser(self):
+        conf = ConfigParser()
+        conf.read_dict({"redbot": {"link_parser": "scan"}, "other": {}})
+        self.assertIs(get_link_parser(conf["redbot"]), LinkScanner)
+        self.assertIs(get_link_parser(conf["other"]), HTMLLinkParser)
+        resource = HttpResource(conf["redbot"], descend=True)
+        self.assertIsInstance(resource._link_parser, LinkScanner)
+
+
+class TestFeedBytes(unittest.TestCase):
+    def parse(self, cls, chunks, charset=None):
+        links = []
+        message = HttpMessageLinter()
+        message.headers.parsed.update({"content-type": ["text/html"]})
+        message.base_uri = "http://example.com/"
+        message.character_encoding = charset
+        parser = cls(message, [lambda base, link, tag, title: links.append((link, title))])
+        for chunk in chunks:
+            parser.feed_bytes(chunk)
+        return links, parser
+
+    def test_split_character(self):
+        body = '<a href="/\u65e5\u672c" title="\u8a9e">x</a>'.encode("utf-8")
+        for cls in (HTMLLinkParser, LinkScanner):
+            for split in range(1, len(body)):
+                links, _ = self.parse(cls, [body[:split], body[split:]])
+                self.assertEqual(links, [("/\u65e5\u672c", "\u8a9e")], f"{cls} {split}")
+
+    def test_meta_switches_decoder(self):
+        head = b'<meta http-equiv="content-type" content="text/html; charset=shift_jis">'
+        link = '<a href="/\u65e5\u672c">x</a>'.encode("shift_jis")
+        for cls in (HTMLLinkParser, LinkScanner):
+            links, parser = self.parse(cls, [head, link[:10], link[10:]])
+            self.assertEqual(links, [("/\u65e5\u672c", "")])
+            self.assertEqual(parser.message.character_encoding, "shift_jis")
+
+    def test_meta_switch_keeps_held_bytes(self):
+        head = b'<meta http-equiv="content-type" content="text/html; charset=iso-8859-1">'
+        for cls in (HTMLLinkParser, LinkScanner):
+            links, _ = self.parse(cls, [head + b'<a href="/\xc3', b'\xa9">x</a>'])
+            self.assertEqual(links, [("/\u00c3\u00a9", "")], cls)
+
+    def test_unknown_charset(self):
+        for cls in (HTMLLinkParser, LinkScanner):
+            links, _ = self.parse(cls, [b'<a href="/x">x</a>'], charset="no-such-charset")
+            self.assertEqual(links, [("/x", "")])
+
+    def test_skips_chunks_without_tags(self):
+        for cls in (HTMLLinkParser, LinkScanner):
+            _, parser = self.parse(cls, [b"<p>text</p>"])
+            with patch.object(cls, "parse") as parse:
+                parser.feed_bytes(b"more text")
+                parse.assert_not_called()
+                parser.feed_bytes(b"<a href=/x>")
+                parse.assert_called_once()
+
+    def test_keeps_partial_tags(self):
+        for cls in (HTMLLinkParser, LinkScanner):
+            links, _ = self.parse(cls, [b'<a title="a', b' b" href="/x"', b">x</a>"])
+            self.assertEqual(links, [("/x", "a b")])
+
+
 if __name__ == "__main__":
     unittest.main()
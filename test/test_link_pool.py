@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import unittest
+from configparser import ConfigParser
+
+import thor
+from httplint.message import HttpMessageLinter
+
+from redbot.resource import HttpResource
+from redbot.resource.link_parse import LinkScanner
+from redbot.resource.link_pool import LinkParsePool, link_parse_pool
+
+PAGE = b"".join(b'<p>text</p><a href="/%d">%d</a>' % (i, i) for i in range(500))
+
+
+def run_until(feed, timeout=5):
+    "Run the loop until feed has parsed everything."
+    timer = thor.schedule(timeout, thor.stop)
+    feed.when_done(thor.stop)
+    thor.run()
+    timer.delete()
+
+
+class TestLinkParsePool(unittest.TestCase):
+    def make_feed(self, pool, links):
+        message = HttpMessageLinter()
+        message.headers.parsed.update({"content-type": ["text/html"]})
+        message.base_uri = "http://example.com/"
+        parser = LinkScanner(message, [])
+        return pool.feed(parser, lambda base, link, tag, title: links.append(link))
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_in_order(self):
+        self.pool = LinkParsePool(workers=2)
+        links = []
+        feed = self.make_feed(self.pool, links)
+        for i in range(0, len(PAGE), 1000):
+            feed.feed_bytes(PAGE[i : i + 1000])
+        self.assertTrue(feed.busy)
+        run_until(feed)
+        self.assertFalse(feed.busy)
+        self.assertEqual(links, [f"/{i}" for i in range(500)])
+        self.assertEqual(self.pool.queued_bytes, 0)
+        self.assertEqual(self.pool.stats()["inline"], 0)
+
+    def test_backlogged(self):
+        self.pool = LinkParsePool(workers=1, max_queued_bytes=1)
+        self.pool.queued_bytes = 1
+        links = []
+        feed = self.make_feed(self.pool, links)
+        feed.feed_bytes(b'<a href="/x">')
+        self.assertFalse(feed.busy)
+        self.assertEqual(self.pool.stats()["inline"], 1)
+        # the link still comes back through the loop
+        self.assertEqual(links, [])
+        thor.schedule(0.1, thor.stop)
+        thor.run()
+        self.assertEqual(links, ["/x"])
+
+
+class TestPooledResource(unittest.TestCase):
+    def setUp(self):
+        link_parse_pool.workers = 2
+
+    def tearDown(self):
+        link_parse_pool.workers = 0
+        link_parse_pool.shutdown()
+
+    def test_waits_for_links(self):
+        conf = ConfigParser()
+        conf.read_dict({"redbot": {}})
+        resource = HttpResource(conf["redbot"], descend=True)
+        resource.set_request("http://example.com/")
+        resource.response.process_headers([(b"content-type", b"text/html")])
+        resource.response.base_uri = "http://example.com/"
+        resource.response.feed_content(PAGE)
+        resource.run_active_checks = lambda: resource.finish_check()
+        self.assertIsNotNone(resource._link_feed)
+        resource._links_pending = True
+        resource._link_feed.when_done(resource._links_parsed)
+        resource.finish_check()
+        self.assertFalse(resource.check_done)
+        resource.once("check_done", thor.stop)
+        timer = thor.schedule(5, thor.stop)
+        thor.run()
+        timer.delete()
+        self.assertTrue(resource.check_done)
+        self.assertEqual(resource.link_count, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
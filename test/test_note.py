@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import unittest
+from unittest.mock import patch
+
+from httplint.note import Note, categories, levels
+
+from redbot.i18n import set_locale
+from redbot.note import NoteRenderCache, RedbotNote
+
+
+class WIDGET_NOTE(RedbotNote):
+    category = categories.GENERAL
+    level = levels.INFO
+    _summary = "The widget is %(size)s."
+    _text = "The widget is *%(size)s*."
+
+
+class LINTER_NOTE(Note):
+    category = categories.GENERAL
+    level = levels.INFO
+    _summary = "%(count)s things."
+    _text = "There are %(count)s things."
+
+
+class TestNoteRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = NoteRenderCache()
+
+    def test_hit(self):
+        self.assertEqual(self.cache.summary(WIDGET_NOTE("x", size="big")), "The widget is big.")
+        self.assertEqual(self.cache.summary(WIDGET_NOTE("y", size="big")), "The widget is big.")
+        self.assertEqual(self.cache.stats(), {"entries": 1, "hits": 1, "misses": 1})
+
+    def test_detail(self):
+        note = WIDGET_NOTE("x", size="<big>")
+        detail = note.detail
+        self.assertEqual(self.cache.detail(note), detail)
+        with patch("redbot.note.shared_markdown") as markdown:
+            self.assertEqual(self.cache.detail(WIDGET_NOTE("x", size="<big>")), detail)
+            markdown.assert_not_called()
+
+    def test_keyed_on_vars(self):
+        self.cache.summary(LINTER_NOTE("x", count=1))
+        self.assertEqual(self.cache.summary(LINTER_NOTE("x", count=2)), "2 things.")
+        self.assertEqual(self.cache.summary(LINTER_NOTE("x", count="2")), "2 things.")
+        self.assertEqual(self.cache.stats()["misses"], 3)
+
+    def test_keyed_on_class(self):
+        class OTHER_NOTE(LINTER_NOTE):
+            _summary = "%(count)s others."
+
+        self.cache.summary(LINTER_NOTE("x", count=1))
+        self.assertEqual(self.cache.summary(OTHER_NOTE("x", count=1)), "1 others.")
+
+    def test_keyed_on_locale(self):
+        note = WIDGET_NOTE("x", size="big")
+        self.cache.summary(note)
+        with set_locale("fr"):
+            self.cache.summary(note)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_bounded(self):
+        self.cache.max_entries = 2
+        for count in range(3):
+            self.cache.summary(LINTER_NOTE("x", count=count))
+        self.cache.summary(LINTER_NOTE("x", count=0))
+        self.assertEqual(self.cache.stats(), {"entries": 2, "hits": 0, "misses": 4})
+
+    def test_disabled(self):
+        self.cache.max_entries = 0
+        self.cache.summary(LINTER_NOTE("x", count=1))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import unittest
+from configparser import ConfigParser
+from unittest.mock import MagicMock
+
+from redbot.formatter.html import SingleEntryHtmlFormatter
+from redbot.formatter.null_links import NullLinkGenerator
+from redbot.resource import HttpResource
+from redbot.webui.handlers.progress import ProgressHandler
+from redbot.webui.progress import ProgressChannels, progress_channels
+
+
+def make_config(**config):
+    parser = ConfigParser()
+    parser.read_dict({"redbot": dict({"status_rate": "0"}, **config)})
+    return parser["redbot"]
+
+
+def make_resource():
+    resource = HttpResource(make_config())
+    resource.set_request("http://example.com/")
+    return resource
+
+
+class FakeUi:
+    def __init__(self, channel_id):
+        self.config = make_config()
+        self.method = "GET"
+        self.path = ["progress"]
+        self.query_string = {"id": [channel_id]}
+        self.locale = "en"
+        self.exchange = MagicMock()
+        self.response_started = False
+        self.response_done = False
+        self.out = []
+
+    def output(self, chunk):
+        self.out.append(chunk)
+
+
+class TestProgressChannels(unittest.TestCase):
+    def test_closes_when_done(self):
+        channels = ProgressChannels()
+        resource = make_resource()
+        channel_id = channels.open(resource)
+        self.assertIs(channels.get(channel_id), resource)
+        self.assertEqual(channels.stats(), {"open": 1})
+        resource.emit("check_done")
+        self.assertIsNone(channels.get(channel_id))
+        self.assertEqual(channels.stats(), {"open": 0})
+
+    def test_finished_test(self):
+        resource = make_resource()
+        resource.check_done = True
+        self.assertIsNone(ProgressChannels().open(resource))
+
+
+class TestProgressHandler(unittest.TestCase):
+    def test_unknown_channel(self):
+        ui = FakeUi("nope")
+        self.assertTrue(ProgressHandler.can_handle(ui))
+        ProgressHandler.handle(ui)
+        ui.exchange.response_start.assert_called_once()
+        self.assertEqual(ui.exchange.response_start.call_args[0][0], b"204")
+        self.assertTrue(ui.response_done)
+
+    def test_follows_test(self):
+        resource = make_resource()
+        channel_id = progress_channels.open(resource)
+        self.addCleanup(progress_channels.close, channel_id)
+        ui = FakeUi(channel_id)
+        ProgressHandler.handle(ui)
+        headers = dict(ui.exchange.response_start.call_args[0][2])
+        self.assertEqual(headers[b"Content-Type"], b"text/event-stream; charset=utf-8")
+        resource.emit("status", "fetching")
+        self.assertEqual(ui.out, ["event: status\ndata: fetching\n\n"])
+        ui.exchange.response_done.assert_not_called()
+
+
+class ProgressLinks(NullLinkGenerator):
+    def progress_link(self, channel_id):
+        return f"/progress?id={channel_id}"
+
+
+class TestHtmlProgress(unittest.TestCase):
+    def make_formatter(self, out, progress_id):
+        return SingleEntryHtmlFormatter(
+            make_config(),
+            make_resource(),
+            out.append,
+            {"nonce": "x", "progress_id": progress_id, "link_generator": ProgressLinks()},
+        )
+
+    def test_follows_channel(self):
+        out = []
+        formatter = self.make_formatter(out, "abc")
+        self.assertTrue(formatter.uses_progress_channel)
+        formatter.start_output()
+        self.assertIn('new EventSource("/progress?id=abc")', "".join(out))
+        del out[:]
+        formatter.status("fetching")
+        formatter.debug("detail")
+        self.assertEqual(out, [])
+
+    def test_inline_without_channel(self):
+        out = []
+        formatter = self.make_formatter(out, None)
+        formatter.start_output()
+        self.assertNotIn("EventSource", "".join(out))
+        del out[:]
+        formatter.status("fetching")
+        self.assertIn("fetching", "".join(out))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import socket
+import unittest
+from unittest.mock import patch
+
+from redbot.resource.resolve import DnsCache, is_global_address
+
+RESULTS = [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_IP, "", ("192.0.2.1", 80))]
+
+
+class MockLoop:
+    def __init__(self):
+        self.scheduled = []
+
+    def schedule(self, delta, callback, *args):
+        self.scheduled.append((callback, args))
+
+    def run_scheduled(self):
+        while self.scheduled:
+            callback, args = self.scheduled.pop(0)
+            callback(*args)
+
+
+class TestDnsCache(unittest.TestCase):
+    def setUp(self):
+        self.loop = MockLoop()
+        self.cache = DnsCache()
+        self.lookups = []
+        patcher = patch("redbot.resource.resolve.lookup", side_effect=self.fake_lookup)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_lookup(self, loop, host, port, proto, callback):
+        self.lookups.append((host, callback))
+
+    def answer(self, results):
+        _, callback = self.lookups[-1]
+        callback(results)
+
+    def test_hit_after_miss(self):
+        got = []
+        self.cache.lookup(self.loop, b"example.com", 80, socket.SOCK_STREAM, got.append)
+        self.answer(RESULTS)
+        self.cache.lookup(self.loop, b"EXAMPLE.com", 80, socket.SOCK_STREAM, got.append)
+        self.loop.run_scheduled()
+        self.assertEqual(len(self.lookups), 1)
+        self.assertEqual(got, [RESULTS, RESULTS])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_coalesces_concurrent_lookups(self):
+        got = []
+        for _ in range(3):
+            self.cache.lookup(self.loop, b"example.com", 80, socket.SOCK_STREAM, got.append)
+        self.assertEqual(len(self.lookups), 1)
+        self.answer(RESULTS)
+        self.assertEqual(got, [RESULTS] * 3)
+        self.assertEqual(self.cache.stats()["coalesced"], 2)
+
+    def test_ports_are_distinct(self):
+        self.cache.lookup(self.loop, b"example.com", 80, socket.SOCK_STREAM, lambda r: None)
+        self.answer(RESULTS)
+        self.cache.lookup(self.loop, b"example.com", 443, socket.SOCK_STREAM, lambda r: None)
+        self.assertEqual(len(self.lookups), 2)
+
+    def test_negative_caching_expires(self):
+        got = []
+        error = socket.gaierror(1, "nope")
+        with patch("redbot.resource.resolve.time.monotonic", return_value=100.0):
+            self.cache.lookup(self.loop, b"bad.example", 80, socket.SOCK_STREAM, got.append)
+            self.answer(error)
+            self.cache.lookup(self.loop, b"bad.example", 80, socket.SOCK_STREAM, got.append)
+            self.loop.run_scheduled()
+        self.assertEqual(got, [error, error])
+        self.assertEqual(len(self.lookups), 1)
+        with patch("redbot.resource.resolve.time.monotonic", return_value=111.0):
+            self.cache.lookup(self.loop, b"bad.example", 80, socket.SOCK_STREAM, got.append)
+        self.assertEqual(len(self.lookups), 2)
+
+    def test_disabled(self):
+        self.cache.ttl = 0
+        self.cache.lookup(self.loop, b"example.com", 80, socket.SOCK_STREAM, lambda r: None)
+        self.answer(RESULTS)
+        self.cache.lookup(self.loop, b"example.com", 80, socket.SOCK_STREAM, lambda r: None)
+        self.assertEqual(len(self.lookups), 2)
+
+    def test_size_limit(self):
+        self.cache.max_entries = 2
+        for host in [b"a.example", b"b.example", b"c.example"]:
+            self.cache.lookup(self.loop, host, 80, socket.SOCK_STREAM, lambda r: None)
+            self.answer(RESULTS)
+        self.assertEqual(self.cache.stats()["entries"], 2)
+
+
+class TestIsGlobalAddress(unittest.TestCase):
+    def test_verdicts(self):
+        self.assertTrue(is_global_address("93.184.216.34"))
+        self.assertFalse(is_global_address("127.0.0.1"))
+        self.assertFalse(is_global_address("10.1.2.3"))
+        self.assertFalse(is_global_address("::1"))
+        self.assertFalse(is_global_address("not an address"))
+
+    def test_memoised(self):
+        before = is_global_address.cache_info().hits
+        is_global_address("198.51.100.7")
+        is_global_address("198.51.100.7")
+        self.assertEqual(is_global_address.cache_info().hits, before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+
+import unittest
+from configparser import ConfigParser
+from unittest.mock import patch
+
+from redbot.resource import HttpResource
+from redbot.resource.budget import BudgetExceededError
+from redbot.resource.fetch import RedFetcher
+from redbot.utils import canonical_uri
+
+
+class MockConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class MockExchange:
+    def __init__(self, client):
+        self.client = client
+        self.callbacks = {}
+        self.res_version = b"1.1"
+        self.input_transfer_length = 0
+        self.input_header_length = 0
+        self.conn = None
+        self.method = None
+        self.req_hdrs = []
+
+    def on(self, event, callback):
+        self.callbacks[event] = callback
+
+    once = on
+
+    def remove_listeners(self, *events):
+        for event in events:
+            self.callbacks.pop(event, None)
+
+    def request_start(self, method, uri, headers):
+        self.method = method
+        self.req_hdrs = headers
+        self.client.started.append(self)
+
+    def request_body(self, chunk):
+        pass
+
+    def request_done(self, trailers):
+        pass
+
+    def respond(self, status, headers, body=b""):
+        self.conn = self.client.conn
+        self.callbacks["response_start"](status, b"OK", headers)
+        if body:
+            self.callbacks["response_body"](body)
+        self.callbacks["response_done"]([])
+
+    def respond_streaming(self, status, headers, chunks):
+        "Send chunks until the fetcher stops listening; return how many were sent."
+        self.conn = self.client.conn
+        self.callbacks["response_start"](status, b"OK", headers)
+        sent = 0
+        for chunk in chunks:
+            if "response_body" not in self.callbacks:
+                return sent
+            self.callbacks["response_body"](chunk)
+            sent += 1
+        self.callbacks["response_done"]([])
+        return sent
+
+
+class MockClient:
+    def __init__(self):
+        self.check_ip = None
+        self.started = []
+        self.conn = MockConnection()
+
+    def exchange(self):
+        return MockExchange(self)
+
+
+RESPONSE_HEADERS = [
+    (b"Content-Type", b"text/plain"),
+    (b"ETag", b'"abc"'),
+    (b"Last-Modified", b"Mon, 01 Jan 2024 00:00:00 GMT"),
+    (b"Accept-Ranges", b"bytes"),
+    (b"Content-Length", b"200"),
+]
+
+
+def make_config(**values):
+    parser = ConfigParser()
+    parser.read_dict({"redbot": {"enable_local_access": "True", **values}})
+    return parser["redbot"]
+
+
+class TestConnectionReuse(unittest.TestCase):
+    def setUp(self):
+        self.client = MockClient()
+        patcher = patch.object(RedFetcher, "client", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_main(self, config):
+        resource = HttpResource(config)
+        resource.set_request("http://example.com/")
+        resource.check()
+        self.client.started[0].respond(b"200", RESPONSE_HEADERS, b"x" * 200)
+        return resource
+
+    def test_parallel_by_default(self):
+        self.run_main(make_config())
+        self.assertEqual(len(self.client.started), 5)
+
+    def test_serial_with_connection_reuse(self):
+        resource = self.run_main(make_config(connection_reuse="yes"))
+        self.assertEqual(len(self.client.started), 2)
+        while not resource.check_done:
+            self.client.started[-1].respond(b"304", RESPONSE_HEADERS)
+        self.assertEqual(len(self.client.started), 5)
+        self.assertEqual(resource.connection_counts(), {"new": 1, "reused": 4})
+
+    def test_stop_doesnt_start_queued_checks(self):
+        resource = self.run_main(make_config(connection_reuse="yes"))
+        resource.stop()
+        self.assertEqual(len(self.client.started), 2)
+        self.assertTrue(resource.check_done)
+
+
+class TestMaxFetchSize(unittest.TestCase):
+    def setUp(self):
+        self.client = MockClient()
+        patcher = patch.object(RedFetcher, "client", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fetch(self, exchange=0):
+        headers = RESPONSE_HEADERS[:-1] + [(b"Content-Length", b"4096")]
+        return self.client.started[exchange].respond_streaming(b"200", headers, [b"x" * 256] * 16)
+
+    def note_names(self, fetcher):
+        return [note.__class__.__name__ for note in fetcher.response.notes]
+
+    def test_truncates(self):
+        config = make_config(max_fetch_size="1000", max_sample_size="100")
+        resource = HttpResource(config)
+        resource.set_request("http://example.com/")
+        resource.check()
+        sent = self.fetch()
+        self.assertEqual(sent, 4)
+        self.assertTrue(self.client.conn.closed)
+        self.assertTrue(resource.content_truncated)
+        self.assertTrue(resource.response.complete)
+        self.assertEqual(resource.full_content_length, 4096)
+        self.assertIn("CONTENT_TRUNCATED", self.note_names(resource))
+        self.assertNotIn("CL_INCORRECT", self.note_names(resource))
+
+        # a full response to the ETag check is compared by what was downloaded
+        etag_check = resource.subreqs["etag_validate"]
+        fetchers = [
+            getattr(e.callbacks.get("response_start"), "__self__", None)
+            for e in self.client.started
+        ]
+        self.fetch(fetchers.index(etag_check))
+        self.assertIn("INM_FULL", self.note_names(resource))
+
+    def test_unlimited_by_default(self):
+        config = make_config()
+        resource = HttpResource(config)
+        resource.set_request("http://example.com/")
+        resource.check()
+        self.assertEqual(self.fetch(), 16)
+        self.assertFalse(resource.content_truncated)
+        self.assertIn("CL_CORRECT", self.note_names(resource))
+
+
+class TestFetchBudget(unittest.TestCase):
+    def setUp(self):
+        self.client = MockClient()
+        for patcher in [
+            patch.object(RedFetcher, "client", self.client),
+            patch("thor.schedule", side_effect=lambda delay, func, *args: func(*args)),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def note_names(self, fetcher):
+        return [note.__class__.__name__ for note in fetcher.response.notes]
+
+    def test_request_limit(self):
+        resource = HttpResource(make_config(max_test_requests="3"))
+        resource.set_request("http://example.com/")
+        resource.check()
+        self.client.started[0].respond(b"200", RESPONSE_HEADERS, b"x" * 200)
+        self.assertEqual(len(self.client.started), 3)
+        self.assertEqual(resource.budget.exceeded, "requests")
+        self.assertTrue(resource.check_done)
+        self.assertIn("TEST_BUDGET_EXCEEDED", self.note_names(resource))
+        errors = [sub.fetch_error for sub in resource.subreqs.values()]
+        self.assertTrue(all(isinstance(error, BudgetExceededError) for error in errors))
+
+    def test_bytes_in_limit(self):
+        resource = HttpResource(make_config(max_test_kbytes_in="1"))
+        resource.set_request("http://example.com/")
+        resource.check()
+        self.client.started[0].respond(b"200", RESPONSE_HEADERS, b"x" * 2048)
+        self.assertTrue(self.client.conn.closed)
+        self.assertEqual(resource.budget.exceeded, "bytes_in")
+        self.assertIsInstance(resource.fetch_error, BudgetExceededError)
+        self.assertTrue(resource.check_done)
+        self.assertEqual(len(self.client.started), 1)
+        self.assertIn("TEST_BUDGET_EXCEEDED", self.note_names(resource))
+
+    def test_shared_with_subrequests(self):
+        resource = HttpResource(make_config())
+        resource.set_request("http://example.com/")
+        resource.check()
+        self.client.started[0].respond(b"200", RESPONSE_HEADERS, b"x" * 200)
+        for exchange in self.client.started[1:]:
+            exchange.respond(b"304", RESPONSE_HEADERS)
+        self.assertEqual(resource.budget.requests, 5)
+        self.assertEqual(resource.budget.bytes_in, 200)
+        self.assertIsNone(resource.budget.exceeded)
+
+
+class TestSpeculativeChecks(unittest.TestCase):
+    def setUp(self):
+        self.client = MockClient()
+        patcher = patch.object(RedFetcher, "client", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start_main(self, **config):
+        resource = HttpResource(make_config(speculative_checks="yes", **config))
+        resource.set_request("http://example.com/")
+        resource.check()
+        return resource
+
+    def test_request_only_checks_start_with_main(self):
+        resource = self.start_main()
+        self.assertEqual(len(self.client.started), 2)
+        self.assertIn((b"accept-encoding", b"gzip"), self.client.started[1].req_hdrs)
+        self.assertTrue(resource.subreqs["conneg"].speculative)
+
+    def test_header_checks_start_at_headers(self):
+        self.start_main()
+        headers = RESPONSE_HEADERS[:-1] + [(b"Content-Length", b"4096")]
+        started = self.client.started
+        started[0].callbacks["response_start"](b"200", b"OK", headers)
+        self.assertEqual(len(started), 4)
+        started[0].callbacks["response_body"](b"x" * 4096)
+        self.assertEqual(len(started), 4)
+        started[0].callbacks["response_done"]([])
+        self.assertEqual(len(started), 5)
+
+    def test_waits_for_main_response(self):
+        resource = self.start_main()
+        conneg = resource.subreqs["conneg"]
+        self.client.started[1].respond(b"200", RESPONSE_HEADERS, b"x" * 200)
+        self.assertTrue(conneg.fetch_done)
+        self.assertFalse(conneg.check_done)
+        self.client.started[0].respond(b"200", RESPONSE_HEADERS, b"x" * 200)
+        self.assertTrue(conneg.check_done)
+        self.assertFalse(conneg.discarded)
+        self.assertFalse(resource.gzip_support)
+        for exchange in self.client.started[2:]:
+            exchange.respond(b"304", RESPONSE_HEADERS)
+        self.assertTrue(resource.check_done)
+
+    def test_discarded_when_moot(self):
+        resource = self.start_main()
+        self.client.started[0].respond(b"301", [(b"Location", b"/other")])
+        self.client.started[1].respond(b"301", [(b"Location", b"/other")])
+        for exchange in self.client.started[2:]:
+            exchange.respond(b"301", [(b"Location", b"/other")])
+        self.assertTrue(resource.subreqs["conneg"].discarded)
+        self.assertTrue(resource.check_done)
+
+    def test_stopped_when_main_fails(self):
+        resource = self.start_main()
+        resource.stop()
+        self.assertTrue(resource.subreqs["conneg"].fetch_done)
+        self.assertTrue(resource.subreqs["conneg"].discarded)
+        self.assertTrue(resource.check_done)
+        self.assertEqual(len(self.client.started), 2)
+
+    def test_not_with_connection_reuse(self):
+        self.start_main(connection_reuse="yes")
+        self.assertEqual(len(self.client.started), 1)
+
+
+class TestCanonicalUri(unittest.TestCase):
+    def test_normalises(self):
+        self.assertEqual(canonical_uri("HTTP://Example.COM:80"), "http://example.com/")
+        self.assertEqual(canonical_uri("https://example.com:443/a#b"), "https://example.com/a")
+        self.assertEqual(
+            canonical_uri("https://u@example.com:8443/"), "https://u@example.com:8443/"
+        )
+        self.assertEqual(canonical_uri("http://[::1]:80/"), "http://[::1]/")
+
+    def test_keeps_differences(self):
+        self.assertNotEqual(
+            canonical_uri("http://example.com/a"), canonical_uri("http://example.com/A")
+        )
+        self.assertNotEqual(
+            canonical_uri("http://example.com/?a"), canonical_uri("http://example.com/")
+        )
+
+
+class TestLinkDedupe(unittest.TestCase):
+    def setUp(self):
+        self.client = MockClient()
+        patcher = patch.object(RedFetcher, "client", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.resource = HttpResource(make_config(), descend=True)
+        self.resource.set_request("http://example.com/dir/")
+
+    def test_shared_across_tags_and_spellings(self):
+        base = "http://example.com/dir/"
+        self.resource.process_link(base, "app.js", "link", "")
+        self.resource.process_link(base, "/dir/app.js", "script", "")
+        self.resource.process_link(base, "HTTP://EXAMPLE.COM:80/dir/app.js#x", "iframe", "")
+        self.resource.process_link(base, "./app.js", "iframe", "")
+        self.assertEqual(len(self.client.started), 1)
+        self.assertEqual(len(self.resource.linked_resources()), 1)
+        self.assertEqual([tag for (_, tag) in self.resource.linked], ["link", "script", "iframe"])
+        self.assertEqual(len({id(res) for (res, _) in self.resource.linked}), 1)
+
+    def test_different_urls(self):
+        base = "http://example.com/dir/"
+        self.resource.process_link(base, "a.js", "script", "")
+        self.resource.process_link(base, "b.js", "script", "")
+        self.assertEqual(len(self.client.started), 2)
+        self.assertEqual(len(self.resource.linked), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
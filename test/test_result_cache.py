@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import unittest
+from configparser import ConfigParser
+from unittest.mock import patch
+
+from redbot.resource import HttpResource
+from redbot.webui.coalesce import coalesce_key
+from redbot.webui.result_cache import FETCHER_OVERHEAD, ResultCache, footprint
+
+
+def make_resource(uri="http://example.com/", done=True):
+    parser = ConfigParser()
+    parser.read_dict({"redbot": {}})
+    resource = HttpResource(parser["redbot"])
+    resource.set_request(uri)
+    resource.check_done = done
+    return resource
+
+
+def key_for(uri="http://example.com/"):
+    return coalesce_key(uri, [], False)
+
+
+class TestFootprint(unittest.TestCase):
+    def test_counts_samples(self):
+        resource = make_resource()
+        empty = footprint(resource)
+        self.assertEqual(empty, FETCHER_OVERHEAD * (1 + len(resource.subreqs)))
+        resource.response_content_sample.feed(b"x" * 100)
+        self.assertEqual(footprint(resource), empty + 100)
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResultCache(ttl=60)
+
+    def test_hit(self):
+        resource = make_resource()
+        self.cache.add(key_for(), resource)
+        cached, stored = self.cache.get(key_for())
+        self.assertIs(cached, resource)
+        self.assertGreater(stored, 0)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get(key_for()))
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_disabled(self):
+        cache = ResultCache()
+        cache.add(key_for(), make_resource())
+        self.assertIsNone(cache.get(key_for()))
+
+    def test_only_finished(self):
+        self.cache.add(key_for(), make_resource(done=False))
+        self.assertIsNone(self.cache.get(key_for()))
+        stopped = make_resource()
+        stopped.stop()
+        self.cache.add(key_for(), stopped)
+        self.assertIsNone(self.cache.get(key_for()))
+
+    def test_expiry(self):
+        self.cache.add(key_for(), make_resource())
+        with patch("redbot.webui.result_cache.time.monotonic", return_value=10**9):
+            self.assertIsNone(self.cache.get(key_for()))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.assertEqual(self.cache.size, 0)
+
+    def test_evicts_least_recently_used(self):
+        size = footprint(make_resource())
+        self.cache.max_size = size * 2
+        self.cache.add(key_for("http://a/"), make_resource("http://a/"))
+        self.cache.add(key_for("http://b/"), make_resource("http://b/"))
+        self.cache.get(key_for("http://a/"))
+        self.cache.add(key_for("http://c/"), make_resource("http://c/"))
+        self.assertIsNotNone(self.cache.get(key_for("http://a/")))
+        self.assertIsNone(self.cache.get(key_for("http://b/")))
+        self.assertIsNotNone(self.cache.get(key_for("http://c/")))
+        self.assertEqual(self.cache.size, size * 2)
+
+    def test_too_big(self):
+        self.cache.max_size = 1
+        self.cache.add(key_for(), make_resource())
+        self.assertIsNone(self.cache.get(key_for()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from redbot.resource.sample import SampleBuffer
+
+
+class TestSampleBuffer(unittest.TestCase):
+    def test_trims_to_capacity(self):
+        sample = SampleBuffer(10)
+        sample.feed(b"abcdef")
+        sample.feed(b"ghijkl")
+        self.assertEqual(sample.getvalue(), b"abcdefghij")
+        self.assertTrue(sample.truncated)
+        self.assertTrue(sample.full)
+
+    def test_exact_fit_is_not_truncated(self):
+        sample = SampleBuffer(6)
+        sample.feed(b"abc")
+        sample.feed(b"def")
+        sample.feed(b"")
+        self.assertEqual(sample.getvalue(), b"abcdef")
+        self.assertFalse(sample.truncated)
+
+    def test_chunks_after_full(self):
+        sample = SampleBuffer(3)
+        sample.feed(b"abc")
+        self.assertFalse(sample.truncated)
+        sample.feed(b"d")
+        self.assertEqual(len(sample), 3)
+        self.assertTrue(sample.truncated)
+
+    def test_unlimited(self):
+        sample = SampleBuffer(0)
+        for _ in range(100):
+            sample.feed(b"x" * 1000)
+        self.assertEqual(len(sample), 100000)
+        self.assertFalse(sample.truncated)
+        self.assertFalse(sample.full)
+
+
+if __name__ == "__main__":
+    unittest.main()
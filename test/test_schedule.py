@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import unittest
+from types import SimpleNamespace
+
+from thor.events import EventEmitter
+
+from redbot.resource.schedule import LinkScheduler
+
+
+class MockResource(EventEmitter):
+    def __init__(self, uri, started):
+        EventEmitter.__init__(self)
+        self.request = SimpleNamespace(uri=uri)
+        self.check_done = False
+        self.fetch_done = False
+        self.started = started
+
+    def check(self):
+        self.started.append(self)
+
+    def finish(self):
+        self.check_done = True
+        self.emit("check_done")
+
+
+class TestLinkScheduler(unittest.TestCase):
+    def setUp(self):
+        self.started = []
+
+    def submit(self, scheduler, *uris):
+        resources = [MockResource(uri, self.started) for uri in uris]
+        for resource in resources:
+            scheduler.submit(resource)
+        return resources
+
+    def test_unlimited(self):
+        self.submit(LinkScheduler(), *[f"http://a/{i}" for i in range(5)])
+        self.assertEqual(len(self.started), 5)
+
+    def test_global_limit(self):
+        scheduler = LinkScheduler(max_active=2)
+        resources = self.submit(scheduler, "http://a/1", "http://b/1", "http://c/1")
+        self.assertEqual(len(self.started), 2)
+        self.assertEqual(scheduler.queued, 1)
+        resources[0].finish()
+        self.assertEqual(len(self.started), 3)
+        self.assertEqual(scheduler.queued, 0)
+        self.assertEqual(scheduler.stats()["started"], 3)
+
+    def test_per_origin_limit(self):
+        scheduler = LinkScheduler(max_active=10, max_per_origin=1)
+        resources = self.submit(scheduler, "http://a/1", "http://a/2", "http://b/1")
+        self.assertEqual([r.request.uri for r in self.started], ["http://a/1", "http://b/1"])
+        resources[0].finish()
+        self.assertEqual(self.started[-1].request.uri, "http://a/2")
+
+    def test_origins_take_turns(self):
+        scheduler = LinkScheduler(max_active=1)
+        first = self.submit(scheduler, "http://a/0")[0]
+        self.submit(scheduler, "http://a/1", "http://a/2", "http://b/1", "http://b/2")
+        first.finish()
+        while scheduler.active:
+            self.started[-1].finish()
+        self.assertEqual(
+            [r.request.uri for r in self.started],
+            ["http://a/0", "http://a/1", "http://b/1", "http://a/2", "http://b/2"],
+        )
+
+    def test_origin_normalised(self):
+        scheduler = LinkScheduler(max_per_origin=1)
+        self.submit(scheduler, "http://A:80/1", "http://a/2")
+        self.assertEqual(len(self.started), 1)
+
+    def test_skips_stopped(self):
+        scheduler = LinkScheduler(max_active=1)
+        resources = self.submit(scheduler, "http://a/1", "http://a/2", "http://a/3")
+        resources[1].fetch_done = True
+        resources[0].finish()
+        self.assertEqual([r.request.uri for r in self.started], ["http://a/1", "http://a/3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
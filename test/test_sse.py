@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import unittest
+from configparser import ConfigParser
+
+import thor
+
+from redbot.formatter.sse import SseFormatter
+from redbot.resource import HttpResource
+
+
+def make_formatter(output, **config):
+    parser = ConfigParser()
+    parser.read_dict({"redbot": config})
+    resource = HttpResource(parser["redbot"])
+    resource.set_request("http://example.com/")
+    formatter = SseFormatter(parser["redbot"], resource, output, {"test_id": "abc"})
+    formatter.bind_resource(resource)
+    return formatter
+
+
+class TestSseFormatter(unittest.TestCase):
+    def test_events(self):
+        out = []
+        formatter = make_formatter(out.append)
+        formatter.status("one\ntwo")
+        formatter.finish_output()
+        self.assertEqual(
+            "".join(out),
+            "event: status\ndata: one\ndata: two\n\n"
+            'event: done\ndata: {"test_id":"abc","status":null,"error":null}\n\n',
+        )
+
+    def test_status_throttled(self):
+        out = []
+        formatter = make_formatter(out.append, status_rate="2")
+        for i in range(5):
+            formatter.resource.emit("status", f"status {i}")
+        self.assertEqual(out, ["event: status\ndata: status 0\n\n"])
+
+        def check():
+            self.assertEqual(out[1:], ["event: status\ndata: status 4\n\n"])
+            formatter.resource.emit("status", "status 5")
+            formatter._done()
+            self.assertNotIn("status 5", "".join(out))
+            thor.stop()
+
+        thor.schedule(0.6, check)
+        thor.run()
+        self.assertEqual(len(out), 3)
+
+    def test_status_unthrottled(self):
+        out = []
+        formatter = make_formatter(out.append, status_rate="0")
+        for i in range(5):
+            formatter.resource.emit("status", f"status {i}")
+        self.assertEqual(len(out), 5)
+
+    def test_debug(self):
+        out = []
+        formatter = make_formatter(out.append)
+        formatter.resource.emit("debug", "hidden")
+        self.assertEqual(out, [])
+        formatter = make_formatter(out.append, debug="True")
+        formatter.resource.emit("debug", "shown")
+        self.assertEqual(out, ["event: debug\ndata: shown\n\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import gzip
+import unittest
+from configparser import ConfigParser
+
+from importlib_resources import files
+
+import redbot
+from redbot.formatter.html import BaseHtmlFormatter
+from redbot.webui.static import StaticAssets, etag_matches, static_assets
+
+
+def make_assets(**config):
+    parser = ConfigParser()
+    parser.read_dict({"redbot": config})
+    assets = StaticAssets()
+    assets.setup(
+        parser["redbot"],
+        b"/static",
+        files("redbot.assets"),
+        {b"/extra/index.html": b"<p>extra</p>", b"/extra/": b"<p>extra</p>"},
+    )
+    return assets
+
+
+def header(headers, name):
+    return [value for (field, value) in headers if field.lower() == name]
+
+
+class TestStaticAssets(unittest.TestCase):
+    def setUp(self):
+        self.assets = make_assets()
+        with files("redbot.assets").joinpath("style.css").open("rb") as fh:
+            self.style = fh.read()
+
+    def test_loaded(self):
+        self.assertEqual(self.assets.get(b"/static/style.css").content, self.style)
+        self.assertIsNone(self.assets.get(b"/static/__init__.py"))
+        self.assertIsNone(self.assets.get(b"/static/../daemon.py"))
+        self.assertIsNotNone(self.assets.get(b"/static/icons/check-circle.svg"))
+        self.assertIsNotNone(self.assets.get(b"/extra"))
+
+    def test_response(self):
+        status, _, headers, content = self.assets.respond(b"/static/style.css", [])
+        self.assertEqual(status, b"200")
+        self.assertEqual(content, self.style)
+        self.assertEqual(header(headers, b"content-type"), [b"text/css"])
+        self.assertEqual(header(headers, b"vary"), [b"Accept-Encoding"])
+        self.assertEqual(header(headers, b"content-length"), [str(len(self.style)).encode()])
+        self.assertEqual(len(header(headers, b"etag")), 1)
+
+    def test_precompressed(self):
+        plain = self.assets.respond(b"/static/style.css", [])
+        status, _, headers, content = self.assets.respond(
+            b"/static/style.css", [(b"Accept-Encoding", b"gzip")]
+        )
+        self.assertEqual(status, b"200")
+        self.assertEqual(header(headers, b"content-encoding"), [b"gzip"])
+        self.assertEqual(gzip.decompress(content), self.style)
+        self.assertNotEqual(header(headers, b"etag"), header(plain[2], b"etag"))
+
+    def test_not_modified(self):
+        _, _, headers, _ = self.assets.respond(b"/static/style.css", [])
+        etag = header(headers, b"etag")[0]
+        status, _, headers, content = self.assets.respond(
+            b"/static/style.css", [(b"If-None-Match", b'"other", W/' + etag)]
+        )
+        self.assertEqual(status, b"304")
+        self.assertEqual(content, b"")
+        self.assertEqual(header(headers, b"etag"), [etag])
+        status = self.assets.respond(
+            b"/static/style.css", [(b"If-None-Match", etag), (b"Accept-Encoding", b"gzip")]
+        )[0]
+        self.assertEqual(status, b"200")
+        self.assertEqual(self.assets.stats()["not_modified"], 1)
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches(b'"a"', [(b"If-None-Match", b"*")]))
+        self.assertTrue(etag_matches(b'"a"', [(b"If-None-Match", b'"b" , "a"')]))
+        self.assertFalse(etag_matches(b'"a"', [(b"If-None-Match", b'"b"')]))
+        self.assertFalse(etag_matches(b'"a"', []))
+
+    def test_unhashed_url(self):
+        self.assertEqual(self.assets.url("style.css"), f"style.css?{redbot.__version__}")
+        self.assertEqual(self.assets.hashed_names, {})
+
+
+class TestCompressLevel(unittest.TestCase):
+    def test_disabled(self):
+        assets = make_assets(compress_level="0", static_hashed_urls="True")
+        with files("redbot.assets").joinpath("style.css").open("rb") as fh:
+            style = fh.read()
+        for path in [b"/static/style.css", f"/static/{assets.url('style.css')}".encode("ascii")]:
+            status, _, headers, content = assets.respond(path, [(b"Accept-Encoding", b"gzip")])
+            self.assertEqual(status, b"200")
+            self.assertEqual(content, style)
+            self.assertEqual(header(headers, b"content-encoding"), [])
+            self.assertEqual(header(headers, b"vary"), [])
+        self.assertEqual(assets.get(b"/static/style.css").encoded, {})
+
+
+class TestHashedUrls(unittest.TestCase):
+    def test_hashed(self):
+        assets = make_assets(static_hashed_urls="True")
+        url = assets.url("style.css")
+        self.assertRegex(url, r"^style\.[0-9a-f]{12}\.css$")
+        _, _, headers, content = assets.respond(f"/static/{url}".encode("ascii"), [])
+        self.assertEqual(content, assets.get(b"/static/style.css").content)
+        self.assertEqual(header(headers, b"cache-control"), [b"max-age=31536000, immutable"])
+        self.assertEqual(
+            header(assets.respond(b"/static/style.css", [])[2], b"cache-control"),
+            [b"max-age=86400"],
+        )
+
+    def test_template_filter(self):
+        # compiled before the assets are loaded, as the daemon does
+        tpl = BaseHtmlFormatter.templates.from_string('{{ "style.css"|static_url }}')
+        try:
+            static_assets.hashed_names = {"style.css": "style.0123456789ab.css"}
+            self.assertEqual(tpl.render(), "style.0123456789ab.css")
+        finally:
+            static_assets.hashed_names = {}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import unittest
+from configparser import ConfigParser
+
+from redbot.formatter.text import TextFormatter
+from redbot.resource import HttpResource
+from redbot.resource.timing import ConnectionTimings, FetchTimings
+
+
+class TestFetchTimings(unittest.TestCase):
+    def test_new_tls_connection(self):
+        conn = ConnectionTimings()
+        conn.dns_start = 10.001
+        conn.dns_done = 10.021
+        conn.connect_start = 10.021
+        conn.tcp_done = 10.051
+        conn.tls_done = 10.111
+        timings = FetchTimings(10.0)
+        timings.connection = conn
+        timings.first_byte = 10.311
+        timings.last_byte = 10.411
+        self.assertEqual(
+            timings.phases(),
+            {
+                "blocked": 1,
+                "dns": 20,
+                "connect": 90,
+                "ssl": 60,
+                "send": 0,
+                "wait": 200,
+                "receive": 100,
+            },
+        )
+
+    def test_reused_connection(self):
+        timings = FetchTimings(10.0)
+        timings.first_byte = 10.25
+        timings.last_byte = 10.5
+        phases = timings.phases()
+        self.assertEqual(phases["dns"], -1)
+        self.assertEqual(phases["connect"], -1)
+        self.assertEqual(phases["ssl"], -1)
+        self.assertEqual(phases["wait"], 250)
+        self.assertEqual(phases["receive"], 250)
+
+    def test_no_response(self):
+        phases = FetchTimings(10.0).phases()
+        self.assertEqual(phases["wait"], -1)
+        self.assertEqual(phases["receive"], -1)
+
+
+class TestTextTimings(unittest.TestCase):
+    def format(self, timings):
+        parser = ConfigParser()
+        parser.read_dict({"redbot": {}})
+        resource = HttpResource(parser["redbot"])
+        resource.set_request("http://example.com/")
+        resource.response.process_response_topline(b"1.1", b"200", b"OK")
+        resource.response.process_headers([(b"Content-Type", b"text/plain")])
+        resource.response.finish_content(True)
+        resource.timings = timings
+        out = []
+        TextFormatter(parser["redbot"], resource, out.append, {}).finish_output()
+        return out
+
+    def test_no_timings(self):
+        out = self.format(None)
+        self.assertFalse(any("Timings" in chunk for chunk in out))
+        self.assertNotIn("\n", out)
+
+    def test_timings(self):
+        timings = FetchTimings(10.0)
+        timings.first_byte = 10.25
+        timings.last_byte = 10.5
+        out = self.format(timings)
+        self.assertTrue(any(chunk.startswith("Timings:") for chunk in out))
+
+
+if __name__ == "__main__":
+    unittest.main()